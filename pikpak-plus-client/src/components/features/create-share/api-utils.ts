@@ -1,5 +1,5 @@
 import axios from "axios";
-import { getApiUrl, getAuthHeaders } from "@/lib/api-utils";
+import { getApiUrl, getAuthHeaders, postIdempotent } from "@/lib/api-utils";
 import type { ConfigResponse } from "@/types";
 
 export const fetchConfig = async (): Promise<ConfigResponse> => {
@@ -62,19 +62,61 @@ export const fetchGlobalTasks = async (page: number, pageSize: number) => {
   }
 };
 
-export const addMagnetLink = async (url: string) => {
+const SUBMISSION_POLL_INTERVAL_MS = 2000;
+const SUBMISSION_POLL_TIMEOUT_MS = 10 * 60 * 1000;
+
+// /add answers 202 with a submission ID; wait for the worker to submit the
+// link and return the body /add used to respond with.
+const waitForSubmission = async (
+  apiUrl: string,
+  submissionId: string,
+  authHeaders: Record<string, string>,
+) => {
+  const deadline = Date.now() + SUBMISSION_POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) =>
+      setTimeout(resolve, SUBMISSION_POLL_INTERVAL_MS),
+    );
+    const res = await axios.get(`${apiUrl}/submissions/${submissionId}`, {
+      headers: authHeaders,
+    });
+    const { status, response } = res.data;
+    if (status === "completed") {
+      return response;
+    }
+    if (status === "failed") {
+      const failure: any = new Error(response?.error || "Failed to add link");
+      failure.response = { data: response, status: res.data.status_code };
+      // /add itself went through; retrying needs a new Idempotency-Key
+      failure.submissionFailed = true;
+      throw failure;
+    }
+  }
+  throw new Error("Link is still queued. Check your tasks list shortly.");
+};
+
+// Pass the same idempotencyKey when retrying a failed attempt to add the
+// same link, so the server doesn't queue it twice
+export const addMagnetLink = async (url: string, idempotencyKey?: string) => {
   try {
     const apiUrl = getApiUrl();
     const headers = getAuthHeaders();
-    const res = await axios.post(
+    const authHeaders: Record<string, string> = headers.Authorization
+      ? { Authorization: headers.Authorization }
+      : {};
+    const res = await postIdempotent(
       `${apiUrl}/add`,
       { url: url.trim() },
-      {
-        headers: headers.Authorization
-          ? { Authorization: headers.Authorization }
-          : {},
-      },
+      authHeaders,
+      idempotencyKey,
     );
+    if (res.status === 202 && res.data.submission_id) {
+      return await waitForSubmission(
+        apiUrl,
+        res.data.submission_id,
+        authHeaders,
+      );
+    }
     return res.data;
   } catch (error: any) {
     let errMsg = "Failed to add magnet link";
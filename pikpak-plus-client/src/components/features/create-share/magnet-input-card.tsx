@@ -1,6 +1,6 @@
 "use client";
 
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { CloudDownload, AlertCircle, Clock, Info } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -12,6 +12,7 @@ import {
   CardTitle,
 } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
+import { isRetryableError, newIdempotencyKey } from "@/lib/api-utils";
 import { validateDownloadLink } from "./magnet-utils";
 import { addMagnetLink } from "./api-utils";
 
@@ -38,6 +39,8 @@ export function MagnetInputCard({
   const [loading, setLoading] = useState(false);
   const [message, setMessage] = useState("");
   const [validationError, setValidationError] = useState("");
+  // Idempotency-Key of the last attempt, kept while it may be retried
+  const pendingAttempt = useRef<{ url: string; key: string } | null>(null);
   const [fileInfo, setFileInfo] = useState<any>(null);
   const [detectedLinkType, setDetectedLinkType] = useState<string | undefined>();
 
@@ -55,8 +58,15 @@ export function MagnetInputCard({
     setMessage("");
     setValidationError("");
     setFileInfo(null);
+    const link = url.trim();
+    const attempt =
+      pendingAttempt.current?.url === link
+        ? pendingAttempt.current
+        : { url: link, key: newIdempotencyKey() };
+    pendingAttempt.current = attempt;
     try {
-      const result = await addMagnetLink(url);
+      const result = await addMagnetLink(url, attempt.key);
+      pendingAttempt.current = null;
 
       // Extract task information from response
       const taskData = result.task;
@@ -72,6 +82,10 @@ export function MagnetInputCard({
       setUrl("");
       setDetectedLinkType(undefined);
     } catch (error: any) {
+      // Adding the same link again retries this attempt unless the server answered it
+      if (!isRetryableError(error) || error.submissionFailed) {
+        pendingAttempt.current = null;
+      }
       setMessage(error.message);
 
       // Store file info from error response if available
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { useLocalStorage } from "primereact/hooks";
 import { Button } from "@/components/ui/button";
 import {
@@ -13,8 +13,13 @@ import {
   Clock,
 } from "lucide-react";
 import { Alert, AlertDescription } from "@/components/ui/alert";
-import { getApiUrl, getAuthHeaders } from "@/lib/api-utils";
-import axios from "axios";
+import {
+  getApiUrl,
+  getAuthHeaders,
+  isRetryableError,
+  newIdempotencyKey,
+  postIdempotent,
+} from "@/lib/api-utils";
 import type { SupabaseTaskRecord } from "@/types";
 import { LocalShare, LOCAL_SHARES_STORAGE_KEY } from "../my-activity/types";
 
@@ -68,6 +73,8 @@ export function ShareSection({
     is_existing?: boolean;
   } | null>(null);
   const [shareError, setShareError] = useState<string | null>(null);
+  // Idempotency-Key of a failed share attempt that "Retry" repeats
+  const retryKey = useRef<string | null>(null);
   const [shares, setShares] = useLocalStorage<LocalShare[]>(
     [],
     LOCAL_SHARES_STORAGE_KEY,
@@ -94,7 +101,7 @@ export function ShareSection({
     }
   };
 
-  const handleShare = async () => {
+  const handleShare = async (idempotencyKey: string = newIdempotencyKey()) => {
     if (!taskData?.file_id) {
       setShareError("File ID not available. Task may not be completed yet.");
       return;
@@ -102,13 +109,15 @@ export function ShareSection({
 
     setShareLoading(true);
     setShareError(null);
+    retryKey.current = null;
 
     try {
       const apiUrl = getApiUrl();
-      const response = await axios.post(
+      const response = await postIdempotent(
         `${apiUrl}/share`,
         { id: taskData.file_id },
-        { headers: getAuthHeaders() },
+        getAuthHeaders() as Record<string, string>,
+        idempotencyKey,
       );
 
       const shareResult = response.data;
@@ -119,6 +128,9 @@ export function ShareSection({
         saveToLocalStorage(shareResult, taskData.file_id);
       }
     } catch (error: any) {
+      if (isRetryableError(error)) {
+        retryKey.current = idempotencyKey;
+      }
       const friendlyError = getUserFriendlyError(error);
       setShareError(friendlyError);
     } finally {
@@ -128,7 +140,7 @@ export function ShareSection({
 
   const handleRetry = () => {
     setShareError(null);
-    handleShare();
+    handleShare(retryKey.current ?? undefined);
   };
 
   return (
@@ -235,7 +247,7 @@ export function ShareSection({
       <Button
         variant="outline"
         size="sm"
-        onClick={handleShare}
+        onClick={() => handleShare()}
         disabled={shareLoading || !hasFileId}
         className="gap-2 w-full"
       >
@@ -1,3 +1,5 @@
+import axios from "axios";
+
 // Get API URL from environment or use default
 export const getApiUrl = (): string => {
   return process.env.NEXT_PUBLIC_API_URL || "/api";
@@ -25,3 +27,45 @@ export const getAuthHeaders = () => {
 
   return {};
 };
+
+// Idempotency-Key for one add/share attempt; reuse it when retrying that attempt
+export const newIdempotencyKey = (): string => {
+  if (typeof crypto !== "undefined" && "randomUUID" in crypto) {
+    return crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+};
+
+// Failures where the server may not have answered for this attempt: no
+// response, a duplicate still in progress (409) or a gateway/queue error
+export const isRetryableError = (error: any): boolean => {
+  const status = error?.response?.status;
+  return !status || status === 409 || status === 502 || status === 503 || status === 504;
+};
+
+const RETRY_ATTEMPTS = 3;
+const RETRY_BASE_DELAY_MS = 1000;
+
+// POST with an Idempotency-Key, retrying retryable failures with the same
+// key so the server answers them with the first request's response
+export const postIdempotent = async (
+  url: string,
+  body: unknown,
+  headers: Record<string, string>,
+  idempotencyKey: string = newIdempotencyKey(),
+) => {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await axios.post(url, body, {
+        headers: { ...headers, "Idempotency-Key": idempotencyKey },
+      });
+    } catch (error: any) {
+      if (attempt >= RETRY_ATTEMPTS || !isRetryableError(error)) {
+        throw error;
+      }
+      await new Promise((resolve) =>
+        setTimeout(resolve, RETRY_BASE_DELAY_MS * 2 ** (attempt - 1)),
+      );
+    }
+  }
+};
@@ -159,7 +159,8 @@ class PikPakApi(AuthMixin, FileManagerMixin, OfflineDownloadMixin, WebDavMixin):
                 )
                 last_error = error
 
-            await asyncio.sleep(self.initial_backoff * (2**attempt))
+            if attempt + 1 < self.max_retries:
+                await asyncio.sleep(self.initial_backoff * (2**attempt))
 
         # If we've exhausted all retries, raise an exception with the last error
         raise PikpakException(f"Max retries reached. Last error: {str(last_error)}")
@@ -9,8 +9,12 @@ from flask_compress import Compress
 from supabase import create_client
 
 from app.core.config import AppConfig
-from app.services import PikPakService, SupabaseService, WebDAVManager
+from app.core.auth import init_token_revocation
+from app.core.token_revocation import TokenRevocationList
+from app.services import PikPakService, SupabaseService, AsyncSupabaseService, WebDAVManager, WhatsLinkService
 from app.services.user_service import UserService
+from app.services.action_log_queue import ActionLogQueue
+from app.services.account_pool import PikPakAccountPool
 from app.utils.common import CacheManager
 from app.api.routes import init_routes, api_bp
 from app.celery_app import celery_app
@@ -85,65 +89,185 @@ def _filter_duplicate_logs():
         logging.getLogger('app').setLevel(logging.WARNING)
 
 
-def create_app():
-    """Create and configure the Flask application"""
-    # Filter duplicate logs from non-primary workers
-    _filter_duplicate_logs()
+# Pid of the process whose connections/services are currently injected
+_worker_pid = None
+_worker_lock = threading.Lock()
 
-    app = Flask(__name__)
-    app.config.from_object(AppConfig())
-    CORS(app)
-    Compress(app)  # Enable gzip compression for responses
+BOOTSTRAP_CLAIM_KEY = "app:bootstrap_claim"
+BOOTSTRAP_CLAIM_TTL = 60  # Seconds; workers booting together run bootstrap once
 
-    # Initialize Redis client with connection pooling
+
+def _claim_bootstrap(redis_client) -> bool:
+    """Let only one process per boot run the startup queries
+
+    Falls back to running them when Redis is unavailable.
+    """
+    if not redis_client:
+        return True
     try:
-        redis_pool = redis.ConnectionPool.from_url(
-            AppConfig.REDIS_URL,
-            decode_responses=True,
-            max_connections=50
-        )
-        redis_client = redis.Redis(connection_pool=redis_pool)
-        logger.info("Redis client initialized with connection pool")
+        return bool(redis_client.set(
+            BOOTSTRAP_CLAIM_KEY, os.getpid(), nx=True, ex=BOOTSTRAP_CLAIM_TTL))
     except Exception as e:
-        logger.error(f"Failed to initialize Redis: {e}")
-        redis_client = None
+        logger.warning(f"Could not claim startup bootstrap: {e}")
+        return True
 
-    # Initialize cache manager
-    cache_manager = CacheManager(
-        AppConfig.TASK_CACHE_TTL, AppConfig.REDIS_URL)
 
-    # Initialize Supabase client
-    supabase_client = create_client(
-        AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY)
-    logger.info("Supabase client initialized successfully")
+def _run_bootstrap(user_service, redis_client):
+    """One-off startup queries: blocked-user sync and admin account bootstrap"""
+    if not _claim_bootstrap(redis_client):
+        logger.info("Startup bootstrap already claimed by another process")
+        return
 
-    # Initialize Supabase service
-    supabase_service = SupabaseService(supabase_client)
+    try:
+        user_service.sync_blocked_users()
+    except Exception as e:
+        logger.error(f"Failed to load blocked users: {e}")
 
     # Bootstrap Admin User
     try:
-        user_service = UserService(supabase_service)
         user_service.bootstrap_admin_user()
     except Exception as e:
         logger.error(f"Failed to bootstrap admin user: {e}")
 
-    # Initialize PikPak service
-    pikpak_service = PikPakService(
-        AppConfig.PIKPAK_USER, AppConfig.PIKPAK_PASS)
-    logger.info("PikPak client initialized successfully")
 
-    # Initialize WebDAV manager
-    webdav_manager = None
+def _request_blocked_users_sync():
+    """Queue a reload of the Redis blocked set (TokenRevocationList reseed hook)"""
+    from app.tasks.jobs.blocked_users_job import sync_blocked_users
+    sync_blocked_users.delay()
+
+
+def bootstrap_once():
+    """Run the startup queries once in the gunicorn master (preload mode)
+
+    Uses short-lived clients that are dropped before workers are forked.
+    """
+    redis_client = redis.from_url(AppConfig.REDIS_URL, decode_responses=True)
     try:
-        webdav_manager = WebDAVManager(
-            pikpak_service, ttl_hours=AppConfig.WEBDAV_GENERATION_INTERVAL_HOURS, cache_manager=cache_manager)
-        logger.info("WebDAV manager initialized")
+        supabase_service = SupabaseService(
+            create_client(AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY))
+        user_service = UserService(
+            supabase_service, revocation_list=TokenRevocationList(redis_client))
+        _run_bootstrap(user_service, redis_client)
     except Exception as e:
-        logger.warning(f"WebDAV manager initialization failed: {e}")
+        logger.error(f"Startup bootstrap failed: {e}")
+    finally:
+        redis_client.close()
+
+
+def init_worker_resources(bootstrap: bool = True):
+    """Create this process's connections and services and inject them into routes
+
+    Called from gunicorn's post_fork hook in preload mode, directly by
+    create_app otherwise, and as a before_request fallback. Only the first
+    call in each process does any work.
+
+    Args:
+        bootstrap: Also run the startup queries (skipped when the master
+            already ran them)
+    """
+    global _worker_pid
+    if _worker_pid == os.getpid():
+        return
+
+    with _worker_lock:
+        if _worker_pid == os.getpid():
+            return
+
+        # Initialize Redis client with connection pooling
+        try:
+            redis_pool = redis.ConnectionPool.from_url(
+                AppConfig.REDIS_URL,
+                decode_responses=True,
+                max_connections=50
+            )
+            redis_client = redis.Redis(connection_pool=redis_pool)
+            logger.info("Redis client initialized with connection pool")
+        except Exception as e:
+            logger.error(f"Failed to initialize Redis: {e}")
+            redis_client = None
+
+        # Initialize cache manager
+        cache_manager = CacheManager(
+            AppConfig.TASK_CACHE_TTL, AppConfig.REDIS_URL)
+
+        # Initialize Supabase client
+        supabase_client = create_client(
+            AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY)
+        logger.info("Supabase client initialized successfully")
+
+        # Action/share inserts are written behind through a Redis stream
+        action_queue = ActionLogQueue(redis_client)
+
+        # Initialize Supabase service
+        supabase_service = SupabaseService(
+            supabase_client, action_queue=action_queue)
+
+        # Async variant for route coroutines (client is created lazily per event loop)
+        async_supabase_service = AsyncSupabaseService(
+            AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY, action_queue=action_queue)
+
+        # Blocked users and revoked tokens live in Redis so require_auth never queries Supabase
+        revocation_list = TokenRevocationList(
+            redis_client, reseed=_request_blocked_users_sync)
+        init_token_revocation(revocation_list)
+
+        # Shared user service; profiles are cached in Redis by email
+        user_service = UserService(
+            supabase_service, cache_manager=cache_manager,
+            async_supabase_service=async_supabase_service,
+            revocation_list=revocation_list)
+
+        if bootstrap:
+            _run_bootstrap(user_service, redis_client)
+
+        # Initialize PikPak service
+        pikpak_service = PikPakService(
+            AppConfig.PIKPAK_USER, AppConfig.PIKPAK_PASS)
+        logger.info("PikPak client initialized successfully")
+
+        # Extra pool accounts (deletes and shares of their files go through them)
+        account_pool = PikPakAccountPool.from_config(redis_client, primary=pikpak_service)
+
+        # Initialize WebDAV manager
+        webdav_manager = None
+        try:
+            webdav_manager = WebDAVManager(
+                pikpak_service, ttl_hours=AppConfig.WEBDAV_GENERATION_INTERVAL_HOURS, cache_manager=cache_manager)
+            logger.info("WebDAV manager initialized")
+        except Exception as e:
+            logger.warning(f"WebDAV manager initialization failed: {e}")
+
+        # Initialize routes with services
+        init_routes(pikpak_service, supabase_service,
+                    cache_manager, None, webdav_manager, redis_client,
+                    async_supabase_service=async_supabase_service,
+                    user_service=user_service,
+                    whatslink_service=WhatsLinkService(redis_client),
+                    account_pool=account_pool)
+
+        _worker_pid = os.getpid()
 
-    # Initialize routes with services
-    init_routes(pikpak_service, supabase_service,
-                cache_manager, None, webdav_manager, redis_client)
+
+def create_app():
+    """Create and configure the Flask application
+
+    With PRELOAD_APP (gunicorn preload_app) this only builds the immutable
+    parts - config, extensions, blueprints/routes - and runs the startup
+    queries once, in the master. Connections and services are created per
+    worker after fork (see init_worker_resources).
+    """
+    # Filter duplicate logs from non-primary workers
+    _filter_duplicate_logs()
+
+    app = Flask(__name__)
+    app.config.from_object(AppConfig())
+    CORS(app)
+    Compress(app)  # Enable gzip compression for responses
+
+    if AppConfig.PRELOAD_APP:
+        bootstrap_once()
+    else:
+        init_worker_resources()
 
     # Register blueprints
     app.register_blueprint(api_bp, url_prefix='/')
@@ -156,6 +280,11 @@ def create_app():
     #     default_limits=["2000 per day", "500 per hour"]
     # )
 
+    @app.before_request
+    def ensure_worker_resources():
+        # No-op once post_fork (or create_app) has set this process up
+        init_worker_resources(bootstrap=not AppConfig.PRELOAD_APP)
+
     # Middleware to set correlation ID
     @app.before_request
     def set_correlation_id():
@@ -20,7 +20,8 @@ api_bp.register_blueprint(statistics.bp, url_prefix='/')
 api_bp.register_blueprint(health.bp, url_prefix='/')
 
 
-def init_routes(pikpak_service, supabase_service, cache_manager, scheduler, webdav_manager, redis_client=None):
+def init_routes(pikpak_service, supabase_service, cache_manager, scheduler, webdav_manager, redis_client=None,
+                async_supabase_service=None, user_service=None, whatslink_service=None, account_pool=None):
     """
     Initialize routes with required services
 
@@ -31,6 +32,10 @@ def init_routes(pikpak_service, supabase_service, cache_manager, scheduler, webd
         scheduler: APScheduler instance
         webdav_manager: WebDAV manager instance
         redis_client: Redis client instance
+        async_supabase_service: Async Supabase service instance
+        user_service: Shared UserService instance (holds the profile cache)
+        whatslink_service: Shared WhatsLinkService instance (pooled client + Redis cache)
+        account_pool: PikPak account pool (its primary account is pikpak_service)
     """
     logger.info("Initializing API routes with services")
 
@@ -42,7 +47,11 @@ def init_routes(pikpak_service, supabase_service, cache_manager, scheduler, webd
         cache=cache_manager,
         scheduler=scheduler,
         webdav_mgr=webdav_manager,
-        redis_cli=redis_client
+        redis_cli=redis_client,
+        async_supabase=async_supabase_service,
+        user_svc=user_service,
+        whatslink_svc=whatslink_service,
+        account_pool=account_pool
     )
 
     logger.info("API routes initialized successfully")
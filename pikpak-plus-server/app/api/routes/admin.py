@@ -1,12 +1,20 @@
 """Admin API Routes - User Management, Content Moderation, Analytics"""
+import asyncio
 import logging
 from flask import Blueprint, request, jsonify
 from app.core.config import AppConfig
 from app.core.auth import require_admin, get_current_user
-from app.api.utils.dependencies import get_supabase_service
+from app.api.utils.dependencies import (
+    get_account_pool,
+    get_supabase_service,
+    get_user_service,
+    get_cache_manager
+)
 from app.api.utils.async_helpers import run_async
-from app.services.user_service import UserService
-from app.services.pikpak_service import PikPakService
+from app.api.utils.etag import conditional_get
+from app.utils.pagination import parse_count_mode
+from app.utils.forecasting import forecast_for_stats
+from app.services.account_pool import account_id_of, cached_quota_infos, pool_limits_quota_info
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +28,7 @@ bp = Blueprint('admin', __name__)
 
 @bp.route('/users', methods=['GET'])
 @require_admin
+@conditional_get("users")
 def get_users():
     """List all users with pagination and filtering
 
@@ -28,12 +37,14 @@ def get_users():
         - limit: Items per page (default: 25)
         - blocked: Filter by blocked status (true/false, optional)
         - search: Search by email (optional)
+        - cursor: next_cursor from the previous response; takes precedence over page
     """
     try:
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 25))
         blocked_param = request.args.get('blocked')
         search = request.args.get('search', '').strip()
+        cursor = request.args.get('cursor')
 
         offset = (page - 1) * limit
 
@@ -42,23 +53,23 @@ def get_users():
         if blocked_param:
             blocked_filter = blocked_param.lower() == 'true'
 
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
-
-        result = user_service.get_all_users(offset, limit, blocked_filter)
+        user_service = get_user_service()
 
-        # Apply search filter if provided (client-side for now)
-        if search:
-            result['data'] = [
-                user for user in result['data']
-                if search.lower() in user['email'].lower()
-            ]
+        try:
+            result = user_service.get_all_users(
+                offset, limit, blocked_filter, search=search, cursor=cursor)
+        except ValueError as ve:
+            return jsonify({
+                "error": "Bad Request",
+                "message": str(ve)
+            }), 400
 
         return jsonify({
             "data": result['data'],
             "count": result['count'],
             "page": page,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": result['next_cursor']
         }), 200
 
     except Exception as e:
@@ -74,8 +85,7 @@ def get_users():
 def get_user_details(email: str):
     """Get specific user details and statistics"""
     try:
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         # Get user info
         user = user_service.get_user_by_email(email)
@@ -107,8 +117,7 @@ def get_user_details(email: str):
 def block_user(email: str):
     """Block a user account"""
     try:
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         # Check if user exists
         user = user_service.get_user_by_email(email)
@@ -146,8 +155,7 @@ def block_user(email: str):
 def unblock_user(email: str):
     """Unblock a user account"""
     try:
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         # Check if user exists
         user = user_service.get_user_by_email(email)
@@ -219,8 +227,7 @@ def create_user():
                 "message": "Password must be at least 6 characters"
             }), 400
 
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         current_user = get_current_user()
         if current_user and current_user.get('email') == email:
@@ -260,8 +267,7 @@ def delete_user(email: str):
         - Deleting self (current admin)
     """
     try:
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         current_user = get_current_user()
         if current_user and current_user.get('email') == email:
@@ -329,8 +335,7 @@ def update_user_role(email: str):
                 "message": "is_admin must be a boolean value"
             }), 400
 
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         result = user_service.update_user_role(email, is_admin)
 
@@ -391,8 +396,7 @@ def update_user_password(email: str):
                 "message": "Password must be at least 6 characters"
             }), 400
 
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         result = user_service.reset_user_password(email, new_password)
 
@@ -430,6 +434,7 @@ def update_user_password(email: str):
 
 @bp.route('/logs', methods=['GET'])
 @require_admin
+@conditional_get("logs")
 def get_logs():
     """Get all system logs with pagination and filtering
 
@@ -438,38 +443,37 @@ def get_logs():
         - limit: Items per page (default: 25)
         - action: Filter by action type ('add', 'share', optional)
         - user_email: Filter by user email (optional)
+        - cursor: next_cursor from the previous response; takes precedence over page
+        - count: 'estimated' (default), 'planned' or 'exact'
     """
     try:
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 25))
         action_filter = request.args.get('action')
         user_email_filter = request.args.get('user_email')
+        cursor = request.args.get('cursor')
+        count_mode = parse_count_mode(request.args.get('count'))
 
         offset = (page - 1) * limit
 
         supabase_service = get_supabase_service()
 
-        # Build query
-        query = supabase_service.client.table("public_actions") \
-            .select("*", count="exact")
-
-        # Apply filters
-        if action_filter:
-            query = query.eq("action", action_filter)
-
-        if user_email_filter:
-            query = query.eq("user_email", user_email_filter)
-
-        response = query \
-            .order("created_at", desc=True) \
-            .range(offset, offset + limit - 1) \
-            .execute()
+        try:
+            result = supabase_service.get_action_logs(
+                offset, limit, action=action_filter, user_email=user_email_filter,
+                cursor=cursor, count=count_mode)
+        except ValueError as ve:
+            return jsonify({
+                "error": "Bad Request",
+                "message": str(ve)
+            }), 400
 
         return jsonify({
-            "data": response.data,
-            "count": response.count,
+            "data": result['data'],
+            "count": result['count'],
             "page": page,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": result['next_cursor']
         }), 200
 
     except Exception as e:
@@ -482,28 +486,41 @@ def get_logs():
 
 @bp.route('/users/<email>/logs', methods=['GET'])
 @require_admin
+@conditional_get("users", "logs")
 def get_user_logs(email: str):
     """Get user-specific logs
 
     Query parameters:
         - page: Page number (default: 1)
         - limit: Items per page (default: 25)
+        - cursor: next_cursor from the previous response; takes precedence over page
+        - count: 'estimated' (default), 'planned' or 'exact'
     """
     try:
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 25))
         offset = (page - 1) * limit
+        cursor = request.args.get('cursor')
+        count_mode = parse_count_mode(request.args.get('count'))
 
         supabase_service = get_supabase_service()
 
-        result = supabase_service.get_user_tasks(email, offset, limit)
+        try:
+            result = supabase_service.get_user_tasks(
+                email, offset, limit, cursor=cursor, count=count_mode)
+        except ValueError as ve:
+            return jsonify({
+                "error": "Bad Request",
+                "message": str(ve)
+            }), 400
 
         return jsonify({
             "data": result['data'],
             "count": result['count'],
             "page": page,
             "limit": limit,
-            "user_email": email
+            "user_email": email,
+            "next_cursor": result['next_cursor']
         }), 200
 
     except Exception as e:
@@ -514,6 +531,107 @@ def get_user_logs(email: str):
         }), 500
 
 
+def _extract_pikpak_ids(action: dict):
+    """Return the (task_id, file_id) PikPak IDs stored in an action row"""
+    data = action.get("data", {}) or {}
+
+    # Extract task and file IDs (handle nested structure)
+    task_wrapper = data.get("task", {})
+    if isinstance(task_wrapper, dict) and "task" in task_wrapper:
+        task_info = task_wrapper.get("task", {})
+        file_info = task_wrapper.get("file", {})
+    else:
+        task_info = task_wrapper
+        file_info = task_wrapper
+
+    p_task_id = task_info.get("id") if isinstance(
+        task_info, dict) else None
+    p_file_id = file_info.get("id") if isinstance(
+        file_info, dict) else None
+
+    # Also check for file_id in task_info
+    if not p_file_id and isinstance(task_info, dict):
+        p_file_id = task_info.get("file_id")
+
+    return p_task_id, p_file_id
+
+
+async def _cleanup_pikpak(pikpak_service, task_ids: list, file_ids: list) -> bool:
+    """Delete PikPak tasks and files of one account concurrently through its shared service
+
+    Anything PikPak reports as not found is treated as already deleted.
+
+    Returns:
+        True if every deletion succeeded
+    """
+    calls, labels = [], []
+    if task_ids:
+        calls.append(pikpak_service.delete_tasks(task_ids))
+        labels.append(f"task(s) {task_ids}")
+    if file_ids:
+        calls.append(pikpak_service.delete_files_forever(file_ids))
+        labels.append(f"file(s) {file_ids}")
+
+    success = True
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    for label, result in zip(labels, results):
+        if not isinstance(result, Exception):
+            continue
+        if "not found" in str(result).lower():
+            logger.info(f"PikPak {label} already not found")
+        else:
+            logger.error(f"Failed to delete PikPak {label}: {result}")
+            success = False
+
+    return success
+
+
+def _delete_actions(actions: list) -> bool:
+    """Remove PikPak content for actions, then the action rows themselves
+
+    Returns:
+        Whether the PikPak cleanup succeeded (rows are deleted either way)
+    """
+    # {account_id: (task_ids, file_ids)}; each pool account deletes its own content
+    by_account = {}
+    for action in actions:
+        p_task_id, p_file_id = _extract_pikpak_ids(action)
+        task_ids, file_ids = by_account.setdefault(account_id_of(action), ([], []))
+        if p_task_id:
+            task_ids.append(p_task_id)
+        if p_file_id:
+            file_ids.append(p_file_id)
+
+    async def _cleanup_all():
+        account_pool = get_account_pool()
+        results = await asyncio.gather(*(
+            _cleanup_pikpak(account_pool.get(account_id), task_ids, file_ids)
+            for account_id, (task_ids, file_ids) in by_account.items()
+            if task_ids or file_ids
+        ))
+        return all(results)
+
+    cleanup_success = True
+    if any(task_ids or file_ids for task_ids, file_ids in by_account.values()):
+        try:
+            cleanup_success = run_async(_cleanup_all())
+        except Exception as e:
+            logger.error(f"Error during PikPak cleanup: {e}")
+            cleanup_success = False
+
+    ids = [action["id"] for action in actions]
+    if not cleanup_success:
+        logger.warning(
+            f"PikPak deletion failed for content of actions {ids}, but proceeding to delete Supabase logs as requested.")
+
+    get_supabase_service().delete_actions_by_ids(ids)
+    cache_manager = get_cache_manager()
+    cache_manager.invalidate_admin_stats()
+    cache_manager.bump_versions("tasks", "logs")
+
+    return cleanup_success
+
+
 @bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 @require_admin
 def delete_task(task_id: int):
@@ -524,75 +642,8 @@ def delete_task(task_id: int):
         # 1. Fetch action details to extract PikPak IDs
         action = supabase_service.get_action_by_id(task_id)
         if action:
-            data = action.get("data", {})
-
-            # Extract task and file IDs (handle nested structure)
-            task_wrapper = data.get("task", {})
-            if isinstance(task_wrapper, dict) and "task" in task_wrapper:
-                task_info = task_wrapper.get("task", {})
-                file_info = task_wrapper.get("file", {})
-            else:
-                task_info = task_wrapper
-                file_info = task_wrapper
-
-            p_task_id = task_info.get("id") if isinstance(
-                task_info, dict) else None
-            p_file_id = file_info.get("id") if isinstance(
-                file_info, dict) else None
-
-            # Also check for file_id in task_info
-            if not p_file_id and isinstance(task_info, dict):
-                p_file_id = task_info.get("file_id")
-
-            # 2. Cleanup PikPak if IDs are found
-            cleanup_success = True
-            if p_task_id or p_file_id:
-                async def _cleanup_pikpak():
-                    success = True
-                    pikpak_service = PikPakService(
-                        AppConfig.PIKPAK_USER,
-                        AppConfig.PIKPAK_PASS
-                    )
-                    if p_task_id:
-                        try:
-                            await pikpak_service.delete_task(p_task_id)
-                        except Exception as e:
-                            # If task not found, we consider it a success (it's already gone)
-                            if "not found" not in str(e).lower():
-                                logger.error(
-                                    f"Failed to delete PikPak task {p_task_id}: {e}")
-                                success = False
-                            else:
-                                logger.info(
-                                    f"Task {p_task_id} already not found in PikPak")
-
-                    if p_file_id:
-                        try:
-                            await pikpak_service.delete_file_forever(p_file_id)
-                        except Exception as e:
-                            # If file not found, we consider it a success
-                            if "not found" not in str(e).lower():
-                                logger.error(
-                                    f"Failed to delete PikPak file {p_file_id}: {e}")
-                                success = False
-                            else:
-                                logger.info(
-                                    f"File {p_file_id} already not found in PikPak")
-
-                    return success
-
-                try:
-                    cleanup_success = run_async(_cleanup_pikpak())
-                except Exception as e:
-                    logger.error(f"Error during PikPak cleanup: {e}")
-                    cleanup_success = False
-
-            if not cleanup_success:
-                logger.warning(
-                    f"PikPak deletion failed for task/file in action {task_id}, but proceeding to delete Supabase log as requested.")
-
-            # 3. Delete the action from Supabase
-            supabase_service.delete_action_by_id(task_id)
+            # 2. Cleanup PikPak and 3. delete the action from Supabase
+            _delete_actions([action])
 
             return jsonify({
                 "message": "Task and associated content deleted successfully",
@@ -613,6 +664,51 @@ def delete_task(task_id: int):
         }), 500
 
 
+@bp.route('/tasks/bulk-delete', methods=['POST'])
+@require_admin
+def bulk_delete_tasks():
+    """Delete many tasks/actions and their PikPak content
+
+    PikPak tasks and files are removed with one batched delete_tasks and
+    one batched delete_forever call, issued concurrently.
+
+    Body:
+        - ids: List of action IDs
+    """
+    try:
+        data = request.get_json()
+        ids = data.get('ids') if data else None
+
+        if not isinstance(ids, list) or len(ids) == 0 \
+                or not all(isinstance(i, int) for i in ids):
+            return jsonify({
+                "error": "Bad Request",
+                "message": "ids must be a non-empty list of integers"
+            }), 400
+
+        actions = get_supabase_service().get_actions_by_ids(list(set(ids)))
+        found = {action["id"] for action in actions}
+        not_found = [i for i in ids if i not in found]
+
+        cleanup_success = _delete_actions(actions) if actions else True
+
+        logger.info(
+            f"Bulk task delete completed: {len(found)} deleted, {len(not_found)} not found")
+
+        return jsonify({
+            "deleted": len(found),
+            "not_found": not_found,
+            "pikpak_cleanup": cleanup_success
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Bulk task delete error: {e}")
+        return jsonify({
+            "error": "Internal server error",
+            "message": "Failed to delete tasks"
+        }), 500
+
+
 # ========================================
 # Analytics
 # ========================================
@@ -622,9 +718,14 @@ def delete_task(task_id: int):
 def get_stats_overview():
     """Get total counts for dashboard overview"""
     try:
-        supabase_service = get_supabase_service()
+        cache_manager = get_cache_manager()
+        stats = cache_manager.get(cache_manager.ADMIN_STATS_KEY)
 
-        stats = supabase_service.get_admin_statistics()
+        if stats is None:
+            supabase_service = get_supabase_service()
+            stats = supabase_service.get_admin_statistics()
+            cache_manager.set(cache_manager.ADMIN_STATS_KEY, stats,
+                              ttl=AppConfig.ADMIN_STATS_CACHE_TTL)
 
         return jsonify(stats), 200
 
@@ -651,9 +752,12 @@ def get_stats_daily():
 
         # Get daily statistics
         daily_stats = supabase_service.get_daily_stats(limit)
+        forecast = forecast_for_stats(
+            daily_stats, pool_limits_quota_info(cached_quota_infos(get_cache_manager())))
 
         return jsonify({
-            "data": daily_stats
+            "data": daily_stats,
+            "forecast": forecast
         }), 200
 
     except Exception as e:
@@ -701,110 +805,18 @@ def bulk_user_action():
                 "message": f"Invalid action '{action}'. Must be one of: {', '.join(sorted(valid_actions))}"
             }), 400
 
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
         current_user = get_current_user()
         current_email = current_user.get('email') if current_user else None
 
-        affected = 0
-        skipped = 0
-        skipped_reasons = []
-
-        for email in emails:
-            if not isinstance(email, str) or not email.strip():
-                skipped += 1
-                skipped_reasons.append({
-                    "email": str(email),
-                    "reason": "Invalid email"
-                })
-                continue
-
-            email = email.strip().lower()
-
-            try:
-                user = user_service.get_user_by_email(email)
-            except Exception:
-                user = None
-
-            if not user:
-                skipped += 1
-                skipped_reasons.append({
-                    "email": email,
-                    "reason": "User not found"
-                })
-                continue
-
-            is_admin_user = user.get('is_admin', False)
-
-            if action in ('block', 'delete') and is_admin_user:
-                skipped += 1
-                skipped_reasons.append({
-                    "email": email,
-                    "reason": "Protected admin user"
-                })
-                continue
-
-            if action == 'delete':
-                if current_email and email == current_email:
-                    skipped += 1
-                    skipped_reasons.append({
-                        "email": email,
-                        "reason": "Cannot delete your own account"
-                    })
-                    continue
-
-                try:
-                    user_service.delete_user(email)
-                    affected += 1
-                except ValueError as ve:
-                    skipped += 1
-                    skipped_reasons.append({
-                        "email": email,
-                        "reason": str(ve)
-                    })
-                except Exception as ue:
-                    logger.error(f"Bulk delete error for {email}: {ue}")
-                    skipped += 1
-                    skipped_reasons.append({
-                        "email": email,
-                        "reason": "Failed to delete user"
-                    })
-                continue
-
-            if action == 'block':
-                try:
-                    user_service.block_user(email)
-                    affected += 1
-                except Exception as e:
-                    logger.error(f"Bulk block error for {email}: {e}")
-                    skipped += 1
-                    skipped_reasons.append({
-                        "email": email,
-                        "reason": "Failed to block user"
-                    })
-                continue
-
-            if action == 'unblock':
-                try:
-                    user_service.unblock_user(email)
-                    affected += 1
-                except Exception as e:
-                    logger.error(f"Bulk unblock error for {email}: {e}")
-                    skipped += 1
-                    skipped_reasons.append({
-                        "email": email,
-                        "reason": "Failed to unblock user"
-                    })
-                continue
+        result = user_service.bulk_user_action(emails, action, current_email)
 
         logger.info(
-            f"Bulk {action} completed: {affected} affected, {skipped} skipped")
+            f"Bulk {action} completed: {result['affected']} affected, {result['skipped']} skipped")
 
         return jsonify({
             "action": action,
-            "affected": affected,
-            "skipped": skipped,
-            "skipped_details": skipped_reasons
+            **result
         }), 200
 
     except Exception as e:
@@ -821,6 +833,7 @@ def bulk_user_action():
 
 @bp.route('/config', methods=['GET'])
 @require_admin
+@conditional_get("config")
 def get_config():
     """Return public-safe configuration values
 
@@ -942,6 +955,7 @@ def update_config():
                 "message": "Failed to save configuration"
             }), 500
 
+        get_cache_manager().bump_versions("config")
         logger.info(f"Config updated: {list(updates.keys())}")
 
         return jsonify({
@@ -1,10 +1,9 @@
 """Authentication API Routes"""
 import logging
 from flask import Blueprint, request, jsonify
-from app.core.auth import create_access_token, get_current_user, require_auth
+from app.core.auth import create_access_token, get_current_user, require_auth, get_token_revocation
 from app.core.config import AppConfig
-from app.api.utils.dependencies import get_supabase_service
-from app.services.user_service import UserService
+from app.api.utils.dependencies import get_user_service
 
 logger = logging.getLogger(__name__)
 
@@ -48,8 +47,7 @@ def register():
             }), 400
 
         # Create user
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         try:
             user = user_service.register_user(email, password)
@@ -61,7 +59,8 @@ def register():
 
         # Generate JWT token
         token = create_access_token(
-            user, AppConfig.JWT_SECRET_KEY, AppConfig.JWT_EXPIRATION_HOURS)
+            user, AppConfig.JWT_SECRET_KEY, AppConfig.JWT_EXPIRATION_HOURS,
+            AppConfig.BLOCKED_CLAIM_TTL_SECONDS)
 
         return jsonify({
             "message": "Registration successful",
@@ -102,8 +101,7 @@ def login():
             }), 400
 
         # Authenticate user
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         user = user_service.authenticate_user(email, password)
 
@@ -122,7 +120,8 @@ def login():
 
         # Generate JWT token
         token = create_access_token(
-            user, AppConfig.JWT_SECRET_KEY, AppConfig.JWT_EXPIRATION_HOURS)
+            user, AppConfig.JWT_SECRET_KEY, AppConfig.JWT_EXPIRATION_HOURS,
+            AppConfig.BLOCKED_CLAIM_TTL_SECONDS)
 
         return jsonify({
             "message": "Login successful",
@@ -145,11 +144,15 @@ def login():
 @bp.route('/logout', methods=['POST'])
 @require_auth
 def logout():
-    """User logout endpoint (client-side token removal)
+    """User logout endpoint
 
-    Note: JWT tokens are stateless, so logout is handled client-side
-    by removing the token from storage.
+    The token is added to the Redis revocation list until it expires; the
+    client should still remove it from storage.
     """
+    revocation_list = get_token_revocation()
+    if revocation_list:
+        revocation_list.revoke_token(get_current_user())
+
     return jsonify({
         "message": "Logout successful",
         "note": "Please remove the token from client storage"
@@ -170,8 +173,7 @@ def get_me():
             }), 401
 
         # Fetch fresh user data from database
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         user = user_service.get_user_by_email(user_data['email'])
 
@@ -217,8 +219,7 @@ def forgot_password():
                 "message": "Email is required"
             }), 400
 
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         # Request password reset (always returns success to prevent user enumeration)
         user_service.request_password_reset(email)
@@ -264,8 +265,7 @@ def reset_password():
                 "message": "Password must be at least 6 characters long"
             }), 400
 
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
+        user_service = get_user_service()
 
         # Reset password
         success = user_service.reset_password(token, new_password)
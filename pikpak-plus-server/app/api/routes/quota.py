@@ -1,15 +1,20 @@
 """Quota and Status Routes"""
 import logging
 import json
+import time
 from datetime import datetime, timedelta, timezone
 import redis
 from flask import Blueprint, jsonify
 from app.core.config import AppConfig
 from app.api.utils.async_helpers import run_async
+from app.api.utils.etag import conditional_get
 from app.api.utils.dependencies import (
     get_pikpak_service,
-    get_cache_manager
+    get_cache_manager,
+    get_redis_client
 )
+from app.services.quota_admission import QuotaAdmission
+from app.utils.circuit_breaker import CircuitOpenError, fallback_key
 
 logger = logging.getLogger(__name__)
 
@@ -155,8 +160,12 @@ async def _handle_cache_miss(cache_key, cache_manager):
 
     # Get both quota types
     pikpak_service = get_pikpak_service()
-    storage_quota = await pikpak_service.get_quota_info()
-    transfer_quota = await pikpak_service.get_transfer_quota()
+    fetched_at = time.time()
+    try:
+        storage_quota = await pikpak_service.get_quota_info()
+        transfer_quota = await pikpak_service.get_transfer_quota()
+    except CircuitOpenError as e:
+        return _handle_open_circuit(e, cache_key, cache_manager)
 
     # Combine the results (cache only the actual quota data, not refresh_info)
     quota_data_to_cache = {
@@ -168,6 +177,10 @@ async def _handle_cache_miss(cache_key, cache_manager):
     # Cache the result for 3 hours (without refresh_info)
     cache_manager.set(cache_key, quota_data_to_cache,
                       ttl=AppConfig.QUOTA_CACHE_TTL)
+    cache_manager.set(fallback_key(cache_key), quota_data_to_cache,
+                      ttl=AppConfig.CIRCUIT_FALLBACK_TTL)
+    cache_manager.bump_versions("quota")
+    QuotaAdmission(get_redis_client()).on_quota_refreshed(fetched_at)
     logger.info("Successfully retrieved and cached quota information (3 hours)")
 
     quota_data = _add_refresh_info(
@@ -176,7 +189,23 @@ async def _handle_cache_miss(cache_key, cache_manager):
     return jsonify(quota_data)
 
 
+def _handle_open_circuit(error, cache_key, cache_manager):
+    """Serve the last known quota while PikPak's quota endpoints fail fast"""
+    last_known = cache_manager.get(fallback_key(cache_key))
+    if last_known is None:
+        logger.warning(f"{error}; no quota to fall back on")
+        response = jsonify({"error": str(error)})
+        response.headers["Retry-After"] = str(max(error.retry_after, 1))
+        return response, 503
+
+    logger.warning(f"{error}; returning last known quota from {last_known.get('cached_at')}")
+    quota_data = _add_refresh_info(last_known, error.retry_after)
+    quota_data["stale"] = True
+    return jsonify(quota_data)
+
+
 @bp.route('/quota', methods=['GET'])
+@conditional_get("quota", "schedule")
 def get_quota():
     """Get storage and transfer quota information with caching (3 hours)"""
     async def _async_get_quota():
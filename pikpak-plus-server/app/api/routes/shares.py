@@ -2,12 +2,17 @@
 import logging
 from flask import Blueprint, request, jsonify
 from app.api.utils.async_helpers import run_async
+from app.api.utils.idempotency import idempotent
+from app.api.utils.rate_limit import rate_limit
 from app.api.utils.dependencies import (
-    get_pikpak_service,
-    get_supabase_service
+    get_account_pool,
+    get_async_supabase_service,
+    get_cache_manager,
+    get_user_service
 )
-from app.core.auth import require_auth, get_current_user
-from app.services.user_service import UserService
+from app.core.auth import require_auth, get_current_user, current_user_blocked
+from app.core.config import AppConfig
+from app.utils.common import is_valid_file_id
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +25,18 @@ def _validate_share_request(data):
     file_id = data.get('id')
     if not file_id:
         return None, (jsonify({"error": "Missing 'id' parameter"}), 400)
+    if not is_valid_file_id(file_id):
+        return None, (jsonify({"error": "Invalid 'id' parameter"}), 400)
     return file_id, None
 
 
-def _check_existing_share(file_id):
+async def _check_existing_share(file_id):
     """Check if a share already exists for the given file_id."""
-    supabase_service = get_supabase_service()
-    if not supabase_service:
+    async_supabase = get_async_supabase_service()
+    if not async_supabase:
         return None
 
-    existing_share = supabase_service.get_existing_share_by_file_id(file_id)
+    existing_share = await async_supabase.get_existing_share_by_file_id(file_id)
     if existing_share:
         logger.info(f"Returning existing share for file: {file_id}")
         return {**existing_share, "is_existing": True}
@@ -37,10 +44,21 @@ def _check_existing_share(file_id):
     return None
 
 
+async def _service_for_file(file_id):
+    """PikPak service of the pool account holding the file."""
+    account_pool = get_account_pool()
+    if len(account_pool) == 1:
+        return account_pool.primary
+
+    async_supabase = get_async_supabase_service()
+    account_id = await async_supabase.get_account_for_file(file_id) if async_supabase else None
+    return account_pool.get(account_id)
+
+
 async def _create_new_share(file_id, need_password, expiration_days):
     """Create a new share link via PikPak API."""
     logger.info(f"Creating new share link for file: {file_id}")
-    pikpak_service = get_pikpak_service()
+    pikpak_service = await _service_for_file(file_id)
     result = await pikpak_service.create_share(
         file_ids=[file_id],
         need_password=need_password,
@@ -50,14 +68,15 @@ async def _create_new_share(file_id, need_password, expiration_days):
     return result
 
 
-def _store_share_globally(file_id, share_data, user_email=None):
+async def _store_share_globally(file_id, share_data, user_email=None):
     """Store share in Supabase for global deduplication and user tracking."""
-    supabase_service = get_supabase_service()
-    if not supabase_service:
+    async_supabase = get_async_supabase_service()
+    if not async_supabase:
         return
 
     try:
-        supabase_service.store_share(file_id, share_data, user_email)
+        await async_supabase.store_share(file_id, share_data, user_email)
+        get_cache_manager().invalidate_admin_stats()
         logger.info(
             f"Stored share in public_actions for file: {file_id} (user: {user_email})")
     except Exception as e:
@@ -66,6 +85,8 @@ def _store_share_globally(file_id, share_data, user_email=None):
 
 @bp.route('/share', methods=['POST'])
 @require_auth
+@idempotent("share")
+@rate_limit("share", AppConfig.SHARE_RATE_LIMIT, AppConfig.RATE_LIMIT_WINDOW_SECONDS)
 def create_share():
     """Create a share link for a file (with global deduplication)"""
     async def _async_create_share():
@@ -77,11 +98,17 @@ def create_share():
 
             user_email = user_data['email']
 
-            # Check if user is blocked
-            supabase_service = get_supabase_service()
-            user_service = UserService(supabase_service)
-
-            if user_service.is_user_blocked(user_email):
+            # Check if user is blocked (resolved by require_auth; one database read
+            # only when Redis can't answer and the token's claim is stale)
+            try:
+                blocked = await current_user_blocked(get_user_service().is_user_blocked_async)
+            except Exception as e:
+                logger.error(f"Could not check blocked status of {user_email}: {e}")
+                return jsonify({
+                    "error": "Authorization unavailable",
+                    "message": "This action is temporarily unavailable, please retry shortly"
+                }), 503
+            if blocked:
                 return jsonify({
                     "error": "Account blocked",
                     "message": "Your account has been blocked. You cannot perform this action."
@@ -101,7 +128,7 @@ def create_share():
             # Requirement says "No change with related to pikpak", so we keep global deduplication logic.
             # But the user might want to track this action even if share exists?
             # For now, let's keep it as is - if share exists, return it.
-            existing_share = _check_existing_share(file_id)
+            existing_share = await _check_existing_share(file_id)
             if existing_share:
                 return jsonify(existing_share)
 
@@ -111,7 +138,7 @@ def create_share():
             result = await _create_new_share(file_id, need_password, expiration_days)
 
             # Store share globally with user email
-            _store_share_globally(file_id, result, user_email)
+            await _store_share_globally(file_id, result, user_email)
 
             return jsonify(result)
         except Exception as e:
@@ -1,56 +1,63 @@
 """Statistics Routes"""
 import logging
 import json
-import redis
-from flask import Blueprint, jsonify, request
-from app.api.utils.dependencies import get_supabase_service
-from app.core.config import AppConfig
+from flask import Blueprint, Response, jsonify, request
+from app.api.utils.dependencies import get_supabase_service, get_cache_manager, get_redis_client
+from app.api.utils.etag import cached_json_response
+from app.services.account_pool import cached_quota_infos, pool_limits_quota_info
+from app.services.statistics_cache import (
+    SCHEDULER_STATUS_KEY,
+    StatisticsPayloadCache,
+    build_statistics_payload,
+    statistics_schedule_info
+)
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('statistics', __name__)
 
 
-def _get_statistics_schedule_info():
-    """Get statistics collection schedule info from Redis"""
+def _get_scheduler_status():
+    """Get the scheduler status blob from Redis"""
     try:
-        redis_client = redis.from_url(
-            AppConfig.REDIS_URL, decode_responses=True)
-        try:
-            scheduler_status_data = redis_client.get("pikpak_scheduler_status")
+        redis_client = get_redis_client()
+        if redis_client:
+            scheduler_status_data = redis_client.get(SCHEDULER_STATUS_KEY)
             if scheduler_status_data:
-                scheduler_info = json.loads(scheduler_status_data)
-                return {
-                    "next_update": scheduler_info.get("next_statistics_collection"),
-                    "last_update": scheduler_info.get("last_statistics_collection"),
-                    "scheduler_running": scheduler_info.get("status") == "running"
-                }
-        finally:
-            redis_client.close()
+                return json.loads(scheduler_status_data)
     except Exception as e:
         logger.error(f"Error getting statistics schedule info: {e}")
 
-    return {
-        "next_update": None,
-        "last_update": None,
-        "scheduler_running": False
-    }
+    return {}
 
 
 @bp.route('/statistics', methods=['GET'])
 def get_statistics():
-    """Get daily statistics history with schedule info"""
+    """Get daily statistics history with schedule info
+
+    Served as-is from the payload precomputed by the statistics job (the
+    variant matching the current scheduler_running flag); responds 304 when
+    If-None-Match carries the current ETag.
+    """
     try:
         limit = int(request.args.get('limit', 30))
-        supabase_service = get_supabase_service()
+        payload_cache = StatisticsPayloadCache(get_redis_client())
+
+        cached = payload_cache.get(limit)
+        if cached is None:
+            # Not precomputed yet (or unsupported limit): build and store it
+            supabase_service = get_supabase_service()
+            stats = supabase_service.get_daily_stats(limit)
+            payload = build_statistics_payload(
+                stats, _get_scheduler_status(),
+                pool_limits_quota_info(cached_quota_infos(get_cache_manager())))
+            cached = payload_cache.store(limit, payload)
 
-        stats = supabase_service.get_daily_stats(limit)
-        schedule_info = _get_statistics_schedule_info()
+        etag, body = cached
+        if request.if_none_match.contains(etag.strip('"')):
+            return Response(status=304, headers={"ETag": etag})
 
-        return jsonify({
-            "data": stats,
-            "schedule": schedule_info
-        })
+        return cached_json_response(etag, body.encode())
     except Exception as e:
         logger.error(f"Failed to fetch statistics: {e}")
         return jsonify({"error": str(e)}), 500
@@ -60,7 +67,7 @@ def get_statistics():
 def get_statistics_status():
     """Get statistics collection schedule status"""
     try:
-        schedule_info = _get_statistics_schedule_info()
+        schedule_info = statistics_schedule_info(_get_scheduler_status())
         return jsonify(schedule_info)
     except Exception as e:
         logger.error(f"Failed to fetch statistics status: {e}")
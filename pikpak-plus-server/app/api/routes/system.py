@@ -2,6 +2,7 @@
 import logging
 from flask import Blueprint, jsonify
 from app.core.config import AppConfig
+from app.api.utils.etag import conditional_get
 from app.api.utils.dependencies import (
     get_pikpak_service,
     get_supabase_service
@@ -14,6 +15,7 @@ bp = Blueprint('system', __name__)
 
 
 @bp.route('/config', methods=['GET'])
+@conditional_get("schedule")
 def get_config():
     """Get public configuration"""
     import json
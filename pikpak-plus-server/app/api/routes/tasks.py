@@ -2,17 +2,27 @@
 import logging
 from flask import Blueprint, request, jsonify
 from app.core.config import AppConfig
-from app.core.auth import require_auth, get_current_user
-from app.services import WhatsLinkService
-from app.services.user_service import UserService
+from app.core.auth import require_auth, get_current_user, current_user_blocked
+from app.services.submission_queue import SubmissionStore, FairQueue, STATUS_QUEUED
+from app.services.quota_admission import QuotaAdmission, REJECTED, reservable_size
+from app.services.account_pool import cached_quota_infos, pool_quota_info
+from app.tasks.jobs.submission_job import process_submission, SUBMISSION_QUEUE
 from app.api.utils.async_helpers import run_async
+from app.api.utils.etag import conditional_get
+from app.api.utils.idempotency import idempotent
+from app.api.utils.rate_limit import rate_limit
 from app.api.utils.dependencies import (
-    get_pikpak_service,
     get_supabase_service,
+    get_async_supabase_service,
+    get_redis_client,
+    get_whatslink_service,
     get_cache_manager,
-    get_scheduler
+    get_account_pool,
+    get_scheduler,
+    get_user_service
 )
 from app.utils.common import extract_magnet_hash, extract_e2dk_hash, validate_link
+from app.utils.pagination import parse_count_mode
 
 logger = logging.getLogger(__name__)
 
@@ -20,27 +30,40 @@ logger = logging.getLogger(__name__)
 bp = Blueprint('tasks', __name__)
 
 
-def check_duplicate_task(url: str):
+async def check_duplicate_task(url: str):
     """Check if a task with the same hash already exists (supports both magnet and E2DK)"""
     # Try to extract magnet hash first
     magnet_hash = extract_magnet_hash(url)
     if magnet_hash:
-        supabase_service = get_supabase_service()
-        return supabase_service.check_existing_task_by_hash(magnet_hash)
-    
+        async_supabase = get_async_supabase_service()
+        return await async_supabase.check_existing_task_by_hash(magnet_hash)
+
     # Try to extract E2DK hash
     e2dk_hash = extract_e2dk_hash(url)
     if e2dk_hash:
-        supabase_service = get_supabase_service()
-        return supabase_service.check_existing_task_by_hash(e2dk_hash)
-    
+        async_supabase = get_async_supabase_service()
+        return await async_supabase.check_existing_task_by_hash(e2dk_hash)
+
     return None
 
 
 @bp.route('/add', methods=['POST'])
 @require_auth
+@idempotent("add")
+@rate_limit("add", AppConfig.ADD_RATE_LIMIT, AppConfig.RATE_LIMIT_WINDOW_SECONDS)
 def add_task():
-    """Add a new download task (magnet or E2DK) with file size validation and user tracking"""
+    """Queue a new download task (magnet or E2DK) with file size validation and user tracking
+
+    The link is validated and deduplicated here, then submitted to PikPak by
+    the submission worker. Links whose known size exceeds the remaining
+    offline transfer quota are rejected; links that only fail to fit next
+    to in-flight submissions are queued with a delay (deferred: true).
+    Other submissions wait in a per-user weighted fair queue. A link that
+    is already queued or being submitted is answered with that submission.
+    Responds 202 with a submission_id; poll
+    GET /submissions/<id> for the outcome,
+    whose response field carries the body this endpoint used to return.
+    """
     async def _async_add_task():
         # Get current user
         user_data = get_current_user()
@@ -49,11 +72,17 @@ def add_task():
 
         user_email = user_data['email']
 
-        # Check if user is blocked
-        supabase_service = get_supabase_service()
-        user_service = UserService(supabase_service)
-
-        if user_service.is_user_blocked(user_email):
+        # Check if user is blocked (resolved by require_auth; one database read
+        # only when Redis can't answer and the token's claim is stale)
+        try:
+            blocked = await current_user_blocked(get_user_service().is_user_blocked_async)
+        except Exception as e:
+            logger.error(f"Could not check blocked status of {user_email}: {e}")
+            return jsonify({
+                "error": "Authorization unavailable",
+                "message": "This action is temporarily unavailable, please retry shortly"
+            }), 503
+        if blocked:
             return jsonify({
                 "error": "Account blocked",
                 "message": "Your account has been blocked. You cannot perform this action."
@@ -76,7 +105,7 @@ def add_task():
         logger.info(f"Processing {link_type} link: {url}")
 
         # Check for existing task (deduplication)
-        existing_task = check_duplicate_task(url)
+        existing_task = await check_duplicate_task(url)
         if existing_task:
             logger.info(f"Duplicate task found for url {url}")
             return jsonify({
@@ -86,7 +115,7 @@ def add_task():
             })
 
         # Check file size using WhatsLink.info API
-        is_valid, error_msg, file_info = WhatsLinkService.check_file_size_limit(
+        is_valid, error_msg, file_info = await get_whatslink_service().check_file_size_limit(
             url,
             AppConfig.MAX_FILE_SIZE_GB
         )
@@ -98,34 +127,127 @@ def add_task():
                 "file_info": file_info
             }), 400
 
-        # Add to PikPak
-        pikpak_service = get_pikpak_service()
+        # Check the size against the remaining offline transfer quota
+        redis_client = get_redis_client()
+        admission = QuotaAdmission(redis_client)
+        decision, error_msg = admission.check(
+            (file_info or {}).get("size"), pool_quota_info(get_cache_manager()))
+        if decision == REJECTED:
+            logger.warning(f"Transfer quota exceeded for {url}: {error_msg}")
+            return jsonify({
+                "error": error_msg,
+                "file_info": file_info
+            }), 400
+
+        # Dispatch to a pool account and reserve the size against that account's quota
+        size = reservable_size(file_info)
+        quota_infos = cached_quota_infos(get_cache_manager())
+        link_key = extract_magnet_hash(url) or extract_e2dk_hash(url) or url
+        account_id = get_account_pool().pick(link_key, size=size, quota_infos=quota_infos).account_id
+
+        # Hand the PikPak submission to the submission worker; while a
+        # submission of the same link is live, this request joins it instead
+        submission_id = SubmissionStore.new_id()
         try:
-            task_result = await pikpak_service.add_download(url)
+            store = SubmissionStore(redis_client)
+            holder = store.create(user_email, url, file_info,
+                                  submission_id=submission_id, link_key=link_key)
         except Exception as e:
-            return jsonify({"error": f"PikPak Error: {str(e)}"}), 500
-
-        # Log to Supabase with WhatsLink metadata and user email
-        supabase_service.log_action(
-            url, task_result, file_info, user_email=user_email)
+            logger.error(f"Failed to record submission for {url}: {e}")
+            return jsonify({"error": "Submission queue unavailable"}), 503
 
-        # Invalidate cache
-        cache_manager = get_cache_manager()
-        cache_manager.invalidate_tasks()
+        if holder != submission_id:
+            logger.info(f"Link {url} is already queued as submission {holder}")
+            return jsonify({
+                "message": "Task already queued",
+                "submission_id": holder,
+                "status_url": f"/submissions/{holder}",
+                "file_info": file_info
+            }), 202
 
+        quota_reserved = admission.reserve(
+            submission_id, size, quota_infos.get(account_id), account_id=account_id)
+        fair_queue = None
+        try:
+            if quota_reserved:
+                store.update(submission_id, quota_reserved=True, account_id=account_id)
+                # The worker pops whichever queued submission is fairest next
+                fair_queue = FairQueue(redis_client)
+                fair_queue.push(user_email, submission_id, FairQueue.weight_for(user_data))
+                process_submission.apply_async(queue=SUBMISSION_QUEUE)
+            else:
+                process_submission.apply_async(
+                    args=[submission_id], queue=SUBMISSION_QUEUE,
+                    countdown=AppConfig.QUOTA_ADMISSION_DEFER_SECONDS)
+        except Exception as e:
+            logger.error(f"Failed to queue submission for {url}: {e}")
+            if fair_queue:
+                fair_queue.remove(submission_id)
+            admission.release(submission_id, size, account_id=account_id)
+            try:
+                # Frees the link for the client's retry
+                store.fail(submission_id, "Submission queue unavailable", status_code=503)
+            except Exception:
+                pass
+            return jsonify({"error": "Submission queue unavailable"}), 503
+
+        logger.info(f"Queued submission {submission_id} for {url}"
+                    f"{'' if quota_reserved else ' (deferred until quota frees up)'}")
         return jsonify({
-            "message": "Task added successfully",
-            "task": task_result,
+            "message": "Task queued",
+            "submission_id": submission_id,
+            "status_url": f"/submissions/{submission_id}",
+            "deferred": not quota_reserved,
             "file_info": file_info
-        })
+        }), 202
 
     return run_async(_async_add_task())
 
 
+@bp.route('/submissions/<submission_id>', methods=['GET'])
+@require_auth
+def get_submission(submission_id: str):
+    """Get the status of a queued /add submission
+
+    status is one of queued, processing, completed or failed; once final,
+    response and status_code hold what /add would have returned. Queued
+    submissions waiting their fair-queue turn include queue_position.
+    """
+    try:
+        user_data = get_current_user()
+        store = SubmissionStore(get_redis_client())
+        record = store.get(submission_id)
+
+        # Other users' submissions are reported as missing, unless this user
+        # was handed the submission for the same link
+        if record is None or not (user_data.get('is_admin', False)
+                                  or store.can_view(record, user_data['email'])):
+            return jsonify({"error": "Submission not found"}), 404
+
+        view = SubmissionStore.public_view(record)
+        if record['status'] == STATUS_QUEUED:
+            position = FairQueue(get_redis_client()).position(submission_id)
+            if position is not None:
+                view['queue_position'] = position
+        return jsonify(view)
+
+    except Exception as e:
+        logger.error(f"Failed to fetch submission {submission_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @bp.route('/tasks', methods=['GET'])
 @require_auth
+@conditional_get("tasks", per_user=True)
 def get_tasks():
-    """Get paginated list of user's tasks with caching"""
+    """Get paginated list of user's tasks with caching
+
+    Query parameters:
+        - page: Page number (default: 1)
+        - limit: Items per page (default: DEFAULT_PAGE_SIZE)
+        - cursor: next_cursor from the previous response; takes precedence over page
+        - count: 'estimated' (default), 'planned' or 'exact'
+    """
     try:
         # Get current user
         user_data = get_current_user()
@@ -138,15 +260,23 @@ def get_tasks():
         limit = int(request.args.get('limit', AppConfig.DEFAULT_PAGE_SIZE))
         offset = (page - 1) * limit
 
+        cursor = request.args.get('cursor')
+        count_mode = parse_count_mode(request.args.get('count'))
+
         # Fetch user-specific tasks
         supabase_service = get_supabase_service()
-        data = supabase_service.get_user_tasks(user_email, offset, limit)
+        try:
+            data = supabase_service.get_user_tasks(
+                user_email, offset, limit, cursor=cursor, count=count_mode)
+        except ValueError as ve:
+            return jsonify({"error": str(ve)}), 400
 
         result = {
             "data": data["data"],
             "count": data["count"],
             "page": page,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": data["next_cursor"]
         }
 
         return jsonify(result)
@@ -7,6 +7,7 @@ from flask import Blueprint, request, jsonify
 from app.core.config import AppConfig
 from app.core.auth import internal_only
 from app.api.utils.async_helpers import run_async
+from app.api.utils.etag import conditional_get
 from app.api.utils.dependencies import (
     get_pikpak_service,
     get_webdav_manager,
@@ -149,6 +150,7 @@ def modify_webdav_application():
 
 
 @bp.route('/webdav/active-clients', methods=['GET'])
+@conditional_get("webdav", "quota", "schedule")
 def get_active_webdav_clients():
     """
     Get list of active WebDAV clients with TTL info
@@ -2,12 +2,24 @@
 import asyncio
 import nest_asyncio
 
+from app.core.config import AppConfig
+from app.utils.retry_policy import deadline
+
 
 def run_async(coro):
     """
     Helper function to run async coroutines in Flask routes.
     Handles both cases: when event loop is running (gevent) and when it's not.
+
+    PikPak calls made by the coroutine share one REQUEST_DEADLINE, so retries
+    never outlast the gunicorn worker timeout.
     """
+    with deadline(AppConfig.REQUEST_DEADLINE):
+        return _run(coro)
+
+
+def _run(coro):
+    """Run coro to completion on this thread's event loop"""
     try:
         loop = asyncio.get_event_loop()
         # Check if loop is closed
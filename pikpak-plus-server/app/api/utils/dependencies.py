@@ -1,6 +1,8 @@
 """Dependency Injection for API Routes"""
 from typing import Optional
-from app.services import PikPakService, SupabaseService, WebDAVManager
+from app.services import PikPakService, SupabaseService, AsyncSupabaseService, WebDAVManager, WhatsLinkService
+from app.services.user_service import UserService
+from app.services.account_pool import PikPakAccountPool
 from app.utils.common import CacheManager
 
 
@@ -11,6 +13,10 @@ _cache_manager: Optional[CacheManager] = None
 _app_scheduler = None
 _webdav_manager: Optional[WebDAVManager] = None
 _redis_client = None
+_async_supabase_service: Optional[AsyncSupabaseService] = None
+_user_service: Optional[UserService] = None
+_whatslink_service: Optional[WhatsLinkService] = None
+_account_pool: Optional[PikPakAccountPool] = None
 
 
 def init_dependencies(
@@ -19,16 +25,25 @@ def init_dependencies(
     cache: CacheManager,
     scheduler=None,
     webdav_mgr: Optional[WebDAVManager] = None,
-    redis_cli=None
+    redis_cli=None,
+    async_supabase: Optional[AsyncSupabaseService] = None,
+    user_svc: Optional[UserService] = None,
+    whatslink_svc: Optional[WhatsLinkService] = None,
+    account_pool: Optional[PikPakAccountPool] = None
 ):
     """Initialize all service dependencies for routes"""
     global _pikpak_service, _supabase_service, _cache_manager, _app_scheduler, _webdav_manager, _redis_client
+    global _async_supabase_service, _user_service, _whatslink_service, _account_pool
     _pikpak_service = pikpak
     _supabase_service = supabase
     _cache_manager = cache
     _app_scheduler = scheduler
     _webdav_manager = webdav_mgr
     _redis_client = redis_cli
+    _async_supabase_service = async_supabase
+    _user_service = user_svc
+    _whatslink_service = whatslink_svc
+    _account_pool = account_pool or (PikPakAccountPool({pikpak.account_id: pikpak}) if pikpak else None)
 
 
 def get_service(service_name: str):
@@ -36,6 +51,10 @@ def get_service(service_name: str):
     services = {
         'pikpak': _pikpak_service,
         'supabase': _supabase_service,
+        'async_supabase': _async_supabase_service,
+        'user': _user_service,
+        'whatslink': _whatslink_service,
+        'account_pool': _account_pool,
         'cache': _cache_manager,
         'scheduler': _app_scheduler,
         'webdav': _webdav_manager
@@ -48,10 +67,26 @@ def get_pikpak_service() -> Optional[PikPakService]:
     return _pikpak_service
 
 
+def get_account_pool() -> Optional[PikPakAccountPool]:
+    return _account_pool
+
+
 def get_supabase_service() -> Optional[SupabaseService]:
     return _supabase_service
 
 
+def get_async_supabase_service() -> Optional[AsyncSupabaseService]:
+    return _async_supabase_service
+
+
+def get_user_service() -> Optional[UserService]:
+    return _user_service
+
+
+def get_whatslink_service() -> Optional[WhatsLinkService]:
+    return _whatslink_service
+
+
 def get_cache_manager() -> Optional[CacheManager]:
     return _cache_manager
 
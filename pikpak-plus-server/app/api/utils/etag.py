@@ -0,0 +1,141 @@
+"""Conditional GET support for read-heavy endpoints
+
+ETags are derived from content version counters instead of response
+bodies: every write path bumps the version of the resources it touches
+(CacheManager.bump_versions), so a request can be answered with 304 after a
+single HMGET, without running the view. Bodies that do have to be sent are
+gzipped once per ETag and the compressed bytes are cached in Redis.
+"""
+import gzip
+import hashlib
+import logging
+import time
+from functools import wraps
+from typing import Optional
+
+import redis
+from flask import Response, make_response, request
+
+from app.core.auth import get_current_user
+from app.core.config import AppConfig
+from app.utils.common import CONTENT_VERSIONS_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Compressed response bodies keyed by ETag (binary Redis connection)"""
+
+    BODY_PREFIX = "etag_body:"
+    BODY_TTL = 600  # Seconds a compressed body is kept for its ETag
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self._redis_url = redis_url or AppConfig.REDIS_URL
+        self._redis: Optional[redis.Redis] = None
+
+    @property
+    def redis(self) -> redis.Redis:
+        """Lazy Redis connection (bytes, not decoded)"""
+        if self._redis is None:
+            self._redis = redis.from_url(self._redis_url)
+        return self._redis
+
+    def versions(self, resources) -> list:
+        """Current version counters for the given resource names"""
+        try:
+            return self.redis.hmget(CONTENT_VERSIONS_KEY, list(resources))
+        except Exception as e:
+            logger.warning(f"Content version lookup failed: {e}")
+            return None
+
+    def get_body(self, etag: str) -> Optional[bytes]:
+        try:
+            return self.redis.get(f"{self.BODY_PREFIX}{etag}")
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+    def set_body(self, etag: str, body: bytes) -> None:
+        try:
+            self.redis.setex(f"{self.BODY_PREFIX}{etag}", self.BODY_TTL, body)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+
+response_cache = ResponseCache()
+
+
+def _client_accepts_gzip() -> bool:
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+
+def cached_json_response(etag: str, body: bytes, status: int = 200) -> Response:
+    """Build a JSON response for an ETag, serving gzip bytes from the cache
+
+    The Content-Encoding header makes flask_compress leave the body alone.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if not _client_accepts_gzip():
+        return Response(body, status=status, mimetype='application/json', headers=headers)
+
+    compressed = response_cache.get_body(etag)
+    if compressed is None:
+        compressed = gzip.compress(body, compresslevel=6)
+        response_cache.set_body(etag, compressed)
+
+    headers["Content-Encoding"] = "gzip"
+    return Response(compressed, status=status, mimetype='application/json', headers=headers)
+
+
+def conditional_get(*resources: str, max_age: int = 300, per_user: bool = False):
+    """Serve a GET endpoint with version-based ETags and cached compressed bodies
+
+    Args:
+        resources: Content version names whose bumps change the response
+        max_age: Seconds after which the ETag rotates even without a bump,
+            for parts of the body that change without a write (TTLs, schedules)
+        per_user: Include the authenticated user's email in the ETag
+
+    Place below @require_auth / @require_admin so authorization runs first.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            versions = response_cache.versions(resources)
+            if versions is None:
+                return f(*args, **kwargs)
+
+            user = get_current_user() if per_user else None
+
+            parts = [
+                request.path,
+                request.query_string.decode(),
+                (user or {}).get('email', ''),
+                str(int(time.time() // max_age)),
+                *((v or b"0").decode() for v in versions)
+            ]
+            etag = f'"{hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]}"'
+
+            if request.if_none_match.contains(etag.strip('"')):
+                return Response(status=304, headers={"ETag": etag})
+
+            # Another poller may already have produced this exact version
+            if _client_accepts_gzip():
+                compressed = response_cache.get_body(etag)
+                if compressed is not None:
+                    return Response(compressed, mimetype='application/json', headers={
+                        "ETag": etag,
+                        "Cache-Control": "no-cache",
+                        "Vary": "Accept-Encoding",
+                        "Content-Encoding": "gzip"
+                    })
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.mimetype != 'application/json':
+                return response
+
+            return cached_json_response(etag, response.get_data())
+
+        return decorated_function
+    return decorator
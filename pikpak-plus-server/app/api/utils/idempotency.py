@@ -0,0 +1,133 @@
+"""Idempotency-Key support for mutating endpoints
+
+A client that retries a request with the same Idempotency-Key header gets
+the first request's response back instead of triggering another upstream
+submission. The first request claims the key with SET NX (an in-flight
+marker); its final response replaces the marker and is kept for
+IDEMPOTENCY_TTL (IDEMPOTENCY_ERROR_TTL for 4xx answers, which may not hold
+on a later retry). A duplicate arriving while the first request is still
+running gets 409 with Retry-After right away rather than holding a worker
+thread; clients retry it with the same key.
+"""
+import hashlib
+import json
+import logging
+from functools import wraps
+
+from flask import Response, jsonify, make_response, request
+
+from app.api.utils.dependencies import get_redis_client
+from app.core.auth import get_current_user
+from app.core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "idempotency:"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+IN_FLIGHT_TTL = 120  # Seconds; frees the key if the first request's worker dies
+IN_FLIGHT_RETRY_AFTER = 1  # Seconds; Retry-After sent with the 409 for a duplicate in flight
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint() -> str:
+    """Digest of the request body; a reused key with a different body is rejected"""
+    return hashlib.sha256(request.get_data() or b"").hexdigest()
+
+
+def _replay(entry: dict) -> Response:
+    response = Response(entry["body"], status=entry["status"], mimetype='application/json')
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _release(redis_client, key: str) -> None:
+    """Drop the in-flight marker so a retry with the same key is processed again"""
+    try:
+        redis_client.delete(key)
+    except Exception as e:
+        logger.warning(f"Failed to release idempotency key: {e}")
+
+
+def idempotent(scope: str):
+    """Honor the Idempotency-Key header on an endpoint
+
+    Keys are scoped per endpoint and per user (JWT email). Responses with
+    5xx or 429 status are not cached, so the client can retry them; other
+    4xx responses are cached only for IDEMPOTENCY_ERROR_TTL. Redis errors
+    fail open: the request is processed as if it carried no key.
+
+    Place below @require_auth.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            idempotency_key = request.headers.get('Idempotency-Key')
+            redis_client = get_redis_client()
+            if not idempotency_key or not redis_client:
+                return f(*args, **kwargs)
+
+            if len(idempotency_key) > MAX_KEY_LENGTH:
+                return jsonify({"error": "Idempotency-Key is too long"}), 400
+
+            user = get_current_user() or {}
+            key_digest = hashlib.sha256(idempotency_key.encode()).hexdigest()
+            key = f"{KEY_PREFIX}{scope}:{user.get('email', '')}:{key_digest}"
+            fingerprint = _fingerprint()
+
+            try:
+                claimed = redis_client.set(
+                    key, json.dumps({"state": IN_FLIGHT, "fingerprint": fingerprint}),
+                    nx=True, ex=IN_FLIGHT_TTL)
+            except Exception as e:
+                logger.warning(f"Idempotency check unavailable, processing request: {e}")
+                return f(*args, **kwargs)
+
+            if not claimed:
+                try:
+                    raw = redis_client.get(key)
+                except Exception as e:
+                    logger.warning(f"Idempotency check unavailable, processing request: {e}")
+                    return f(*args, **kwargs)
+
+                entry = json.loads(raw) if raw else None
+                if entry is None:
+                    # First request failed and released the key; claim it again
+                    return decorated_function(*args, **kwargs)
+                if entry["fingerprint"] != fingerprint:
+                    return jsonify({
+                        "error": "Idempotency-Key was already used with a different request body"
+                    }), 422
+                if entry["state"] == DONE:
+                    return _replay(entry)
+                response = jsonify({
+                    "error": "A request with this Idempotency-Key is still in progress"
+                })
+                response.status_code = 409
+                response.headers["Retry-After"] = str(IN_FLIGHT_RETRY_AFTER)
+                return response
+
+            try:
+                response = make_response(f(*args, **kwargs))
+            except Exception:
+                _release(redis_client, key)
+                raise
+
+            if response.status_code >= 500 or response.status_code == 429:
+                _release(redis_client, key)
+                return response
+
+            ttl = AppConfig.IDEMPOTENCY_TTL if response.status_code < 400 else AppConfig.IDEMPOTENCY_ERROR_TTL
+            try:
+                redis_client.set(key, json.dumps({
+                    "state": DONE,
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "body": response.get_data(as_text=True)
+                }), ex=ttl)
+            except Exception as e:
+                logger.warning(f"Failed to store idempotent response: {e}")
+            return response
+
+        return decorated_function
+    return decorator
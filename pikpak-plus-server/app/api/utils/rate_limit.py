@@ -0,0 +1,93 @@
+"""Per-user sliding-window rate limits
+
+Each (scope, user) pair keeps a Redis sorted set of its recent request
+timestamps. A request is allowed while fewer than `limit` timestamps fall in
+the last `window` seconds; rejected requests are not recorded, so a client
+that backs off regains capacity as old requests slide out of the window.
+"""
+import logging
+import math
+import time
+import uuid
+from functools import wraps
+
+from flask import jsonify, make_response
+
+from app.api.utils.dependencies import get_redis_client
+from app.core.auth import get_current_user
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "rate_limit:"
+
+# Drop timestamps older than the window, then record this request if under the limit.
+# Returns {1 if allowed else 0, requests in window, oldest timestamp in window}.
+_SLIDING_WINDOW_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1] - ARGV[2])
+local count = redis.call('ZCARD', KEYS[1])
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')[2] or ARGV[1]
+if count >= tonumber(ARGV[3]) then
+    return {0, count, oldest}
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return {1, count + 1, oldest}
+"""
+
+_script = None
+
+
+def _get_script(redis_client):
+    global _script
+    if _script is None:
+        _script = redis_client.register_script(_SLIDING_WINDOW_SCRIPT)
+    return _script
+
+
+def rate_limit(scope: str, limit: int, window: int):
+    """Limit an endpoint to `limit` requests per user per sliding `window` seconds
+
+    Users are identified by their JWT email; admins are exempt. Over-limit
+    requests get 429 with a Retry-After header. Fails open when Redis is
+    unavailable. A limit of 0 or less disables the check.
+
+    Place below @require_auth.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            user = get_current_user() or {}
+            redis_client = get_redis_client()
+            if limit <= 0 or not redis_client or not user.get('email') or user.get('is_admin'):
+                return f(*args, **kwargs)
+
+            now = time.time()
+            key = f"{KEY_PREFIX}{scope}:{user['email']}"
+            try:
+                allowed, count, oldest = _get_script(redis_client)(
+                    keys=[key], args=[now, window, limit, f"{now}:{uuid.uuid4().hex[:8]}"])
+            except Exception as e:
+                logger.warning(f"Rate limit check unavailable for {scope}: {e}")
+                return f(*args, **kwargs)
+
+            if not allowed:
+                retry_after = max(math.ceil(float(oldest) + window - now), 1)
+                logger.info(f"Rate limit hit on {scope} for {user['email']} ({count}/{limit})")
+                response = jsonify({
+                    "error": "Too many requests",
+                    "message": f"Limit is {limit} requests per {window} seconds. "
+                               f"Try again in {retry_after} seconds."
+                })
+                response.status_code = 429
+                response.headers["Retry-After"] = str(retry_after)
+                response.headers["X-RateLimit-Limit"] = str(limit)
+                response.headers["X-RateLimit-Remaining"] = "0"
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            response.headers["X-RateLimit-Limit"] = str(limit)
+            response.headers["X-RateLimit-Remaining"] = str(max(limit - int(count), 0))
+            return response
+
+        return decorated_function
+    return decorator
@@ -18,7 +18,10 @@ def make_celery(app_name=__name__):
             'app.tasks.jobs.cleanup_job',
             'app.tasks.jobs.webdav_job',
             'app.tasks.jobs.statistics_job',
-            'app.tasks.jobs.heartbeat_job'
+            'app.tasks.jobs.heartbeat_job',
+            'app.tasks.jobs.submission_job',
+            'app.tasks.jobs.token_refresh_job',
+            'app.tasks.jobs.blocked_users_job'
         ]
     )
 
@@ -33,6 +36,10 @@ def make_celery(app_name=__name__):
         result_serializer='json',
         broker_connection_retry_on_startup=True,
         beat_schedule=beat_schedule,
+        # /add submissions get their own queue and worker (see docker-compose)
+        task_routes={
+            'app.tasks.jobs.submission_job.process_submission': {'queue': 'submissions'},
+        },
     )
 
     return celery
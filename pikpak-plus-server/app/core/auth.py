@@ -2,14 +2,33 @@
 import bcrypt
 import jwt
 import secrets
+import time
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, g
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Awaitable
 import logging
 
 logger = logging.getLogger(__name__)
 
+# TokenRevocationList shared by require_auth/require_admin (set by init_token_revocation)
+_revocation_list = None
+
+
+def init_token_revocation(revocation_list) -> None:
+    """Register the Redis-backed revocation list used during authorization
+
+    Args:
+        revocation_list: TokenRevocationList instance
+    """
+    global _revocation_list
+    _revocation_list = revocation_list
+
+
+def get_token_revocation():
+    """Get the registered TokenRevocationList (or None)"""
+    return _revocation_list
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt
@@ -42,13 +61,16 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
-def create_access_token(user_data: Dict[str, Any], secret_key: str, expiration_hours: int = 24) -> str:
+def create_access_token(user_data: Dict[str, Any], secret_key: str, expiration_hours: int = 24,
+                        blocked_claim_seconds: int = 900) -> str:
     """Generate a JWT access token
 
     Args:
         user_data: Dictionary containing user information (email, is_admin, etc.)
         secret_key: Secret key for signing the token
         expiration_hours: Token expiration time in hours
+        blocked_claim_seconds: How long the 'blocked' claim may stand in for
+            the Redis blocked set
 
     Returns:
         JWT token string
@@ -56,8 +78,15 @@ def create_access_token(user_data: Dict[str, Any], secret_key: str, expiration_h
     payload = {
         'email': user_data['email'],
         'is_admin': user_data.get('is_admin', False),
+        # Blocked status at issue time; the Redis blocked set overrides it while
+        # the token lives, and it is only trusted on its own until blocked_exp
+        # (see get_current_user)
+        'blocked': user_data.get('blocked', False),
+        'blocked_exp': int(time.time()) + blocked_claim_seconds,
+        'jti': secrets.token_urlsafe(16),
         'exp': datetime.utcnow() + timedelta(hours=expiration_hours),
-        'iat': datetime.utcnow()
+        # Sub-second, so a token issued right after a revocation isn't caught by it
+        'iat': time.time()
     }
 
     token = jwt.encode(payload, secret_key, algorithm='HS256')
@@ -121,19 +150,79 @@ Returns:
 def get_current_user():
     """Decorator helper to extract user from JWT token in request headers
 
+    The token is verified once per request and the claims are kept on
+    flask.g, so later calls from the route are free. Revoked tokens yield
+    None; 'blocked' reflects the Redis blocked set when it is reachable and
+    loaded, and the signed claim otherwise. While the revocation state is
+    unknown, require_admin refuses the token (see revocation_unchecked);
+    once the signed claim is past its blocked_exp as well, state-changing
+    routes look the user up instead (see current_user_blocked).
+
     Returns:
         User data from token or None
     """
+    if '_auth_claims' in g:
+        return g._auth_claims
+
     from app.core.config import AppConfig
 
+    user_data = None
     auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+        user_data = verify_access_token(token, AppConfig.JWT_SECRET_KEY)
+
+    g._auth_unchecked = False
+    g._blocked_unchecked = False
+    if user_data and _revocation_list:
+        state = _revocation_list.check(user_data)
+        if state is None:
+            g._auth_unchecked = True
+            g._blocked_unchecked = not _blocked_claim_fresh(user_data)
+        elif state['revoked']:
+            logger.warning(
+                f"Rejected revoked token for {user_data.get('email')}")
+            user_data = None
+        elif state['blocked'] is None:
+            g._blocked_unchecked = not _blocked_claim_fresh(user_data)
+        else:
+            user_data['blocked'] = state['blocked']
+
+    g._auth_claims = user_data
+    return user_data
 
-    token = auth_header.split(' ')[1]
-    user_data = verify_access_token(token, AppConfig.JWT_SECRET_KEY)
 
-    return user_data
+def _blocked_claim_fresh(claims: Dict[str, Any]) -> bool:
+    """Whether a token's signed 'blocked' claim is recent enough to stand in for the blocked set"""
+    return time.time() < claims.get('blocked_exp', 0)
+
+
+def revocation_unchecked() -> bool:
+    """Whether the current request's token could not be checked against the revocation list"""
+    return g.get('_auth_unchecked', False)
+
+
+def blocked_unchecked() -> bool:
+    """Whether the current user's blocked status is unknown (no loaded blocked set, stale claim)"""
+    return g.get('_blocked_unchecked', False)
+
+
+async def current_user_blocked(lookup: Callable[[str], Awaitable[bool]]) -> bool:
+    """Blocked status of the current user for state-changing routes
+
+    Answered from the Redis blocked set (or a fresh signed claim) when
+    possible; otherwise with one authoritative read through lookup.
+
+    Args:
+        lookup: Coroutine function taking an email, e.g. UserService.is_user_blocked_async
+
+    Returns:
+        True if the user is blocked (errors from lookup propagate)
+    """
+    user = get_current_user() or {}
+    if blocked_unchecked():
+        return await lookup(user.get('email'))
+    return user.get('blocked', False)
 
 
 def require_auth(f):
@@ -184,6 +273,14 @@ def require_admin(f):
                 "message": "Administrator privileges required"
             }), 403
 
+        # A revoked or demoted admin token can't be told apart without Redis; fail closed
+        if revocation_unchecked():
+            logger.warning(f"Refused admin request for {user.get('email')}: revocation state unknown")
+            return jsonify({
+                "error": "Authorization unavailable",
+                "message": "Administrator access is temporarily unavailable, please retry shortly"
+            }), 503
+
         return f(*args, **kwargs)
 
     return decorated_function
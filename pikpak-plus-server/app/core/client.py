@@ -3,12 +3,14 @@ PikPak Client with Redis-based token management
 Simplified for single-server setup with automatic token refresh
 """
 from PikPakAPI import PikPakApi
+from app.core.config import AppConfig
 from app.core.token_manager import get_token_manager
 from typing import Optional
 import os
 
 
-def get_or_create_client(username: str, password: str, proxy: Optional[str] = None) -> PikPakApi:
+def get_or_create_client(username: str, password: str, proxy: Optional[str] = None,
+                         account_id: int = AppConfig.PRIMARY_ACCOUNT_ID) -> PikPakApi:
     """
     Get or create a PikPak client with token management
 
@@ -19,14 +21,16 @@ def get_or_create_client(username: str, password: str, proxy: Optional[str] = No
         username: PikPak username/email
         password: PikPak password
         proxy: Optional proxy URL
+        account_id: Pool account ID whose pikpak_tokens row holds the tokens
 
     Returns:
         PikPakApi client instance with tokens loaded (if available)
     """
-    token_mgr = get_token_manager()
+    token_mgr = get_token_manager(account_id)
 
-    # Create client instance
-    client = PikPakApi(username=username, password=password)
+    # Create client instance; it makes a single attempt per request, retries
+    # happen in PikPakService under the shared RetryPolicy
+    client = PikPakApi(username=username, password=password, request_max_retries=1)
 
     # Try to load cached tokens from Supabase
     tokens = token_mgr.get_all_tokens()
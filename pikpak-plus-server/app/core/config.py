@@ -1,9 +1,27 @@
+import json
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def parse_extra_accounts(value: str) -> list:
+    """Parse PIKPAK_EXTRA_ACCOUNTS into (email, password) pairs
+
+    Accepts a JSON list of {"user": ..., "pass": ...} objects, or the short
+    "email:password;email:password" form, where each entry is split on its
+    first ':' only. Passwords containing ';' must use the JSON form.
+    """
+    value = (value or "").strip()
+    if value.startswith("["):
+        return [(entry["user"], entry["pass"]) for entry in json.loads(value)]
+
+    return [
+        tuple(entry.strip().split(":", 1))
+        for entry in value.split(";") if ":" in entry
+    ]
+
+
 class AppConfig:
     """Application configuration"""
     # Flask
@@ -12,6 +30,18 @@ class AppConfig:
     # PikPak
     PIKPAK_USER = os.getenv("USER") or os.getenv("user")
     PIKPAK_PASS = os.getenv("PASSWD") or os.getenv("passwd")
+    PRIMARY_ACCOUNT_ID = 1  # pikpak_tokens row of the USER/PASSWD account
+
+    # Extra pool accounts (see parse_extra_accounts); they take pikpak_tokens ids 2, 3, ...
+    PIKPAK_ACCOUNTS = [(PRIMARY_ACCOUNT_ID, PIKPAK_USER, PIKPAK_PASS)] + [
+        (i, user, password)
+        for i, (user, password) in enumerate(
+            parse_extra_accounts(os.getenv("PIKPAK_EXTRA_ACCOUNTS", "")),
+            start=PRIMARY_ACCOUNT_ID + 1)
+    ]
+    # Accounts whose recent error rate exceeds this are skipped by the dispatcher
+    PIKPAK_POOL_MAX_ERROR_RATE = float(os.getenv("PIKPAK_POOL_MAX_ERROR_RATE", "0.5"))
+    PIKPAK_POOL_STATS_WINDOW = int(os.getenv("PIKPAK_POOL_STATS_WINDOW_SECONDS", "900"))
 
     # Supabase
     SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -26,21 +56,97 @@ class AppConfig:
     TASK_CACHE_TTL = int(os.getenv("TASK_CACHE_TTL_SECONDS", "300"))
     QUOTA_CACHE_TTL = int(
         os.getenv("QUOTA_CACHE_TTL_SECONDS", "10800"))  # Default: 3 hours
+    USER_PROFILE_CACHE_TTL = int(
+        os.getenv("USER_PROFILE_CACHE_TTL_SECONDS", "600"))  # Default: 10 minutes
+    ADMIN_STATS_CACHE_TTL = int(
+        os.getenv("ADMIN_STATS_CACHE_TTL_SECONDS", "30"))  # Default: 30 seconds
+
+    # /statistics payloads precomputed by the statistics job for these limits
+    STATISTICS_CACHE_LIMITS = tuple(
+        int(v) for v in os.getenv("STATISTICS_CACHE_LIMITS", "7,30,90").split(",") if v.strip())
+    # Outlives the hourly job run so a missed run doesn't drop the cache
+    STATISTICS_CACHE_TTL = int(os.getenv("STATISTICS_CACHE_TTL_SECONDS", "7200"))
+
+    # Set by gunicorn_config.py when gunicorn preloads the app in the master
+    PRELOAD_APP = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
 
     # Request Timeout
-    REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "60"))
+    REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "60"))  # Per PikPak attempt
+    # Deadline shared by all PikPak calls of one HTTP request; keep below gunicorn's timeout (30s)
+    REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE_SECONDS", "25"))
+
+    # Retry policy for PikPak calls (see app/utils/retry_policy.py)
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    # A retry is skipped unless at least this much of the deadline is left after the backoff
+    RETRY_MIN_ATTEMPT_SECONDS = float(os.getenv("RETRY_MIN_ATTEMPT_SECONDS", "2"))
+    # Retries allowed as a fraction of requests, plus a floor, per window (all workers)
+    RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+    RETRY_BUDGET_MIN_RETRIES = int(os.getenv("RETRY_BUDGET_MIN_RETRIES", "10"))
+    RETRY_BUDGET_WINDOW = int(os.getenv("RETRY_BUDGET_WINDOW_SECONDS", "60"))
+
+    # Circuit breakers per PikPak endpoint family (see app/utils/circuit_breaker.py)
+    CIRCUIT_BREAKER_FAIL_MAX = int(os.getenv("CIRCUIT_BREAKER_FAIL_MAX", "5"))
+    CIRCUIT_BREAKER_RESET_TIMEOUT = int(os.getenv("CIRCUIT_BREAKER_RESET_TIMEOUT_SECONDS", "60"))
+    # Last known quota / WebDAV clients served while their circuit is open
+    CIRCUIT_FALLBACK_TTL = int(os.getenv("CIRCUIT_FALLBACK_TTL_SECONDS", "604800"))  # 7 days
 
     # PikPak Login
     PIKPAK_LOGIN_INTERVAL = 720  # 12 minutes in seconds (re-login interval)
+    # Background refresh: access tokens are refreshed once this fraction of their
+    # lifetime has passed, checked every TOKEN_REFRESH_CHECK_SECONDS
+    TOKEN_REFRESH_FRACTION = float(os.getenv("TOKEN_REFRESH_FRACTION", "0.5"))
+    TOKEN_REFRESH_CHECK_SECONDS = int(os.getenv("TOKEN_REFRESH_CHECK_SECONDS", "60"))
 
     # File Size Limit (in GB) - using whatslink.info API
     MAX_FILE_SIZE_GB = float(os.getenv("MAX_FILE_SIZE_GB", "25"))
 
+    # WhatsLink lookups: concurrent requests per event loop and Redis cache TTLs
+    WHATSLINK_MAX_CONCURRENCY = int(os.getenv("WHATSLINK_MAX_CONCURRENCY", "4"))
+    WHATSLINK_CACHE_TTL = int(
+        os.getenv("WHATSLINK_CACHE_TTL_SECONDS", "604800"))  # Default: 7 days
+    WHATSLINK_NEGATIVE_CACHE_TTL = int(
+        os.getenv("WHATSLINK_NEGATIVE_CACHE_TTL_SECONDS", "60"))  # Errors/timeouts
+
     # Scheduler Configuration
     TASK_STATUS_UPDATE_INTERVAL_MINUTES = int(
         os.getenv("TASK_STATUS_UPDATE_INTERVAL_MINUTES", "15"))
     CLEANUP_INTERVAL_HOURS = int(os.getenv("CLEANUP_INTERVAL_HOURS", "24"))
 
+    # Adaptive polling of running/pending tasks (see ActiveTaskTracker)
+    TASK_POLL_MIN_SECONDS = int(os.getenv("TASK_POLL_MIN_SECONDS", "30"))
+    TASK_POLL_MAX_SECONDS = int(os.getenv("TASK_POLL_MAX_SECONDS", "900"))
+    # Recently finished tasks scanned for the final state of tasks that left the active list
+    TASK_POLL_FINISHED_LOOKUP = int(os.getenv("TASK_POLL_FINISHED_LOOKUP", "200"))
+
+    # Queued /add submissions: record lifetime and Celery rate limit per worker
+    SUBMISSION_TTL = int(os.getenv("SUBMISSION_TTL_SECONDS", "86400"))
+    SUBMISSION_RATE_LIMIT = os.getenv("SUBMISSION_RATE_LIMIT", "30/m")
+    # Popped submissions not acknowledged within this are put back in the queue
+    SUBMISSION_CLAIM_TIMEOUT = int(os.getenv("SUBMISSION_CLAIM_TIMEOUT_SECONDS", "900"))
+    # Retry delay after a Redis or Supabase error while handling a submission
+    SUBMISSION_ERROR_RETRY_SECONDS = int(os.getenv("SUBMISSION_ERROR_RETRY_SECONDS", "60"))
+
+    # Per-user sliding-window rate limits (requests per window; 0 disables)
+    RATE_LIMIT_WINDOW_SECONDS = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "600"))
+    ADD_RATE_LIMIT = int(os.getenv("ADD_RATE_LIMIT", "30"))
+    SHARE_RATE_LIMIT = int(os.getenv("SHARE_RATE_LIMIT", "60"))
+
+    # Weighted fair queueing of submissions across users (see FairQueue)
+    SUBMISSION_DEFAULT_WEIGHT = float(os.getenv("SUBMISSION_DEFAULT_WEIGHT", "1"))
+    SUBMISSION_ADMIN_WEIGHT = float(os.getenv("SUBMISSION_ADMIN_WEIGHT", "2"))
+
+    # Quota-aware admission for /add (see QuotaAdmission)
+    QUOTA_ADMISSION_ENABLED = os.getenv("QUOTA_ADMISSION_ENABLED", "true").lower() == "true"
+    # Pending reservations expire after this if the submission never settles
+    QUOTA_RESERVATION_TTL = int(os.getenv("QUOTA_RESERVATION_TTL_SECONDS", "3600"))
+    # Deferred submissions retry admission after this many seconds
+    QUOTA_ADMISSION_DEFER_SECONDS = int(os.getenv("QUOTA_ADMISSION_DEFER_SECONDS", "600"))
+
+    # How long responses are replayed for a repeated Idempotency-Key
+    IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    # 4xx answers (validation, blocked, quota) are replayed only briefly
+    IDEMPOTENCY_ERROR_TTL = int(os.getenv("IDEMPOTENCY_ERROR_TTL_SECONDS", "60"))
+
     # Pagination Configuration
     DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "25"))
 
@@ -56,6 +162,11 @@ class AppConfig:
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", os.urandom(64).hex())
     JWT_EXPIRATION_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
+    # How long a token's signed 'blocked' claim is trusted when the Redis
+    # blocked set can't be consulted
+    BLOCKED_CLAIM_TTL_SECONDS = int(os.getenv("BLOCKED_CLAIM_TTL_SECONDS", "900"))
+    # Reload of the Redis blocked set from the users table (heals flushes/evictions)
+    BLOCKED_USERS_SYNC_MINUTES = int(os.getenv("BLOCKED_USERS_SYNC_MINUTES", "10"))
 
     # Password Reset Configuration
     PASSWORD_RESET_TOKEN_EXPIRATION_HOURS = int(
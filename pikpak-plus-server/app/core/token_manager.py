@@ -13,10 +13,15 @@ logger = logging.getLogger(__name__)
 
 
 class TokenManager:
-    """Manages PikPak authentication tokens using Supabase Database"""
+    """Manages PikPak authentication tokens using Supabase Database
 
-    def __init__(self):
+    Each pool account has its own pikpak_tokens row, keyed by account ID
+    (the primary account is row 1).
+    """
+
+    def __init__(self, account_id: int = AppConfig.PRIMARY_ACCOUNT_ID):
         """Initialize token manager with Supabase client"""
+        self.account_id = account_id
         self.supabase = None
         try:
             self.supabase = create_client(
@@ -28,7 +33,7 @@ class TokenManager:
             self.supabase = None
 
     def _get_tokens_row(self) -> Optional[Dict]:
-        """Helper to get the single token row"""
+        """Helper to get this account's token row"""
         if not self.supabase:
             logger.warning(
                 "Supabase client not initialized, cannot get tokens")
@@ -36,7 +41,7 @@ class TokenManager:
         try:
             logger.debug("Fetching tokens from Supabase...")
             response = self.supabase.table('pikpak_tokens').select(
-                '*').eq('id', 1).single().execute()
+                '*').eq('id', self.account_id).single().execute()
             if response.data:
                 logger.info("Successfully retrieved tokens from Supabase")
             else:
@@ -47,13 +52,13 @@ class TokenManager:
             return None
 
     def _update_tokens_row(self, data: Dict):
-        """Helper to update the single token row"""
+        """Helper to update this account's token row"""
         if not self.supabase:
             logger.warning(
                 "Supabase client not initialized, cannot update tokens")
             return
         try:
-            data['id'] = 1  # Enforce singleton
+            data['id'] = self.account_id  # One row per account
             data['updated_at'] = datetime.now(timezone.utc).isoformat()
             self.supabase.table('pikpak_tokens').upsert(data).execute()
             logger.info("Successfully updated tokens in Supabase")
@@ -196,7 +201,7 @@ class TokenManager:
         if not self.supabase:
             return
         try:
-            self.supabase.table('pikpak_tokens').delete().eq('id', 1).execute()
+            self.supabase.table('pikpak_tokens').delete().eq('id', self.account_id).execute()
         except Exception as e:
             print(f"Failed to clear tokens in Supabase: {e}")
 
@@ -214,18 +219,20 @@ class TokenManager:
         self.close()
 
 
-# Global singleton instance
-_token_manager = None
+# One instance per account
+_token_managers: Dict[int, TokenManager] = {}
 
 
-def get_token_manager() -> TokenManager:
+def get_token_manager(account_id: int = AppConfig.PRIMARY_ACCOUNT_ID) -> TokenManager:
     """
-    Get or create the global TokenManager instance
+    Get or create the TokenManager instance for an account
+
+    Args:
+        account_id: Pool account ID (pikpak_tokens row)
 
     Returns:
         TokenManager instance
     """
-    global _token_manager
-    if _token_manager is None:
-        _token_manager = TokenManager()
-    return _token_manager
+    if account_id not in _token_managers:
+        _token_managers[account_id] = TokenManager(account_id)
+    return _token_managers[account_id]
@@ -0,0 +1,184 @@
+"""
+Access Token Revocation
+Redis-backed blocklist so request authorization never needs a database read
+"""
+import time
+import logging
+from typing import Optional, Dict, Any, Iterable, Callable
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationList:
+    """
+    Tracks blocked users and revoked access tokens in Redis.
+
+    All checks for a request are answered by one pipelined round trip:
+    - BLOCKED_EMAILS_KEY: set of blocked user emails (seeded from Supabase on
+      startup and every BLOCKED_USERS_SYNC_MINUTES)
+    - BLOCKED_LOADED_KEY: written together with the set by load_blocked_emails;
+      missing after a flush or eviction, when the set can't be trusted to be complete
+    - VALID_AFTER_KEY: hash email -> unix time (microseconds); tokens issued
+      earlier are rejected (used after password, role changes and account deletion)
+    - REVOKED_JTI_PREFIX + jti: single tokens revoked on logout, expiring with the token
+    """
+
+    BLOCKED_EMAILS_KEY = "auth:blocked_emails"
+    VALID_AFTER_KEY = "auth:tokens_valid_after"
+    BLOCKED_LOADED_KEY = "auth:blocked_emails:loaded"
+    REVOKED_JTI_PREFIX = "auth:revoked_jti:"
+    RESEED_LOCK_KEY = "auth:blocked_emails:reseed_lock"
+    RESEED_LOCK_TTL = 30  # Seconds between reseeds requested by check()
+
+    def __init__(self, redis_client: Optional[redis.Redis],
+                 reseed: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            redis_client: Redis client (None disables every check)
+            reseed: Optional callable that reloads the blocked set from the
+                database; requested by check() when the set isn't loaded
+        """
+        self.redis_client = redis_client
+        self.reseed = reseed
+
+    def check(self, claims: Dict[str, Any]) -> Optional[Dict[str, bool]]:
+        """
+        Look up the revocation state for verified token claims.
+
+        Args:
+            claims: Decoded access token payload
+
+        Returns:
+            {'revoked': bool, 'blocked': bool or None}, or None if Redis is
+            unavailable (callers then fall back to the signed claims alone).
+            'blocked' is None while the blocked set isn't loaded; a reseed
+            is requested in that case.
+        """
+        if not self.redis_client:
+            return None
+
+        email = claims.get('email')
+        jti = claims.get('jti')
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.sismember(self.BLOCKED_EMAILS_KEY, email)
+            pipe.exists(self.BLOCKED_LOADED_KEY)
+            pipe.hget(self.VALID_AFTER_KEY, email)
+            if jti:
+                pipe.exists(f"{self.REVOKED_JTI_PREFIX}{jti}")
+            results = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Token revocation check failed: {e}")
+            return None
+
+        blocked, loaded, valid_after = results[0], results[1], results[2]
+        revoked = bool(results[3]) if jti else False
+
+        if valid_after and self._issued_before(claims.get('iat', 0), valid_after):
+            revoked = True
+
+        if not loaded:
+            self._request_reseed()
+            return {'revoked': revoked, 'blocked': None}
+
+        return {'revoked': revoked, 'blocked': bool(blocked)}
+
+    def _request_reseed(self) -> None:
+        """Ask for the blocked set to be reloaded, at most once per RESEED_LOCK_TTL across processes"""
+        if not self.reseed:
+            return
+
+        try:
+            if not self.redis_client.set(
+                    self.RESEED_LOCK_KEY, "1", nx=True, ex=self.RESEED_LOCK_TTL):
+                return
+            logger.warning("Blocked user set is not loaded, requesting a reseed")
+            self.reseed()
+        except Exception as e:
+            logger.error(f"Failed to request blocked user reseed: {e}")
+
+    @staticmethod
+    def _issued_before(iat, valid_after: str) -> bool:
+        """Whether a token issued at iat predates a user's valid_after time
+
+        Access tokens carry a sub-second iat. Entries written before that
+        hold whole seconds, so tokens issued within that second are rejected
+        too rather than let a revoked one through.
+        """
+        if '.' not in valid_after:
+            return int(float(iat)) <= int(valid_after)
+        return float(iat) < float(valid_after)
+
+    def set_blocked(self, email: str, blocked: bool) -> None:
+        """Add or remove a user from the blocked set"""
+        self.set_blocked_many([email], blocked)
+
+    def set_blocked_many(self, emails: Iterable[str], blocked: bool) -> None:
+        """Add or remove several users from the blocked set in one command"""
+        emails = list(emails)
+        if not self.redis_client or not emails:
+            return
+
+        try:
+            if blocked:
+                self.redis_client.sadd(self.BLOCKED_EMAILS_KEY, *emails)
+            else:
+                self.redis_client.srem(self.BLOCKED_EMAILS_KEY, *emails)
+        except Exception as e:
+            logger.error(f"Failed to update blocked set for {len(emails)} users: {e}")
+
+    def revoke_user_tokens(self, email: str) -> None:
+        """Reject every token issued to a user before now"""
+        self.revoke_users_tokens([email])
+
+    def revoke_users_tokens(self, emails: Iterable[str]) -> None:
+        """Reject every token issued to these users before now"""
+        emails = list(emails)
+        if not self.redis_client or not emails:
+            return
+
+        now = f"{time.time():.6f}"
+        try:
+            self.redis_client.hset(
+                self.VALID_AFTER_KEY, mapping={email: now for email in emails})
+        except Exception as e:
+            logger.error(f"Failed to revoke tokens for {len(emails)} users: {e}")
+
+    def revoke_token(self, claims: Dict[str, Any]) -> None:
+        """Revoke a single token until it would have expired anyway"""
+        jti = claims.get('jti')
+        if not self.redis_client or not jti:
+            return
+
+        ttl = int(claims.get('exp', 0)) - int(time.time())
+        if ttl <= 0:
+            return
+
+        try:
+            self.redis_client.setex(f"{self.REVOKED_JTI_PREFIX}{jti}", ttl, "1")
+        except Exception as e:
+            logger.error(f"Failed to revoke token: {e}")
+
+    def load_blocked_emails(self, emails: Iterable[str]) -> None:
+        """Replace the blocked set with the authoritative list from the database
+
+        The set and BLOCKED_LOADED_KEY are written in one transaction, so
+        check() never sees the sentinel next to a partial set.
+        """
+        if not self.redis_client:
+            return
+
+        emails = list(emails)
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.delete(self.BLOCKED_EMAILS_KEY)
+            if emails:
+                pipe.sadd(self.BLOCKED_EMAILS_KEY, *emails)
+            pipe.set(self.BLOCKED_LOADED_KEY, f"{time.time():.0f}")
+            pipe.execute()
+            logger.info(f"Loaded {len(emails)} blocked users into revocation list")
+        except Exception as e:
+            logger.error(f"Failed to load blocked users: {e}")
@@ -1,4 +1,5 @@
 from .pikpak_service import PikPakService
 from .supabase_service import SupabaseService
+from .async_supabase_service import AsyncSupabaseService
 from .whatslink_service import WhatsLinkService
 from .webdav import WebDAVManager
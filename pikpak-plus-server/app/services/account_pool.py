@@ -0,0 +1,320 @@
+"""PikPak account pool
+
+The primary account (USER/PASSWD, pikpak_tokens row 1) is joined by the
+accounts in PIKPAK_EXTRA_ACCOUNTS, each with its own PikPakService, token
+row and login lock. New downloads are dispatched by weighted rendezvous
+hashing on the link's info hash: every account scores the link, weighted by
+its share of remaining offline transfer quota and its recent success rate,
+and the highest score wins. A link therefore keeps landing on the same
+account while that account stays healthy. Accounts that can't fit the file or
+whose recent error rate exceeds PIKPAK_POOL_MAX_ERROR_RATE are skipped.
+
+Deduplication is unchanged: it checks public_actions by info hash before
+dispatch, whichever account holds the task. Each "add" action records its
+account_id so deletes and shares reach the right account. Scheduled jobs
+(status sync, cleanup, statistics) fan out over every account.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import AppConfig
+from app.services.pikpak_service import PikPakService
+from app.services.quota_admission import QuotaAdmission, remaining_offline_transfer
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_QUOTA_CACHE_KEY = "quota_info"  # Kept up to date by /quota
+
+
+def quota_cache_key(account_id: int) -> str:
+    """Cache key holding an account's {'storage', 'transfer', 'cached_at'} snapshot"""
+    if account_id == AppConfig.PRIMARY_ACCOUNT_ID:
+        return PRIMARY_QUOTA_CACHE_KEY
+    return f"{PRIMARY_QUOTA_CACHE_KEY}:{account_id}"
+
+
+def account_id_of(action: Dict[str, Any]) -> int:
+    """Pool account holding an action's PikPak task (rows before the pool belong to the primary)"""
+    data = action.get("data") or {}
+    return int(data.get("account_id") or AppConfig.PRIMARY_ACCOUNT_ID)
+
+
+def cached_quota_infos(cache_manager) -> Dict[int, Optional[Dict[str, Any]]]:
+    """Latest cached quota snapshot of every pool account (None where not cached)"""
+    return {account_id: cache_manager.get(quota_cache_key(account_id))
+            for account_id, _, _ in AppConfig.PIKPAK_ACCOUNTS}
+
+
+def offline_transfer_totals(quota_info: Optional[Dict[str, Any]]) -> Optional[tuple[int, int]]:
+    """(limit, remaining) offline transfer bytes of one account's snapshot, or None if unknown"""
+    remaining = remaining_offline_transfer(quota_info)
+    if remaining is None:
+        return None
+    transfer = quota_info.get("transfer") or {}
+    limit = sum(
+        int(((transfer.get(bucket) or {}).get("offline") or {}).get("total_assets", 0) or 0)
+        for bucket in ("base", "transfer"))
+    return limit, remaining
+
+
+def pool_quota_info(cache_manager) -> Optional[Dict[str, Any]]:
+    """quota_info-shaped snapshot for quota admission
+
+    With a single account this is simply its cached quota_info. With a pool
+    it reports the largest remaining offline transfer of any one account,
+    since a file has to fit on the account it is dispatched to.
+    """
+    infos = cached_quota_infos(cache_manager)
+    if len(infos) == 1:
+        return infos[AppConfig.PRIMARY_ACCOUNT_ID]
+
+    best = None
+    for info in infos.values():
+        totals = offline_transfer_totals(info)
+        if totals and (best is None or totals[1] > best[1]):
+            best = totals
+    if best is None:
+        return None
+
+    limit, remaining = best
+    return {"transfer": {"base": {"offline": {"total_assets": limit, "size": limit - remaining}}}}
+
+
+def pool_limits_quota_info(quota_infos: Dict[int, Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """quota_info-shaped snapshot with the storage and offline transfer limits of the whole pool
+
+    Daily statistics sum usage over every account, so their exhaustion
+    forecasts need the summed limits too. None while any account's snapshot
+    is missing, rather than projecting pool usage against part of the pool.
+
+    Args:
+        quota_infos: Quota snapshot per account (see cached_quota_infos)
+    """
+    if len(quota_infos) == 1:
+        return next(iter(quota_infos.values()))
+    if not quota_infos or any(info is None for info in quota_infos.values()):
+        return None
+
+    storage_limit = sum(
+        int(((info.get("storage") or {}).get("quota") or {}).get("limit", 0) or 0)
+        for info in quota_infos.values())
+    transfer_limit = sum(
+        (offline_transfer_totals(info) or (0, 0))[0] for info in quota_infos.values())
+    return {
+        "storage": {"quota": {"limit": storage_limit}},
+        "transfer": {"base": {"offline": {"total_assets": transfer_limit}}}
+    }
+
+
+class PikPakAccountPool:
+    """PikPakService per pool account, with dispatch and fan-out helpers"""
+
+    STATS_PREFIX = "pikpak_pool:stats:"  # HASH per account and window: ok / error counts
+
+    def __init__(self, services: Dict[int, PikPakService], redis_client=None):
+        self.services = services
+        self.redis_client = redis_client
+
+    @classmethod
+    def from_config(cls, redis_client=None, primary: Optional[PikPakService] = None) -> "PikPakAccountPool":
+        """Build the pool from AppConfig.PIKPAK_ACCOUNTS
+
+        Args:
+            redis_client: Redis client for the shared error-rate counters
+            primary: Existing service for the primary account, reused if given
+        """
+        services = {}
+        for account_id, username, password in AppConfig.PIKPAK_ACCOUNTS:
+            if account_id == AppConfig.PRIMARY_ACCOUNT_ID and primary is not None:
+                services[account_id] = primary
+            else:
+                services[account_id] = PikPakService(username, password, account_id=account_id)
+        if len(services) > 1:
+            logger.info(f"PikPak account pool initialized with {len(services)} accounts")
+        return cls(services, redis_client)
+
+    @property
+    def primary(self) -> PikPakService:
+        return self.services[AppConfig.PRIMARY_ACCOUNT_ID]
+
+    def get(self, account_id: Optional[int]) -> PikPakService:
+        """Service for an account; unknown IDs (e.g. a removed account) fall back to the primary"""
+        service = self.services.get(account_id or AppConfig.PRIMARY_ACCOUNT_ID)
+        if service is None:
+            logger.warning(f"PikPak account {account_id} is not configured, using the primary account")
+            return self.primary
+        return service
+
+    def __len__(self) -> int:
+        return len(self.services)
+
+    def _stats_keys(self, account_id: int) -> List[str]:
+        """Keys of the current and previous stats windows"""
+        window = int(time.time() // AppConfig.PIKPAK_POOL_STATS_WINDOW)
+        return [f"{self.STATS_PREFIX}{account_id}:{w}" for w in (window, window - 1)]
+
+    def record_result(self, account_id: int, ok: bool) -> None:
+        """Count a dispatched operation's outcome toward the account's error rate"""
+        if not self.redis_client:
+            return
+        key = self._stats_keys(account_id)[0]
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hincrby(key, "ok" if ok else "error", 1)
+            pipe.expire(key, AppConfig.PIKPAK_POOL_STATS_WINDOW * 2)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record PikPak account {account_id} result: {e}")
+
+    def error_rates(self) -> Dict[int, float]:
+        """Recent error rate of every account (current and previous window)"""
+        rates = {account_id: 0.0 for account_id in self.services}
+        if not self.redis_client:
+            return rates
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for account_id in self.services:
+                for key in self._stats_keys(account_id):
+                    pipe.hmget(key, "ok", "error")
+            results = iter(pipe.execute())
+        except Exception as e:
+            logger.warning(f"Failed to read PikPak account error rates: {e}")
+            return rates
+
+        for account_id in self.services:
+            ok = errors = 0
+            for _ in range(2):
+                ok_count, error_count = next(results)
+                ok += int(ok_count or 0)
+                errors += int(error_count or 0)
+            if ok + errors:
+                rates[account_id] = errors / (ok + errors)
+        return rates
+
+    @staticmethod
+    def _hash_unit(key: str, account_id: int) -> float:
+        """Stable hash of (key, account) mapped into (0, 1)"""
+        digest = hashlib.sha1(f"{key}:{account_id}".encode()).digest()
+        return (int.from_bytes(digest[:8], "big") + 1) / (2 ** 64 + 2)
+
+    def pick(self, link_key: str, size: Optional[int] = None,
+             quota_infos: Optional[Dict[int, Optional[Dict[str, Any]]]] = None) -> PikPakService:
+        """Choose the account for a new download
+
+        Args:
+            link_key: Info hash of the link (or the URL when it has none)
+            size: File size in bytes, if known
+            quota_infos: Cached quota snapshot per account (see cached_quota_infos)
+
+        Returns:
+            The PikPakService to submit the link with
+        """
+        if len(self.services) == 1:
+            return self.primary
+
+        quota_infos = quota_infos or {}
+        error_rates = self.error_rates()
+
+        best_id, best_score = None, -math.inf
+        for account_id in self.services:
+            error_rate = error_rates.get(account_id, 0.0)
+            if error_rate > AppConfig.PIKPAK_POOL_MAX_ERROR_RATE:
+                continue
+
+            totals = offline_transfer_totals(quota_infos.get(account_id))
+            if totals is None:
+                quota_share = 1.0  # Not cached yet; assume full
+            else:
+                limit, remaining = totals
+                if size is not None and size > remaining:
+                    continue
+                quota_share = remaining / limit if limit else 0.0
+
+            weight = quota_share * (1.0 - error_rate)
+            if weight <= 0:
+                continue
+
+            # Weighted rendezvous hashing: score = -weight / ln(h)
+            score = -weight / math.log(self._hash_unit(link_key, account_id))
+            if score > best_score:
+                best_id, best_score = account_id, score
+
+        if best_id is None:
+            # Nothing fits or everything is failing; the least failing account gets it
+            best_id = min(error_rates, key=error_rates.get)
+            logger.warning(f"No PikPak account fits {link_key}, falling back to account {best_id}")
+
+        return self.services[best_id]
+
+    async def gather(self, operation: Callable[[PikPakService], Awaitable[Any]]) -> Dict[int, Any]:
+        """Run operation on every account concurrently
+
+        Returns:
+            {account_id: result or the exception it raised}
+        """
+        ids = list(self.services)
+        results = await asyncio.gather(
+            *(operation(self.services[account_id]) for account_id in ids),
+            return_exceptions=True)
+
+        for account_id, result in zip(ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"PikPak account {account_id} failed: {result}")
+        return dict(zip(ids, results))
+
+    async def ensure_logged_in(self) -> None:
+        """Log every account in; raises if the primary account can't log in"""
+        results = await self.gather(lambda service: service.ensure_logged_in())
+        primary_result = results[AppConfig.PRIMARY_ACCOUNT_ID]
+        if isinstance(primary_result, Exception):
+            raise primary_result
+
+    async def get_offline_tasks(self, phases: Optional[List[str]] = None,
+                                size: int = 10000) -> tuple[List[dict], bool]:
+        """Offline tasks of every account (task IDs are unique across accounts)
+
+        Raises the primary account's error if it fails, so callers keep
+        their rate-limit handling.
+
+        Returns:
+            Tuple of (tasks, whether every account answered)
+        """
+        results = await self.gather(
+            lambda service: service.get_offline_tasks(phases=phases, size=size))
+
+        primary_result = results[AppConfig.PRIMARY_ACCOUNT_ID]
+        if isinstance(primary_result, Exception):
+            raise primary_result
+
+        tasks, complete = [], True
+        for account_id, result in results.items():
+            if isinstance(result, Exception):
+                complete = False
+                continue
+            tasks.extend(result.get('tasks', []))
+        return tasks, complete
+
+    async def refresh_quota_caches(self, cache_manager) -> None:
+        """Cache the quota snapshot of every non-primary account (the primary's is kept by /quota)"""
+        admission = QuotaAdmission(cache_manager.redis_client)
+
+        async def _fetch(service: PikPakService):
+            if service.account_id == AppConfig.PRIMARY_ACCOUNT_ID:
+                return None
+            fetched_at = time.time()
+            storage, transfer = await asyncio.gather(
+                service.get_quota_info(), service.get_transfer_quota())
+            cache_manager.set(quota_cache_key(service.account_id), {
+                "storage": storage,
+                "transfer": transfer,
+                "cached_at": datetime.now(timezone.utc).isoformat()
+            }, ttl=AppConfig.QUOTA_CACHE_TTL)
+            admission.on_quota_refreshed(fetched_at, service.account_id)
+
+        if len(self.services) > 1:
+            await self.gather(_fetch)
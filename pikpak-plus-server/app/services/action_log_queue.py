@@ -0,0 +1,256 @@
+"""Write-behind queue for public_actions inserts
+
+Request handlers push rows onto a Redis stream instead of inserting into
+Supabase directly. A separate writer process (app.tasks.action_log_writer)
+drains the stream in batches, retries failed rows and parks rows that keep
+failing on a dead-letter list. Written rows are deleted from the stream, so
+its length is the backlog of unwritten rows; past MAX_STREAM_LENGTH new rows
+are inserted directly instead of trimming ones not yet written.
+"""
+import json
+import logging
+import socket
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+from app.utils.common import bump_content_versions
+
+logger = logging.getLogger(__name__)
+
+# Append a row unless the backlog of unwritten rows is already at the cap.
+# Returns 1 if queued.
+_ENQUEUE_SCRIPT = """
+if redis.call('XLEN', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('XADD', KEYS[1], '*', 'row', ARGV[2])
+return 1
+"""
+
+
+class ActionLogQueue:
+    """Producer side of the public_actions write-behind queue"""
+
+    STREAM_KEY = "public_actions:write_queue"
+    DEAD_LETTER_KEY = "public_actions:dead_letter"
+    GROUP_NAME = "public_actions_writers"
+    MAX_STREAM_LENGTH = 100000  # Unwritten rows queued before falling back to direct inserts
+
+    def __init__(self, redis_client: Optional[redis.Redis]):
+        self.redis_client = redis_client
+        self._enqueue = redis_client.register_script(_ENQUEUE_SCRIPT) if redis_client else None
+
+    def enqueue(self, action: str, data: dict, user_email: str = None) -> bool:
+        """Queue a public_actions row for a batched insert
+
+        Args:
+            action: Action type ('add', 'share')
+            data: JSONB payload for the row
+            user_email: Optional email of user who performed the action
+
+        Returns:
+            True if the row was queued, False if the caller should insert directly
+            (no Redis, or the writer has fallen MAX_STREAM_LENGTH rows behind)
+        """
+        if not self._enqueue:
+            return False
+
+        row = {
+            "action": action,
+            "data": data,
+            "user_email": user_email,
+            # Preserve request time; the insert happens up to a second later
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+
+        try:
+            if self._enqueue(keys=[self.STREAM_KEY],
+                             args=[self.MAX_STREAM_LENGTH, json.dumps(row, default=str)]):
+                return True
+            logger.warning(f"Action log queue is full, inserting {action} action directly")
+            return False
+        except Exception as e:
+            logger.warning(f"Failed to queue {action} action, inserting directly: {e}")
+            return False
+
+
+class ActionLogWriter:
+    """Consumer side: batch-inserts queued rows into public_actions"""
+
+    BATCH_SIZE = 500  # Flush after this many rows...
+    FLUSH_INTERVAL = 1.0  # ...or after this many seconds, whichever comes first
+    MAX_DELIVERIES = 5  # Rows failing this many times go to the dead-letter list
+    RECLAIM_IDLE_MS = 30000  # Pending rows idle this long are retried
+
+    def __init__(self, redis_client: redis.Redis, supabase_client, consumer_name: Optional[str] = None):
+        self.redis = redis_client
+        self.supabase = supabase_client
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self._running = False
+
+    def ensure_group(self) -> None:
+        """Create the consumer group (and stream) if missing"""
+        try:
+            self.redis.xgroup_create(
+                ActionLogQueue.STREAM_KEY, ActionLogQueue.GROUP_NAME, id="0", mkstream=True)
+            logger.info("Created action log consumer group")
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def stop(self) -> None:
+        """Ask the run loop to exit after the current batch"""
+        self._running = False
+
+    def run(self) -> None:
+        """Drain the stream until stop() is called"""
+        self.ensure_group()
+        self._running = True
+        logger.info(f"Action log writer started (consumer: {self.consumer_name})")
+
+        while self._running:
+            try:
+                entries = self._reclaim_stale() + self._collect_batch()
+                if entries:
+                    self.flush(entries)
+            except redis.ConnectionError as e:
+                logger.error(f"Redis unavailable for action log writer: {e}")
+                time.sleep(self.FLUSH_INTERVAL)
+            except Exception as e:
+                logger.error(f"Action log writer loop error: {e}", exc_info=True)
+                time.sleep(self.FLUSH_INTERVAL)
+
+        logger.info("Action log writer stopped")
+
+    def _collect_batch(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Read new entries until BATCH_SIZE rows or FLUSH_INTERVAL elapsed"""
+        entries: List[Tuple[str, Dict[str, Any]]] = []
+        deadline = time.monotonic() + self.FLUSH_INTERVAL
+
+        while len(entries) < self.BATCH_SIZE:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+
+            response = self.redis.xreadgroup(
+                ActionLogQueue.GROUP_NAME,
+                self.consumer_name,
+                {ActionLogQueue.STREAM_KEY: ">"},
+                count=self.BATCH_SIZE - len(entries),
+                block=remaining_ms
+            )
+            if not response:
+                break
+
+            for _stream, messages in response:
+                entries.extend(messages)
+
+        return entries
+
+    def _reclaim_stale(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Take over rows whose previous insert attempt never got acknowledged"""
+        try:
+            result = self.redis.xautoclaim(
+                ActionLogQueue.STREAM_KEY,
+                ActionLogQueue.GROUP_NAME,
+                self.consumer_name,
+                min_idle_time=self.RECLAIM_IDLE_MS,
+                start_id="0-0",
+                count=self.BATCH_SIZE
+            )
+        except redis.ResponseError as e:
+            logger.warning(f"Failed to reclaim pending action rows: {e}")
+            return []
+
+        claimed = [entry for entry in result[1] if entry and entry[1]]
+        if not claimed:
+            return []
+
+        return self._dead_letter_exhausted(claimed)
+
+    def _dead_letter_exhausted(self, entries: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Move rows past MAX_DELIVERIES to the dead-letter list; return the rest"""
+        pipe = self.redis.pipeline()
+        for entry_id, _ in entries:
+            pipe.xpending_range(
+                ActionLogQueue.STREAM_KEY,
+                ActionLogQueue.GROUP_NAME,
+                min=entry_id,
+                max=entry_id,
+                count=1
+            )
+        deliveries = {
+            p["message_id"]: p["times_delivered"]
+            for pending in pipe.execute()
+            for p in pending
+        }
+
+        retry = []
+        for entry_id, fields in entries:
+            if deliveries.get(entry_id, 0) >= self.MAX_DELIVERIES:
+                self.redis.rpush(ActionLogQueue.DEAD_LETTER_KEY, fields.get("row", "{}"))
+                self._ack([entry_id])
+                logger.error(f"Moved action row {entry_id} to dead-letter list")
+            else:
+                retry.append((entry_id, fields))
+        return retry
+
+    def flush(self, entries: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Insert a batch; on failure fall back to per-row inserts
+
+        Returns:
+            Number of rows written
+        """
+        rows, ids, bad_ids = [], [], []
+        for entry_id, fields in entries:
+            try:
+                rows.append(json.loads(fields["row"]))
+                ids.append(entry_id)
+            except (KeyError, ValueError):
+                bad_ids.append(entry_id)
+                self.redis.rpush(ActionLogQueue.DEAD_LETTER_KEY, fields.get("row", "{}"))
+
+        if bad_ids:
+            self._ack(bad_ids)
+            logger.error(f"Dead-lettered {len(bad_ids)} malformed action rows")
+
+        if not rows:
+            return 0
+
+        try:
+            self.supabase.table("public_actions").insert(rows).execute()
+            self._ack(ids)
+            bump_content_versions(self.redis, "logs")
+            logger.info(f"Flushed {len(rows)} queued action rows to Supabase")
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"Batch insert of {len(rows)} action rows failed, retrying per row: {e}")
+
+        # One bad row shouldn't hold back the rest of the batch. Rows that
+        # still fail stay pending and are retried via _reclaim_stale().
+        written = 0
+        for entry_id, row in zip(ids, rows):
+            try:
+                self.supabase.table("public_actions").insert(row).execute()
+                self._ack([entry_id])
+                written += 1
+            except Exception as e:
+                logger.error(f"Failed to insert queued action row {entry_id}: {e}")
+
+        if written:
+            bump_content_versions(self.redis, "logs")
+
+        return written
+
+    def _ack(self, ids: List[str]) -> None:
+        """Acknowledge and delete processed entries"""
+        if not ids:
+            return
+        pipe = self.redis.pipeline()
+        pipe.xack(ActionLogQueue.STREAM_KEY, ActionLogQueue.GROUP_NAME, *ids)
+        pipe.xdel(ActionLogQueue.STREAM_KEY, *ids)
+        pipe.execute()
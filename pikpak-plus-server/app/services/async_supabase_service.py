@@ -0,0 +1,73 @@
+"""Async Supabase Service Module
+
+Non-blocking counterpart of SupabaseService for use inside async route
+coroutines and Celery jobs. The queries themselves live in SupabaseQueries;
+this class only supplies the async client and awaits each request, so call
+sites only need to add ``await``.
+"""
+import asyncio
+import logging
+import weakref
+from supabase import acreate_client, AsyncClient
+
+from app.services.supabase_service import (
+    CLIENT,
+    SUPABASE_CLIENT_NOT_INITIALIZED,
+    SupabaseQueries,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSupabaseService(SupabaseQueries):
+    """Service for Supabase operations using the async supabase/postgrest client
+
+    The async client owns an httpx.AsyncClient (HTTP/2 enabled by postgrest),
+    which is bound to the event loop it was created on. One client is created
+    lazily per event loop and then shared by every query issued from that
+    loop, so each worker thread keeps a single pooled connection set.
+    """
+
+    def __init__(self, url: str, key: str, action_queue=None):
+        self.url = url
+        self.key = key
+        # Optional ActionLogQueue for write-behind action/share inserts
+        self.action_queue = action_queue
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+
+    async def get_client(self) -> AsyncClient:
+        """Get (or create) the async client bound to the running event loop"""
+        if not self.url or not self.key:
+            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = await acreate_client(self.url, self.key)
+            # Another coroutine on this loop may have won the race
+            client = self._clients.setdefault(loop, client)
+            logger.debug("Created async Supabase client for event loop")
+        return client
+
+    async def _run(self, plan):
+        """Drive a query plan, awaiting each request (tuples run concurrently)"""
+        response, error = None, None
+        while True:
+            try:
+                request = plan.throw(error) if error is not None else plan.send(response)
+            except StopIteration as done:
+                return done.value
+
+            response, error = None, None
+            try:
+                response = await self._execute(request)
+            except Exception as e:
+                error = e
+
+    async def _execute(self, request):
+        if request is CLIENT:
+            return await self.get_client()
+        if isinstance(request, tuple):
+            return tuple(await asyncio.gather(*(r.execute() for r in request)))
+        return await request.execute()
@@ -4,25 +4,20 @@ import time
 import os
 import json
 import asyncio
-from random import uniform
-from typing import Optional, Dict, Any, Callable, Tuple
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from PikPakAPI import PikPakApi
 from app.core.config import AppConfig
 from app.core.client import get_or_create_client
-from pybreaker import CircuitBreaker
 from app.utils.redis_lock import get_login_lock
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.utils.retry_policy import DeadlineExceeded, bounded, get_retry_policy
 from app.utils.jwt_utils import is_token_expired, decode_token
 
 logger = logging.getLogger(__name__)
 
 PIKPAK_CLIENT_NOT_INITIALIZED = "PikPak client not initialized"
-
-# Circuit breaker for PikPak API calls
-pikpak_breaker = CircuitBreaker(
-    fail_max=5,  # Open circuit after 5 consecutive failures
-    reset_timeout=60,  # Keep circuit open for 60 seconds
-    name="PikPakAPI"
-)
+DEFAULT_CAPTCHA_ACTION = "GET:/drive/v1/about"
 
 
 class RateLimitError(Exception):
@@ -33,14 +28,17 @@ class RateLimitError(Exception):
 class PikPakService:
     """Service for PikPak operations"""
 
-    def __init__(self, username: str, password: str):
+    DELETE_BATCH_SIZE = 100  # IDs per delete_tasks / delete_forever request
+
+    def __init__(self, username: str, password: str, account_id: int = AppConfig.PRIMARY_ACCOUNT_ID):
+        self.account_id = account_id
         self.client: Optional[PikPakApi] = None
         self._last_login_time: float = 0
         self._login_lock = asyncio.Lock()
         try:
             # Use get_or_create_client which handles token management via Supabase
             self.client = get_or_create_client(
-                username=username, password=password)
+                username=username, password=password, account_id=account_id)
             logger.info("PikPak client initialized successfully")
         except Exception as e:
             logger.error(f"PikPak client init failed: {e}")
@@ -58,7 +56,7 @@ class PikPakService:
         if not self.client:
             raise RuntimeError(PIKPAK_CLIENT_NOT_INITIALIZED)
 
-        login_lock = get_login_lock()
+        login_lock = get_login_lock(self.account_id)
 
         # Step 1: Check if we already have a valid token locally
         if not force_refresh and await self._try_use_existing_token():
@@ -87,7 +85,7 @@ class PikPakService:
             logger.warning(
                 "No valid token after cooldown, waiting for lock release")
             if login_lock.is_locked():
-                await login_lock.wait_for_lock_release(timeout_seconds=30)
+                await login_lock.wait_for_lock_release(timeout_seconds=bounded(30))
                 await self._reload_tokens_from_supabase()
                 if await self._try_use_existing_token():
                     await self._ensure_valid_captcha_token()
@@ -104,7 +102,7 @@ class PikPakService:
         if not login_lock.try_acquire():
             # Another worker is logging in, wait for it
             logger.info("Another worker is performing login, waiting...")
-            await login_lock.wait_for_lock_release(timeout_seconds=60)
+            await login_lock.wait_for_lock_release(timeout_seconds=bounded(60))
 
             # Reload tokens after other worker completes
             await self._reload_tokens_from_supabase()
@@ -142,12 +140,6 @@ class PikPakService:
                 # Record successful login in Redis
                 login_lock.set_login_completed()
 
-                # Record token expiration in Redis for other workers
-                if self.client.access_token:
-                    decoded = decode_token(self.client.access_token)
-                    if decoded and decoded.get('exp'):
-                        login_lock.set_token_valid_until(float(decoded['exp']))
-
                 return client
         finally:
             # Always release the distributed lock
@@ -157,7 +149,7 @@ class PikPakService:
         """Reload tokens from Supabase into the client."""
         try:
             from app.core.token_manager import get_token_manager
-            token_mgr = get_token_manager()
+            token_mgr = get_token_manager(self.account_id)
             tokens = token_mgr.get_all_tokens()
 
             if tokens.get('access_token'):
@@ -177,7 +169,7 @@ class PikPakService:
         except Exception as e:
             logger.warning(f"Failed to reload tokens from Supabase: {e}")
 
-    async def _ensure_valid_captcha_token(self, action: str = "GET:/drive/v1/about") -> None:
+    async def _ensure_valid_captcha_token(self, action: str = DEFAULT_CAPTCHA_ACTION) -> None:
         """
         Ensure client has a valid captcha token before API calls.
 
@@ -196,6 +188,16 @@ class PikPakService:
                 logger.debug(f"Captcha token is valid for action: {action}")
                 return
 
+        # Use the captcha token shared by another worker (or pre-generated by the refresh job)
+        login_lock = get_login_lock(self.account_id)
+        shared = login_lock.get_captcha_token(action)
+        if shared and time.time() < (shared['expires_at'] - 30):
+            self.client.captcha_tokens[action] = shared
+            self.client.captcha_token = shared['token']
+            self.client.captcha_expires_at = shared['expires_at']
+            logger.debug(f"Using shared captcha token for action: {action}")
+            return
+
         logger.info(
             f"Captcha token missing or expired for action: {action}, generating new one...")
         try:
@@ -203,9 +205,11 @@ class PikPakService:
             self._extract_user_id_from_token()
 
             # Generate a new captcha token for the specific action
-            await self.client._get_valid_captcha_token(action=action)
+            await self._execute_protected(
+                circuit_breaker.AUTH, self.client._get_valid_captcha_token, action=action)
             logger.info(
                 f"Captcha token generated successfully for action: {action}")
+            self._publish_captcha_token(action)
         except Exception as e:
             logger.error(
                 f"Failed to generate captcha token for action {action}: {e}")
@@ -252,7 +256,12 @@ class PikPakService:
             return True
 
         logger.info(
-            "Access token expired or expiring soon, checking refresh token...")
+            "Access token expired or expiring soon, checking published token...")
+
+        # The refresh job (or another worker) normally has a newer token ready
+        if self._adopt_published_tokens():
+            logger.info("Using token refreshed by another worker")
+            return True
 
         if not self.client.refresh_token:
             logger.info("No refresh token available, will attempt login")
@@ -273,7 +282,7 @@ class PikPakService:
         try:
             # Clear TokenManager
             from app.core.token_manager import get_token_manager
-            token_mgr = get_token_manager()
+            token_mgr = get_token_manager(self.account_id)
             token_mgr.clear_tokens()
 
             # Reset client state
@@ -285,6 +294,9 @@ class PikPakService:
             self.client.captcha_tokens = {}  # Clear action-specific captcha tokens
             self.client.user_id = None
 
+            # Don't let other workers adopt the tokens being replaced
+            get_login_lock(self.account_id).clear_published()
+
         except Exception as e:
             logger.error(f"Failed to clear persistence: {e}")
 
@@ -292,18 +304,10 @@ class PikPakService:
         """Perform full login and save tokens"""
         try:
             logger.info("Performing PikPak login...")
-            await self.client.login()
+            await self._execute_protected(circuit_breaker.AUTH, self.client.login)
 
-            # Save new tokens to Supabase (access, refresh, user_id)
-            # Note: Captcha tokens are managed locally (short-lived, ~5 mins)
-            from app.core.token_manager import get_token_manager
-            token_mgr = get_token_manager()
-
-            token_mgr.set_tokens(
-                access_token=self.client.access_token,
-                refresh_token=self.client.refresh_token,
-                user_id=self.client.user_id
-            )
+            # Save new tokens to Supabase and publish them to other workers
+            self._save_tokens()
             logger.info("Updated tokens in Supabase after login")
 
             return self.client
@@ -314,7 +318,7 @@ class PikPakService:
             # If rate limited, set a global cooldown to stop ALL workers
             if "too frequent" in error_msg or "rate limit" in error_msg:
                 from app.utils.redis_lock import get_login_lock
-                login_lock = get_login_lock()
+                login_lock = get_login_lock(self.account_id)
                 login_lock.set_rate_limit_cooldown()
 
                 # Raise a specific error that should NOT be retried immediately
@@ -332,29 +336,162 @@ class PikPakService:
 
         try:
             logger.info("Attempting to refresh access token...")
-            await self.client.refresh_access_token()
+            await self._execute_protected(circuit_breaker.AUTH, self.client.refresh_access_token)
 
-            # Save refreshed tokens to Supabase
-            from app.core.token_manager import get_token_manager
-            token_mgr = get_token_manager()
-            token_mgr.set_tokens(
-                access_token=self.client.access_token,
-                refresh_token=self.client.refresh_token
-            )
+            # Save refreshed tokens to Supabase and publish them to other workers
+            self._save_tokens()
             logger.info("Successfully refreshed and saved tokens to Supabase")
 
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.warning(
                 f"Token refresh failed: {e}, attempting full login...")
             # If refresh fails, try full login
             await self.ensure_logged_in(force_refresh=True)
 
-    async def _execute_protected(self, operation: Callable, *args, **kwargs) -> Any:
-        """Execute operation with circuit breaker and timeout protection"""
-        @pikpak_breaker
+    def _save_tokens(self) -> None:
+        """Save the client's tokens to Supabase and publish them to other workers"""
+        from app.core.token_manager import get_token_manager
+        self._extract_user_id_from_token()
+        get_token_manager(self.account_id).set_tokens(
+            access_token=self.client.access_token,
+            refresh_token=self.client.refresh_token,
+            user_id=self.client.user_id
+        )
+
+        decoded = decode_token(self.client.access_token) if self.client.access_token else None
+        if decoded and decoded.get('exp'):
+            get_login_lock(self.account_id).publish_tokens(
+                self.client.access_token, self.client.refresh_token,
+                self.client.user_id, float(decoded['exp']))
+
+    def _adopt_published_tokens(self) -> bool:
+        """
+        Take over a newer token published by another worker.
+
+        Returns:
+            True if a published token that isn't expiring soon was adopted
+        """
+        published = get_login_lock(self.account_id).get_published_tokens()
+        if not published or published['access_token'] == self.client.access_token:
+            return False
+        if is_token_expired(published['access_token'], buffer_seconds=300):
+            return False
+
+        self.client.access_token = published['access_token']
+        self.client.refresh_token = published['refresh_token']
+        self.client.user_id = published['user_id']
+        self._extract_user_id_from_token()
+        return True
+
+    def _publish_captcha_token(self, action: str) -> None:
+        """Share the client's captcha token for an action with other workers"""
+        captcha_info = self.client.captcha_tokens.get(action)
+        # Captcha meta carries the user ID; one generated without it is useless to others
+        if captcha_info and self.client.user_id:
+            get_login_lock(self.account_id).publish_captcha_token(
+                action, captcha_info['token'], captcha_info['expires_at'])
+
+    @staticmethod
+    def _refresh_due(access_token: str) -> bool:
+        """Whether TOKEN_REFRESH_FRACTION of the token's lifetime has passed"""
+        decoded = decode_token(access_token)
+        if not decoded or not decoded.get('exp'):
+            return True
+
+        expires_at = float(decoded['exp'])
+        now = time.time()
+        # Always refresh before the token could expire between two checks
+        if expires_at - now <= 2 * AppConfig.TOKEN_REFRESH_CHECK_SECONDS + 300:
+            return True
+        if not decoded.get('iat'):
+            return False
+
+        issued_at = float(decoded['iat'])
+        lifetime = expires_at - issued_at
+        return lifetime > 0 and (now - issued_at) >= lifetime * AppConfig.TOKEN_REFRESH_FRACTION
+
+    async def refresh_in_background(self) -> bool:
+        """
+        Refresh the access token ahead of expiry and pre-generate captcha tokens.
+
+        Called by the token refresh job, so request paths find a published
+        token and captcha token instead of refreshing inline. The refresh
+        happens under the distributed login lock once TOKEN_REFRESH_FRACTION
+        of the token's lifetime has passed; it is skipped while another
+        worker holds the lock or a login cooldown is active.
+
+        Returns:
+            True if the access token was refreshed
+        """
+        if not self.client:
+            raise RuntimeError(PIKPAK_CLIENT_NOT_INITIALIZED)
+
+        login_lock = get_login_lock(self.account_id)
+        self._adopt_published_tokens()
+
+        if not self.client.access_token or not self.client.refresh_token:
+            # No token to refresh yet; log in here rather than on a request path
+            await self.ensure_logged_in()
+            await self._prewarm_captcha_token()
+            return False
+
+        refreshed = False
+        if self._refresh_due(self.client.access_token) and not login_lock.is_in_cooldown() \
+                and login_lock.try_acquire():
+            try:
+                # Another worker may have refreshed while we checked
+                self._adopt_published_tokens()
+                if self._refresh_due(self.client.access_token):
+                    logger.info(f"Refreshing access token of PikPak account {self.account_id} in the background")
+                    await self._execute_protected(
+                        circuit_breaker.AUTH, self.client.refresh_access_token)
+                    self._save_tokens()
+                    refreshed = True
+            except Exception as e:
+                error_msg = str(e).lower()
+                if "too frequent" in error_msg or "rate limit" in error_msg:
+                    login_lock.set_rate_limit_cooldown()
+                    raise RateLimitError(str(e)) from e
+                # The token is still valid; the next run (or a request path) retries
+                logger.warning(f"Background token refresh failed: {e}")
+            finally:
+                login_lock.release()
+
+        await self._prewarm_captcha_token()
+        return refreshed
+
+    async def _prewarm_captcha_token(self, action: str = DEFAULT_CAPTCHA_ACTION) -> None:
+        """Publish a fresh captcha token before the shared one runs out"""
+        shared = get_login_lock(self.account_id).get_captcha_token(action)
+        # Must outlive the next check plus the 30s margin of _ensure_valid_captcha_token
+        if shared and time.time() < shared['expires_at'] - AppConfig.TOKEN_REFRESH_CHECK_SECONDS - 60:
+            return
+
+        self._extract_user_id_from_token()
+        self.client.captcha_tokens.pop(action, None)
+        await self._execute_protected(
+            circuit_breaker.AUTH, self.client._get_valid_captcha_token, action=action)
+        self._publish_captcha_token(action)
+        logger.debug(f"Pre-generated captcha token for action: {action}")
+
+    async def _execute_protected(self, family: str, operation: Callable, *args, **kwargs) -> Any:
+        """Execute operation with its endpoint family's circuit breaker and timeout protection
+
+        The timeout is REQUEST_TIMEOUT, capped by the current request's deadline.
+        """
+        timeout = get_retry_policy().attempt_timeout()
+
         async def protected_operation():
-            return await asyncio.wait_for(operation(*args, **kwargs), timeout=AppConfig.REQUEST_TIMEOUT)
-        return await protected_operation()
+            try:
+                return await asyncio.wait_for(operation(*args, **kwargs), timeout=timeout)
+            except asyncio.TimeoutError:
+                if timeout < AppConfig.REQUEST_TIMEOUT:
+                    # Cut short by the deadline, not a slow endpoint
+                    raise DeadlineExceeded(f"Request deadline exceeded after {timeout:.1f}s") from None
+                raise
+        return await get_circuit_breaker(family, self.account_id).call(protected_operation)
 
     def _is_auth_error(self, error_str: str) -> bool:
         """Check if error is related to authentication"""
@@ -365,7 +502,7 @@ class PikPakService:
             "Unauthorized" in error_str
         )
 
-    async def _try_recover_auth(self, operation: Callable, *args, **kwargs) -> Tuple[bool, Any, Optional[Exception]]:
+    async def _try_recover_auth(self, family: str, operation: Callable, *args, **kwargs) -> Tuple[bool, Any, Optional[Exception]]:
         """
         Attempts to recover from auth error.
         Returns: (success, result, exception_if_failed)
@@ -373,20 +510,20 @@ class PikPakService:
         logger.warning("Auth error encountered. Force refreshing login...")
         try:
             await self.ensure_logged_in(force_refresh=True)
-            return True, await self._execute_protected(operation, *args, **kwargs), None
+            return True, await self._execute_protected(family, operation, *args, **kwargs), None
         except Exception as e:
             return False, None, e
 
-    async def _handle_attempt_exception(self, e: Exception, attempt: int, max_retries: int, operation, *args, **kwargs) -> Tuple[bool, Any, str]:
+    async def _handle_attempt_exception(self, e: Exception, attempt: int, max_retries: int, family: str, operation, *args, **kwargs) -> Tuple[bool, Any, str]:
         error_str = str(e)
         is_last_attempt = (attempt == max_retries - 1)
 
         if self._is_auth_error(error_str):
-            success, result, retry_exc = await self._try_recover_auth(operation, *args, **kwargs)
+            success, result, retry_exc = await self._try_recover_auth(family, operation, *args, **kwargs)
             if success:
                 return True, result, ""
 
-            if is_last_attempt:
+            if is_last_attempt or isinstance(retry_exc, (CircuitOpenError, DeadlineExceeded)):
                 logger.error(f"Retry failed after forced login: {retry_exc}")
                 raise retry_exc
 
@@ -397,43 +534,48 @@ class PikPakService:
 
         return False, None, error_str
 
-    async def _execute_with_retry(self, operation: Callable, *args, max_retries: int = 3, **kwargs) -> Any:
+    async def _execute_with_retry(self, operation: Callable, *args, family: str = circuit_breaker.DRIVE,
+                                  **kwargs) -> Any:
         """
         Execute an operation with exponential backoff retry logic and circuit breaker protection
 
+        Retries follow the shared RetryPolicy: they stop at RETRY_MAX_ATTEMPTS,
+        when the request deadline leaves no room for another attempt, or when
+        the retry budget is spent. An open circuit fails fast with
+        CircuitOpenError instead of being retried.
+
         Args:
             operation: The async operation to execute
-            max_retries: Maximum number of retry attempts (default: 3)
+            family: Upstream endpoint family whose circuit breaker guards the operation
             *args, **kwargs: Arguments to pass to the operation
         """
-        base_delay = 1.0
-        max_delay = 60.0
+        policy = get_retry_policy()
+        policy.record_request()
 
-        for attempt in range(max_retries):
+        for attempt in range(policy.max_attempts):
             try:
                 await self.ensure_logged_in()
-                return await self._execute_protected(operation, *args, **kwargs)
+                return await self._execute_protected(family, operation, *args, **kwargs)
 
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
             except Exception as e:
-                should_return, result, error_str = await self._handle_attempt_exception(e, attempt, max_retries, operation, *args, **kwargs)
+                should_return, result, error_str = await self._handle_attempt_exception(e, attempt, policy.max_attempts, family, operation, *args, **kwargs)
                 if should_return:
                     return result
 
-                # Calculate backoff
-                if "operation is too frequent" in str(e).lower() or "too frequent" in error_str.lower():
-                    delay = 30.0  # Force 30s delay for rate limits
-                    logger.warning("Rate limit detected, backing off for 30s")
-                else:
-                    # Exponential backoff with jitter
-                    delay = min(base_delay * (2 ** attempt), max_delay)
-                jitter = uniform(0, delay * 0.1)
-                total_delay = delay + jitter
+                rate_limited = "too frequent" in str(e).lower() or "too frequent" in error_str.lower()
+                delay = policy.next_delay(attempt, rate_limited=rate_limited)
+                if delay is None:
+                    raise
 
+                if rate_limited:
+                    logger.warning(f"Rate limit detected, backing off for {delay:.0f}s")
                 logger.warning(
-                    f"Attempt {attempt + 1}/{max_retries} failed: {error_str}. "
-                    f"Retrying in {total_delay:.2f}s..."
+                    f"Attempt {attempt + 1}/{policy.max_attempts} failed: {error_str}. "
+                    f"Retrying in {delay:.2f}s..."
                 )
-                await asyncio.sleep(total_delay)
+                await asyncio.sleep(delay)
 
     async def add_download(self, url: str) -> dict:
         """Add a download to PikPak with retry logic"""
@@ -445,7 +587,7 @@ class PikPakService:
             logger.info(f"PikPak Task Result for {url}: {result}")
             return result
 
-        return await self._execute_with_retry(_do_add)
+        return await self._execute_with_retry(_do_add, family=circuit_breaker.TASKS)
 
     async def get_webdav_applications(self) -> dict:
         """Get WebDAV configuration and application list"""
@@ -457,7 +599,7 @@ class PikPakService:
             logger.info("Retrieved WebDAV applications successfully")
             return result
 
-        return await self._execute_with_retry(_do_get_apps)
+        return await self._execute_with_retry(_do_get_apps, family=circuit_breaker.WEBDAV)
 
     async def toggle_webdav(self, enable: bool) -> dict:
         """Toggle WebDAV status"""
@@ -470,7 +612,7 @@ class PikPakService:
                 f"WebDAV toggled to {'enabled' if enable else 'disabled'}")
             return result
 
-        return await self._execute_with_retry(_do_toggle)
+        return await self._execute_with_retry(_do_toggle, family=circuit_breaker.WEBDAV)
 
     async def create_webdav_application(self, application_name: str) -> dict:
         """Create a new WebDAV application"""
@@ -482,7 +624,7 @@ class PikPakService:
             logger.info(f"Created WebDAV application: {application_name}")
             return result
 
-        return await self._execute_with_retry(_do_create)
+        return await self._execute_with_retry(_do_create, family=circuit_breaker.WEBDAV)
 
     async def delete_webdav_application(self, username: str, password: str) -> dict:
         """Delete a WebDAV application"""
@@ -494,7 +636,7 @@ class PikPakService:
             logger.info(f"Deleted WebDAV application: {username}")
             return result
 
-        return await self._execute_with_retry(_do_delete)
+        return await self._execute_with_retry(_do_delete, family=circuit_breaker.WEBDAV)
 
     async def modify_webdav_application(self, username: str, password: str, modify_props: Dict[str, Any]) -> dict:
         """Modify WebDAV application properties"""
@@ -507,25 +649,29 @@ class PikPakService:
                 f"Modified WebDAV application: {username} with props: {modify_props}")
             return result
 
-        return await self._execute_with_retry(_do_modify)
+        return await self._execute_with_retry(_do_modify, family=circuit_breaker.WEBDAV)
+
+    async def get_offline_tasks(self, phases: Optional[List[str]] = None, size: int = 10000) -> dict:
+        """Get offline download tasks from PikPak
 
-    async def get_offline_tasks(self) -> dict:
-        """Get all offline download tasks from PikPak"""
+        Args:
+            phases: Phases to list; defaults to all (running, error, complete, pending)
+            size: Maximum number of tasks returned
+        """
         if not self.client:
             raise RuntimeError(PIKPAK_CLIENT_NOT_INITIALIZED)
 
         async def _do_get_tasks():
-            # Get all tasks (running, error, complete, pending)
             result = await self.client.offline_list(
-                size=10000,
-                phase=["PHASE_TYPE_RUNNING", "PHASE_TYPE_ERROR",
-                       "PHASE_TYPE_COMPLETE", "PHASE_TYPE_PENDING"]
+                size=size,
+                phase=phases or ["PHASE_TYPE_RUNNING", "PHASE_TYPE_ERROR",
+                                 "PHASE_TYPE_COMPLETE", "PHASE_TYPE_PENDING"]
             )
             logger.info(
                 f"Retrieved {len(result.get('tasks', []))} offline tasks from PikPak")
             return result
 
-        return await self._execute_with_retry(_do_get_tasks)
+        return await self._execute_with_retry(_do_get_tasks, family=circuit_breaker.TASKS)
 
     async def get_quota_info(self) -> dict:
         """Get storage quota information from PikPak"""
@@ -537,7 +683,7 @@ class PikPakService:
             logger.info("Retrieved quota info from PikPak")
             return result
 
-        return await self._execute_with_retry(_do_get_quota)
+        return await self._execute_with_retry(_do_get_quota, family=circuit_breaker.DRIVE)
 
     async def get_transfer_quota(self) -> dict:
         """Get transfer quota information from PikPak"""
@@ -549,7 +695,7 @@ class PikPakService:
             logger.info("Retrieved transfer quota from PikPak")
             return result
 
-        return await self._execute_with_retry(_do_get_transfer_quota)
+        return await self._execute_with_retry(_do_get_transfer_quota, family=circuit_breaker.VIP)
 
     async def create_share(self, file_ids: list, need_password: bool = False, expiration_days: int = -1) -> dict:
         """Create a share link for files"""
@@ -565,26 +711,40 @@ class PikPakService:
             logger.info(f"Created share link for {len(file_ids)} file(s)")
             return result
 
-        return await self._execute_with_retry(_do_create_share)
+        return await self._execute_with_retry(_do_create_share, family=circuit_breaker.DRIVE)
 
     async def delete_task(self, task_id: str, delete_files: bool = False):
         """Delete a task from PikPak"""
+        await self.delete_tasks([task_id], delete_files=delete_files)
+
+    async def delete_tasks(self, task_ids: List[str], delete_files: bool = False):
+        """Delete many tasks from PikPak, one request per DELETE_BATCH_SIZE IDs"""
         if not self.client:
             raise RuntimeError(PIKPAK_CLIENT_NOT_INITIALIZED)
 
-        async def _do_delete():
-            await self.client.delete_tasks([task_id], delete_files=delete_files)
-            logger.info(f"Deleted PikPak task: {task_id}")
+        for i in range(0, len(task_ids), self.DELETE_BATCH_SIZE):
+            batch = task_ids[i:i + self.DELETE_BATCH_SIZE]
+
+            async def _do_delete(batch=batch):
+                await self.client.delete_tasks(batch, delete_files=delete_files)
+                logger.info(f"Deleted {len(batch)} PikPak task(s): {batch}")
 
-        await self._execute_with_retry(_do_delete)
+            await self._execute_with_retry(_do_delete, family=circuit_breaker.TASKS)
 
     async def delete_file_forever(self, file_id: str):
         """Delete a file permanently from PikPak"""
+        await self.delete_files_forever([file_id])
+
+    async def delete_files_forever(self, file_ids: List[str]):
+        """Delete many files permanently, one request per DELETE_BATCH_SIZE IDs"""
         if not self.client:
             raise RuntimeError(PIKPAK_CLIENT_NOT_INITIALIZED)
 
-        async def _do_delete():
-            await self.client.delete_forever([file_id])
-            logger.info(f"Deleted PikPak file permanently: {file_id}")
+        for i in range(0, len(file_ids), self.DELETE_BATCH_SIZE):
+            batch = file_ids[i:i + self.DELETE_BATCH_SIZE]
+
+            async def _do_delete(batch=batch):
+                await self.client.delete_forever(batch)
+                logger.info(f"Deleted {len(batch)} PikPak file(s) permanently: {batch}")
 
-        await self._execute_with_retry(_do_delete)
+            await self._execute_with_retry(_do_delete, family=circuit_breaker.DRIVE)
@@ -0,0 +1,199 @@
+"""Quota-aware admission control for offline downloads
+
+Before a link is queued, its known size (from the link itself or WhatsLink)
+is compared against the remaining offline transfer quota in the cached
+quota_info (base + extra, as counted by the statistics job). Links larger
+than the remaining quota are rejected outright. Links that fit the quota but
+not what is left after in-flight submissions are deferred.
+
+Admitted links reserve their size in Redis so concurrent adds can't
+oversubscribe the quota. Each pool account has its own quota and
+reservations; the account is picked first and the link reserved against it:
+- pending reservations (ZSET "<id>:<bytes>" -> expiry) cover submissions
+  that have not reached PikPak yet, and are released if the submission fails
+- settled reservations (ZSET "<id>:<bytes>" -> submitted at) cover
+  submissions PikPak accepted after quota_info was fetched; they are dropped
+  once a newer quota_info snapshot already counts them
+"""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+ADMITTED = "admitted"
+DEFERRED = "deferred"
+REJECTED = "rejected"
+
+# Trim expired reservations, then reserve ARGV[4] bytes if they fit.
+# Returns {1 if reserved else 0, bytes already reserved}.
+_RESERVE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[2])
+local reserved = 0
+for _, key in ipairs(KEYS) do
+    for _, member in ipairs(redis.call('ZRANGE', key, 0, -1)) do
+        reserved = reserved + tonumber(string.match(member, ':(%d+)$') or '0')
+    end
+end
+if reserved + tonumber(ARGV[4]) > tonumber(ARGV[3]) then
+    return {0, reserved}
+end
+redis.call('ZADD', KEYS[1], ARGV[6], ARGV[5])
+return {1, reserved}
+"""
+
+
+def remaining_offline_transfer(quota_info: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Remaining offline transfer bytes (base + extra) from the cached quota_info
+
+    Returns:
+        Remaining bytes, or None when the payload has no usable limit
+    """
+    if not quota_info:
+        return None
+
+    try:
+        transfer = quota_info.get("transfer") or {}
+
+        # Base quota (common for all users)
+        base_offline = (transfer.get("base") or {}).get("offline") or {}
+        base_limit = int(base_offline.get("total_assets", 0) or 0)
+        base_used = int(base_offline.get("size", base_offline.get("assets", 0)) or 0)
+
+        # Extra quota from purchased premium plans (may not exist)
+        extra_offline = (transfer.get("transfer") or {}).get("offline") or {}
+        extra_limit = int(extra_offline.get("total_assets", 0) or 0)
+        extra_used = int(extra_offline.get("assets", 0) or 0)
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.debug(f"Could not read offline transfer quota: {e}")
+        return None
+
+    limit = base_limit + extra_limit
+    if limit <= 0:
+        return None
+    return max(limit - base_used - extra_used, 0)
+
+
+def reservable_size(file_info: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Size to dispatch and reserve a link by; None when only the client's claim backs it
+
+    A magnet's xl= that WhatsLink couldn't confirm (size_verified False) may
+    still reject a link, but must not steer reservations.
+    """
+    file_info = file_info or {}
+    if file_info.get("size_verified") is False:
+        return None
+    return file_info.get("size")
+
+
+class QuotaAdmission:
+    """Admission decisions and Redis reservations against the offline transfer quota"""
+
+    PENDING_KEY = "quota_admission:pending"  # ZSET "<id>:<bytes>" -> expiry (epoch seconds)
+    SETTLED_KEY = "quota_admission:settled"  # ZSET "<id>:<bytes>" -> submitted at (epoch seconds)
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._reserve = redis_client.register_script(_RESERVE_SCRIPT) if redis_client else None
+
+    def _keys(self, account_id: int) -> tuple[str, str]:
+        """Pending and settled keys of a pool account (the primary keeps the unsuffixed keys)"""
+        if account_id == AppConfig.PRIMARY_ACCOUNT_ID:
+            return self.PENDING_KEY, self.SETTLED_KEY
+        return f"{self.PENDING_KEY}:{account_id}", f"{self.SETTLED_KEY}:{account_id}"
+
+    @staticmethod
+    def _member(submission_id: str, size: int) -> str:
+        return f"{submission_id}:{int(size)}"
+
+    def check(self, size: Optional[int], quota_info: Optional[Dict[str, Any]]) -> tuple[str, Optional[str]]:
+        """Decide whether a link can fit the quota, without reserving anything
+
+        Admits when the size or the quota is unknown (fail open, like the
+        WhatsLink size check).
+
+        Returns:
+            Tuple of (decision, error_message); error_message is set when rejected
+        """
+        remaining = remaining_offline_transfer(quota_info)
+        if not AppConfig.QUOTA_ADMISSION_ENABLED or size is None or remaining is None:
+            return ADMITTED, None
+
+        if size > remaining:
+            size_gb = size / (1024 ** 3)
+            remaining_gb = remaining / (1024 ** 3)
+            return REJECTED, (f"File size ({size_gb:.2f} GB) exceeds the remaining offline "
+                              f"transfer quota ({remaining_gb:.2f} GB)")
+        return ADMITTED, None
+
+    def reserve(self, submission_id: str, size: Optional[int],
+                quota_info: Optional[Dict[str, Any]],
+                account_id: int = AppConfig.PRIMARY_ACCOUNT_ID) -> bool:
+        """Reserve size bytes for a submission if the account's quota still covers them
+
+        Args:
+            quota_info: Cached quota snapshot of the account the link is dispatched to
+            account_id: That account; only its own reservations count against it
+
+        Returns:
+            False when in-flight reservations leave too little quota (defer the
+            submission); True otherwise, including when nothing needed reserving
+        """
+        remaining = remaining_offline_transfer(quota_info)
+        if not AppConfig.QUOTA_ADMISSION_ENABLED or not self._reserve \
+                or size is None or remaining is None:
+            return True
+
+        now = time.time()
+        try:
+            reserved, in_flight = self._reserve(
+                keys=list(self._keys(account_id)),
+                args=[now, now - AppConfig.QUOTA_CACHE_TTL, remaining, int(size),
+                      self._member(submission_id, size), now + AppConfig.QUOTA_RESERVATION_TTL])
+        except Exception as e:
+            logger.warning(f"Quota reservation unavailable, admitting {submission_id}: {e}")
+            return True
+
+        if not reserved:
+            logger.info(f"Deferring submission {submission_id}: {size} bytes requested, "
+                        f"{remaining - int(in_flight)} of {remaining} bytes not reserved "
+                        f"on account {account_id}")
+        return bool(reserved)
+
+    def settle(self, submission_id: str, size: Optional[int],
+               account_id: int = AppConfig.PRIMARY_ACCOUNT_ID) -> None:
+        """PikPak accepted the submission; keep its bytes reserved until quota_info catches up"""
+        if not self.redis_client or size is None:
+            return
+        member = self._member(submission_id, size)
+        pending_key, settled_key = self._keys(account_id)
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.zrem(pending_key, member)
+            pipe.zadd(settled_key, {member: time.time()})
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to settle quota reservation for {submission_id}: {e}")
+
+    def release(self, submission_id: str, size: Optional[int],
+                account_id: int = AppConfig.PRIMARY_ACCOUNT_ID) -> None:
+        """The submission will not reach PikPak; free its reservation"""
+        if not self.redis_client or size is None:
+            return
+        try:
+            self.redis_client.zrem(self._keys(account_id)[0], self._member(submission_id, size))
+        except Exception as e:
+            logger.warning(f"Failed to release quota reservation for {submission_id}: {e}")
+
+    def on_quota_refreshed(self, fetched_at: float,
+                           account_id: int = AppConfig.PRIMARY_ACCOUNT_ID) -> None:
+        """Drop settled reservations that the account's quota_info fetched at fetched_at already counts"""
+        if not self.redis_client:
+            return
+        try:
+            self.redis_client.zremrangebyscore(self._keys(account_id)[1], "-inf", fetched_at)
+        except Exception as e:
+            logger.warning(f"Failed to trim settled quota reservations: {e}")
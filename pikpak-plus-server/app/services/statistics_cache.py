@@ -0,0 +1,158 @@
+"""Precomputed /statistics payloads
+
+The statistics job rebuilds the full /statistics response (history,
+predictions, forecast and schedule) for every supported limit each time it
+runs, and stores the serialized body with its ETag in Redis. Since
+schedule.scheduler_running changes between job runs, each limit keeps one
+body per value of the flag; a Lua script picks the one matching the live
+scheduler status, so the endpoint answers with a single round trip and
+returns the stored bytes as-is (or a 304 when the client's ETag matches).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import AppConfig
+from app.services.account_pool import pool_limits_quota_info, quota_cache_key
+from app.utils.forecasting import forecast_for_stats
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_STATUS_KEY = "pikpak_scheduler_status"
+
+
+def statistics_schedule_info(scheduler_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Statistics collection schedule fields from the scheduler status blob"""
+    scheduler_info = scheduler_info or {}
+    return {
+        "next_update": scheduler_info.get("next_statistics_collection"),
+        "last_update": scheduler_info.get("last_statistics_collection"),
+        "scheduler_running": scheduler_info.get("status") == "running"
+    }
+
+
+def build_statistics_payload(stats: list, scheduler_info: Optional[Dict[str, Any]],
+                             quota_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Assemble the /statistics response body"""
+    return {
+        "data": stats,
+        "schedule": statistics_schedule_info(scheduler_info),
+        "forecast": forecast_for_stats(stats, quota_info)
+    }
+
+
+# Return [etag, body] of the variant matching the scheduler status blob in
+# KEYS[2] (scheduler_running is true when its status is "running")
+_GET_SCRIPT = """
+local running = '0'
+local raw = redis.call('GET', KEYS[2])
+if raw then
+    local ok, info = pcall(cjson.decode, raw)
+    if ok and type(info) == 'table' and info['status'] == 'running' then
+        running = '1'
+    end
+end
+return redis.call('HMGET', KEYS[1], 'etag:' .. running, 'body:' .. running)
+"""
+
+
+def _serialize(payload: Dict[str, Any]) -> Tuple[str, str]:
+    """Serialize a payload; returns (etag, body)"""
+    body = json.dumps(payload, default=str, separators=(",", ":"))
+    return f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"', body
+
+
+class StatisticsPayloadCache:
+    """Serialized /statistics bodies and their ETags, one Redis hash per limit
+
+    Each hash holds etag:<r>/body:<r> for scheduler_running r = 0 and 1.
+    """
+
+    KEY_PREFIX = "statistics_payload:"
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._get = redis_client.register_script(_GET_SCRIPT) if redis_client else None
+
+    @staticmethod
+    def supported_limits() -> Tuple[int, ...]:
+        return AppConfig.STATISTICS_CACHE_LIMITS
+
+    def get(self, limit: int) -> Optional[Tuple[str, str]]:
+        """Return (etag, body) for a limit, or None on a miss"""
+        if not self.redis_client or limit not in self.supported_limits():
+            return None
+
+        try:
+            etag, body = self._get(keys=[f"{self.KEY_PREFIX}{limit}", SCHEDULER_STATUS_KEY])
+        except Exception as e:
+            logger.warning(f"Statistics payload cache read failed: {e}")
+            return None
+
+        if etag is None or body is None:
+            return None
+        return etag, body
+
+    def store(self, limit: int, payload: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """Serialize and store a payload in both scheduler_running variants
+
+        Returns:
+            (etag, body) of the variant matching the payload's own flag
+        """
+        schedule = payload.setdefault("schedule", {})
+        running = bool(schedule.get("scheduler_running"))
+        variants = {}
+        for flag in (False, True):
+            schedule["scheduler_running"] = flag
+            variants[flag] = _serialize(payload)
+        schedule["scheduler_running"] = running
+
+        if self.redis_client and limit in self.supported_limits():
+            key = f"{self.KEY_PREFIX}{limit}"
+            mapping = {}
+            for flag, (etag, body) in variants.items():
+                mapping[f"etag:{int(flag)}"] = etag
+                mapping[f"body:{int(flag)}"] = body
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, AppConfig.STATISTICS_CACHE_TTL)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Statistics payload cache write failed: {e}")
+
+        return variants[running]
+
+    async def rebuild(self, supabase_service, quota_info: Optional[Dict[str, Any]] = None) -> None:
+        """Recompute and store the payload for every supported limit
+
+        Args:
+            supabase_service: AsyncSupabaseService bound to the caller's loop
+            quota_info: {'storage': ..., 'transfer': ...} limits of the whole
+                pool; built from the cached quota of every account when not given
+        """
+        if not self.redis_client:
+            return
+
+        try:
+            scheduler_info = json.loads(
+                self.redis_client.get(SCHEDULER_STATUS_KEY) or "{}")
+            if quota_info is None:
+                quota_info = pool_limits_quota_info({
+                    account_id: json.loads(self.redis_client.get(quota_cache_key(account_id)) or "null")
+                    for account_id, _, _ in AppConfig.PIKPAK_ACCOUNTS})
+        except Exception as e:
+            logger.warning(f"Could not read scheduler/quota state for statistics cache: {e}")
+            scheduler_info, quota_info = {}, None
+
+        limits = self.supported_limits()
+        results = await asyncio.gather(
+            *(supabase_service.get_daily_stats(limit=limit) for limit in limits))
+
+        for limit, stats in zip(limits, results):
+            self.store(limit, build_statistics_payload(stats, scheduler_info, quota_info))
+
+        logger.info(f"Rebuilt statistics payload cache for limits {list(limits)}")
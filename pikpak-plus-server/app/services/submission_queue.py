@@ -0,0 +1,291 @@
+"""Queued /add submissions
+
+/add validates and dedups a link, records a submission in Redis and hands
+it to the Celery "submissions" queue, answering 202 right away. The
+submission worker talks to PikPak at the rate it allows and writes the
+final response back to the record, where GET /submissions/<id> picks it up.
+
+Submissions wait in a weighted fair queue rather than in Celery's FIFO
+order: every Celery message pops the submission with the lowest virtual
+finish tag, so a user with a long backlog is served behind a user who only
+just submitted one link. A popped submission stays claimed until the worker
+acknowledges it; claims left behind by a crashed worker are put back at the
+front of the queue after SUBMISSION_CLAIM_TIMEOUT.
+"""
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+FINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+
+
+# Record a submission and claim its link, unless a submission that is still
+# queued or processing holds the link already. ARGV[4] is the record key
+# prefix (the holder's record key is only known here), ARGV[5..] the final
+# statuses. Returns the ID of the submission holding the link.
+_CREATE_SCRIPT = """
+local holder = redis.call('GET', KEYS[2])
+if holder then
+    local raw = redis.call('GET', ARGV[4] .. holder)
+    if raw then
+        local status = cjson.decode(raw)['status']
+        if status ~= ARGV[5] and status ~= ARGV[6] then
+            return holder
+        end
+    end
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[3])
+return ARGV[1]
+"""
+
+# Drop a link claim if the given submission still holds it
+_RELEASE_LINK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Tag = max(virtual time, user's last tag) + 1/weight, as in weighted fair queueing
+_PUSH_SCRIPT = """
+local virtual_time = tonumber(redis.call('GET', KEYS[3]) or '0')
+local last_tag = tonumber(redis.call('ZSCORE', KEYS[2], ARGV[1]) or '0')
+local tag = math.max(virtual_time, last_tag) + 1 / tonumber(ARGV[3])
+redis.call('ZADD', KEYS[2], tag, ARGV[1])
+redis.call('ZADD', KEYS[1], tag, ARGV[2])
+return tostring(tag)
+"""
+
+# Pop the lowest tag, advance the virtual time to it and claim the submission.
+# Last tags at or below the virtual time no longer affect any push (the
+# virtual time wins the max), so users whose queue has drained are dropped.
+_POP_SCRIPT = """
+local item = redis.call('ZPOPMIN', KEYS[1])
+if #item == 0 then
+    return false
+end
+redis.call('SET', KEYS[2], item[2])
+redis.call('ZADD', KEYS[3], ARGV[1], item[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[4], '-inf', item[2])
+return item[1]
+"""
+
+# Move claims made before ARGV[1] back to the front of the queue.
+# Returns the requeued submission IDs.
+_REQUEUE_SCRIPT = """
+local virtual_time = redis.call('GET', KEYS[3]) or '0'
+local stale = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, submission_id in ipairs(stale) do
+    redis.call('ZREM', KEYS[2], submission_id)
+    redis.call('ZADD', KEYS[1], virtual_time, submission_id)
+end
+return stale
+"""
+
+
+class FairQueue:
+    """Weighted fair ordering of queued submissions across users"""
+
+    QUEUE_KEY = "submission_queue:pending"  # ZSET submission_id -> virtual finish tag
+    LAST_TAG_KEY = "submission_queue:last_tags"  # ZSET user_email -> last assigned tag, while ahead of virtual time
+    VIRTUAL_TIME_KEY = "submission_queue:virtual_time"  # Tag of the last popped submission
+    PROCESSING_KEY = "submission_queue:processing"  # ZSET submission_id -> claimed at (epoch seconds)
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._push = redis_client.register_script(_PUSH_SCRIPT)
+        self._pop = redis_client.register_script(_POP_SCRIPT)
+        self._requeue = redis_client.register_script(_REQUEUE_SCRIPT)
+
+    @staticmethod
+    def weight_for(user: Dict[str, Any]) -> float:
+        """Share of the submission rate a user gets relative to others"""
+        if user.get('is_admin'):
+            return AppConfig.SUBMISSION_ADMIN_WEIGHT
+        return AppConfig.SUBMISSION_DEFAULT_WEIGHT
+
+    def push(self, user_email: str, submission_id: str, weight: float = 1.0) -> float:
+        """Queue a submission behind the user's earlier ones
+
+        Returns:
+            The submission's virtual finish tag
+        """
+        tag = self._push(
+            keys=[self.QUEUE_KEY, self.LAST_TAG_KEY, self.VIRTUAL_TIME_KEY],
+            args=[user_email, submission_id, max(weight, 0.01)])
+        return float(tag)
+
+    def pop(self) -> Optional[str]:
+        """Claim the submission with the lowest tag, if any; ack it once handled"""
+        return self._pop(keys=[self.QUEUE_KEY, self.VIRTUAL_TIME_KEY, self.PROCESSING_KEY,
+                               self.LAST_TAG_KEY],
+                         args=[time.time()]) or None
+
+    def ack(self, submission_id: str) -> None:
+        """Drop the claim on a popped submission (finished, or retried under its own ID)"""
+        try:
+            self.redis_client.zrem(self.PROCESSING_KEY, submission_id)
+        except Exception as e:
+            logger.warning(f"Failed to acknowledge submission {submission_id}: {e}")
+
+    def requeue_stale(self, claimed_before: float) -> List[str]:
+        """Put submissions claimed before claimed_before back at the front of the queue
+
+        Returns:
+            The requeued submission IDs (each needs a Celery message to be popped)
+        """
+        return self._requeue(
+            keys=[self.QUEUE_KEY, self.PROCESSING_KEY, self.VIRTUAL_TIME_KEY],
+            args=[claimed_before]) or []
+
+    def remove(self, submission_id: str) -> None:
+        self.redis_client.zrem(self.QUEUE_KEY, submission_id)
+
+    def position(self, submission_id: str) -> Optional[int]:
+        """Number of submissions served before this one, or None if it is not waiting"""
+        try:
+            return self.redis_client.zrank(self.QUEUE_KEY, submission_id)
+        except Exception:
+            return None
+
+
+class SubmissionStore:
+    """Submission records (one JSON value per submission, expiring after SUBMISSION_TTL)
+
+    While a submission is queued or processing it holds its link (magnet or
+    E2DK hash) under LINK_KEY_PREFIX, so a concurrent /add of the same link
+    is answered with the existing submission instead of queueing another.
+    Users handed someone else's submission that way are recorded as its
+    watchers and may poll it.
+    """
+
+    KEY_PREFIX = "submission:"
+    LINK_KEY_PREFIX = "submission_link:"  # link key -> ID of the live submission holding it
+    WATCHERS_KEY_PREFIX = "submission_watchers:"  # SET of other users polling a submission
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._create = redis_client.register_script(_CREATE_SCRIPT)
+        self._release_link = redis_client.register_script(_RELEASE_LINK_SCRIPT)
+
+    def _key(self, submission_id: str) -> str:
+        return f"{self.KEY_PREFIX}{submission_id}"
+
+    def _link_key(self, link_key: str) -> str:
+        return f"{self.LINK_KEY_PREFIX}{link_key}"
+
+    def _watchers_key(self, submission_id: str) -> str:
+        return f"{self.WATCHERS_KEY_PREFIX}{submission_id}"
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def create(self, user_email: str, url: str, file_info: Optional[Dict[str, Any]] = None,
+               submission_id: Optional[str] = None, quota_reserved: bool = False,
+               account_id: Optional[int] = None, link_key: Optional[str] = None) -> str:
+        """Record a new queued submission
+
+        Args:
+            user_email: Submitting user
+            url: The magnet or E2DK link
+            file_info: Metadata from the link or WhatsLink
+            submission_id: ID to use (see new_id); generated when omitted
+            quota_reserved: Whether /add already reserved transfer quota for it
+            account_id: Pool account the quota was reserved on and the link goes to
+            link_key: Link hash to claim; nothing is recorded if a live
+                submission holds it already
+
+        Returns:
+            The submission ID, or the ID of the live submission holding link_key
+        """
+        submission_id = submission_id or self.new_id()
+        record = {
+            "id": submission_id,
+            "status": STATUS_QUEUED,
+            "user_email": user_email,
+            "url": url,
+            "file_info": file_info or {},
+            "attempts": 0,
+            "quota_reserved": quota_reserved,
+            "account_id": account_id,
+            "link_key": link_key,
+            "created_at": time.time(),
+            "updated_at": time.time(),
+        }
+        if not link_key:
+            self.redis_client.set(
+                self._key(submission_id), json.dumps(record, default=str), ex=AppConfig.SUBMISSION_TTL)
+            return submission_id
+
+        holder = self._create(
+            keys=[self._key(submission_id), self._link_key(link_key)],
+            args=[submission_id, json.dumps(record, default=str), AppConfig.SUBMISSION_TTL,
+                  self.KEY_PREFIX, *FINAL_STATUSES])
+        if holder != submission_id:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.sadd(self._watchers_key(holder), user_email)
+            pipe.expire(self._watchers_key(holder), AppConfig.SUBMISSION_TTL)
+            pipe.execute()
+        return holder
+
+    def can_view(self, record: Dict[str, Any], user_email: str) -> bool:
+        """Whether a non-admin user may poll a submission (its owner or a watcher)"""
+        if record["user_email"] == user_email:
+            return True
+        return bool(self.redis_client.sismember(self._watchers_key(record["id"]), user_email))
+
+    def get(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.redis_client.get(self._key(submission_id))
+        return json.loads(raw) if raw else None
+
+    def update(self, submission_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Merge fields into a submission record; returns the updated record"""
+        record = self.get(submission_id)
+        if record is None:
+            return None
+
+        record.update(fields, updated_at=time.time())
+        self.redis_client.set(
+            self._key(submission_id), json.dumps(record, default=str), ex=AppConfig.SUBMISSION_TTL)
+
+        # Finished: a new /add of the link may queue again (or dedup in Supabase)
+        if record["status"] in FINAL_STATUSES and record.get("link_key"):
+            try:
+                self._release_link(keys=[self._link_key(record["link_key"])], args=[submission_id])
+            except Exception as e:
+                logger.warning(f"Failed to release link of submission {submission_id}: {e}")
+        return record
+
+    def complete(self, submission_id: str, response: Dict[str, Any]) -> None:
+        """Mark a submission done; response is the body /add used to return"""
+        self.update(submission_id, status=STATUS_COMPLETED, response=response, status_code=200)
+
+    def fail(self, submission_id: str, error: str, status_code: int = 500) -> None:
+        self.update(submission_id, status=STATUS_FAILED,
+                    response={"error": error}, status_code=status_code)
+
+    @staticmethod
+    def public_view(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Fields returned to clients"""
+        return {
+            "submission_id": record["id"],
+            "status": record["status"],
+            "url": record["url"],
+            "attempts": record.get("attempts", 0),
+            "created_at": record.get("created_at"),
+            "updated_at": record.get("updated_at"),
+            "status_code": record.get("status_code"),
+            "response": record.get("response"),
+        }
@@ -1,20 +1,226 @@
 """Supabase Service Module"""
+import functools
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from supabase import Client
+from app.core.config import AppConfig
+from app.utils.forecasting import build_forecast, METRICS
+from app.utils.pagination import apply_keyset, next_cursor, DEFAULT_COUNT_MODE
+from app.utils.common import is_valid_file_id
+from app.services.task_tracker import TERMINAL_PHASES
 
 logger = logging.getLogger(__name__)
 
 SUPABASE_CLIENT_NOT_INITIALIZED = "Supabase client not initialized"
 
+# Max values per in_() filter; keeps PostgREST query strings well under URL limits
+BULK_CHUNK_SIZE = 100
+
+
+def _chunks(items: list, size: int):
+    """Yield successive slices of at most size items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
 
-class SupabaseService:
-    """Service for Supabase operations"""
 
-    def __init__(self, client: Client):
-        self.client = client
+def apply_user_filters(query, blocked_filter: Optional[bool] = None, search: Optional[str] = None):
+    """Apply the admin user list filters to a users query
+
+    The email search is a case-insensitive substring match, served by the
+    pg_trgm index from migrations/migration_user_search_keyset.sql.
+    """
+    if blocked_filter is not None:
+        query = query.eq("blocked", blocked_filter)
+
+    if search:
+        # Treat LIKE wildcards in the search text literally
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.ilike("email", f"%{escaped}%")
+
+    return query
+
+
+def apply_task_status_filters(query, task_ids: Optional[List[str]] = None):
+    """Restrict an "add" rows query to tasks whose status can still change
+
+    Rows already stored as complete/errored are skipped, so finished tasks
+    are not re-read on every sync. task_ids further narrows the query to
+    specific PikPak task IDs (at most BULK_CHUNK_SIZE).
+    """
+    phase = "data->task->task->>phase"
+    query = query.or_(f"{phase}.is.null,{phase}.not.in.({','.join(TERMINAL_PHASES)})")
+    if task_ids:
+        query = query.in_("data->task->task->>id", task_ids)
+    return query
+
+
+def build_action_data(url: str, task_result: dict, file_info: dict = None,
+                      account_id: Optional[int] = None) -> dict:
+    """Build the JSONB payload stored for an "add" action
+
+    Args:
+        url: The magnet/download URL
+        task_result: PikPak task result
+        file_info: Optional WhatsLink metadata
+        account_id: Pool account holding the task (omitted for the primary account)
+
+    Returns:
+        Data payload for the public_actions row
+    """
+    data = {
+        "url": url,
+        "task": task_result
+    }
+    if account_id is not None and account_id != AppConfig.PRIMARY_ACCOUNT_ID:
+        data["account_id"] = account_id
+
+    # Add WhatsLink metadata if available (exclude error field)
+    if file_info and not file_info.get("error"):
+        whatslink_data = {}
+        for key in ["name", "file_type", "size", "count"]:
+            if key in file_info and file_info[key] is not None:
+                whatslink_data[key] = file_info[key]
+
+        # Extract screenshot URLs from objects (WhatsLink returns [{screenshot: url, time: 0}, ...])
+        screenshots = file_info.get("screenshots")
+        if screenshots and isinstance(screenshots, list):
+            screenshot_urls = []
+            for item in screenshots:
+                if isinstance(item, dict) and "screenshot" in item:
+                    screenshot_urls.append(item["screenshot"])
+                elif isinstance(item, str):
+                    screenshot_urls.append(item)
+            if screenshot_urls:
+                whatslink_data["screenshots"] = screenshot_urls
+
+        if whatslink_data:
+            data["whatslink"] = whatslink_data
+
+    return data
+
+
+def build_task_status_updates(supabase_tasks: list, pikpak_tasks: list) -> list:
+    """Merge latest PikPak task state into stored "add" rows
+
+    Only rows whose tracked fields actually changed are returned, so the
+    upsert stays small and the rows double as the deltas pushed to clients.
+
+    Args:
+        supabase_tasks: Rows from public_actions (id, user_email, data)
+        pikpak_tasks: List of task dictionaries from PikPak offline_list
+
+    Returns:
+        List of changed rows ready for bulk upsert
+    """
+    # Create a mapping of task_id to PikPak task data
+    pikpak_task_map = {task['id']: task for task in pikpak_tasks}
+
+    # Prepare bulk update data
+    bulk_updates = []
+
+    for supabase_task in supabase_tasks:
+        task_data = supabase_task.get('data', {})
+
+        # Handle nested structure: data.task.task
+        task_wrapper = task_data.get('task', {})
+        task_info = task_wrapper.get('task', {})
+        task_id = task_info.get('id')
+
+        if task_id and task_id in pikpak_task_map:
+            pikpak_task = pikpak_task_map[task_id]
+
+            latest = {
+                'phase': pikpak_task.get('phase'),
+                'progress': pikpak_task.get('progress'),
+                'message': pikpak_task.get('message'),
+                'file_size': pikpak_task.get('file_size'),
+                'updated_time': pikpak_task.get('updated_time'),
+            }
+            if all(task_info.get(k) == v for k, v in latest.items()):
+                continue
+
+            # Update the task data with latest info from PikPak
+            task_info.update(latest)
+
+            # Add to bulk update list
+            bulk_updates.append({
+                'id': supabase_task['id'],
+                'action': 'add',
+                'user_email': supabase_task.get('user_email'),
+                'data': task_data
+            })
+
+    return bulk_updates
+
+
+def append_predictions(data: list, horizon: int = 7) -> list:
+    """Append a linear forecast to daily statistics rows
+
+    Args:
+        data: daily_statistics rows (any order)
+        horizon: Number of days to predict
+
+    Returns:
+        Rows sorted by date with predicted rows appended
+    """
+    # Sort by date ascending for prediction calculation
+    data.sort(key=lambda x: x['date'])
+
+    # All metrics are fitted together and memoized per latest date
+    forecast = build_forecast(data, horizon)
+    linear = forecast["models"]["linear"]
+
+    predicted_data = [
+        {
+            'date': date,
+            **{metric: linear[metric][i] for metric in METRICS},
+            'is_predicted': True
+        }
+        for i, date in enumerate(forecast["dates"])
+    ]
+
+    # append predicted data to the actual data
+    # Note: The frontend expects a list.
+    # We add is_predicted=False to original data for clarity
+    for item in data:
+        item['is_predicted'] = False
+
+    return data + predicted_data
+
+
+CLIENT = object()  # Yielded by a query plan to receive the Supabase client
+
+
+def supabase_query(plan):
+    """Turn a query plan into a service method
+
+    A plan is a generator that yields CLIENT to receive the Supabase client and
+    PostgREST requests (or a tuple of independent requests) to receive their
+    responses. A failed request is raised back into the plan at its yield, and
+    the plan's return value is the method's result. Each query is written once
+    and run by SupabaseService (inline) or AsyncSupabaseService (awaited).
+    """
+    @functools.wraps(plan)
+    def method(self, *args, **kwargs):
+        return self._run(plan(self, *args, **kwargs))
+    return method
+
+
+class SupabaseQueries:
+    """Supabase queries shared by the sync and async services
+
+    Subclasses provide _run, which drives a query plan (see supabase_query)
+    and returns its result, or a coroutine for it.
+    """
 
-    def log_action(self, url: str, task_result: dict, file_info: dict = None, user_email: str = None):
+    action_queue = None
+
+    def _run(self, plan):
+        raise NotImplementedError
+
+    @supabase_query
+    def log_action(self, url: str, task_result: dict, file_info: dict = None, user_email: str = None,
+                   account_id: Optional[int] = None):
         """Log an action to Supabase
 
         Args:
@@ -27,69 +233,107 @@ class SupabaseService:
                 - count: Number of files
                 - screenshots: List of preview image URLs
             user_email: Optional email of user who performed the action
+            account_id: Pool account the task was submitted with
         """
-        if not self.client:
-            logger.warning("Supabase client not available, skipping logging")
-            return
-
         try:
-            # Build data payload
-            data = {
-                "url": url,
-                "task": task_result
-            }
+            data = build_action_data(url, task_result, file_info, account_id)
+
+            # Prefer the write-behind queue; fall back to a direct insert
+            if self.action_queue and self.action_queue.enqueue("add", data, user_email):
+                logger.info(
+                    f"Queued action log for {url} (user: {user_email or 'anonymous'})")
+                return
 
-            # Add WhatsLink metadata if available (exclude error field)
-            if file_info and not file_info.get("error"):
-                whatslink_data = {}
-                for key in ["name", "file_type", "size", "count"]:
-                    if key in file_info and file_info[key] is not None:
-                        whatslink_data[key] = file_info[key]
-
-                # Extract screenshot URLs from objects (WhatsLink returns [{screenshot: url, time: 0}, ...])
-                screenshots = file_info.get("screenshots")
-                if screenshots and isinstance(screenshots, list):
-                    screenshot_urls = []
-                    for item in screenshots:
-                        if isinstance(item, dict) and "screenshot" in item:
-                            screenshot_urls.append(item["screenshot"])
-                        elif isinstance(item, str):
-                            screenshot_urls.append(item)
-                    if screenshot_urls:
-                        whatslink_data["screenshots"] = screenshot_urls
-
-                if whatslink_data:
-                    data["whatslink"] = whatslink_data
+            client = yield CLIENT
 
             # Insert with user_email
-            self.client.table("public_actions").insert({
+            yield client.table("public_actions").insert({
                 "action": "add",
                 "data": data,
                 "user_email": user_email
-            }).execute()
+            })
             logger.info(
                 f"Logged action to Supabase for {url} (user: {user_email or 'anonymous'})")
         except Exception as e:
             logger.error(f"Supabase Log Error for {url}: {e}")
             # Don't fail the request just because logging failed
 
-    def get_tasks(self, offset: int, limit: int):
-        """Get paginated tasks from Supabase"""
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+    @supabase_query
+    def get_tasks(self, offset: int, limit: int, cursor: Optional[str] = None,
+                  count: str = DEFAULT_COUNT_MODE):
+        """Get paginated tasks from Supabase
 
-        response = self.client.table("public_actions") \
-            .select("*", count="exact") \
-            .eq("action", "add") \
+        Args:
+            offset: Pagination offset (ignored when cursor is given)
+            limit: Number of tasks to return
+            cursor: Keyset cursor from a previous page's next_cursor
+            count: PostgREST count mode ('estimated', 'planned' or 'exact')
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        client = yield CLIENT
+
+        query = client.table("public_actions") \
+            .select("*", count=count) \
+            .eq("action", "add")
+
+        return (yield from self._paginate_actions(query, offset, limit, cursor))
+
+    @supabase_query
+    def get_action_logs(self, offset: int, limit: int, action: Optional[str] = None,
+                        user_email: Optional[str] = None, cursor: Optional[str] = None,
+                        count: str = DEFAULT_COUNT_MODE) -> Dict[str, Any]:
+        """Get paginated public_actions rows of any type (admin logs)
+
+        Args:
+            offset: Pagination offset (ignored when cursor is given)
+            limit: Number of rows to return
+            action: Optional action type filter ('add', 'share')
+            user_email: Optional user email filter
+            cursor: Keyset cursor from a previous page's next_cursor
+            count: PostgREST count mode ('estimated', 'planned' or 'exact')
+
+        Returns:
+            Dictionary with rows, count and next_cursor
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        client = yield CLIENT
+
+        query = client.table("public_actions") \
+            .select("*", count=count)
+
+        if action:
+            query = query.eq("action", action)
+
+        if user_email:
+            query = query.eq("user_email", user_email)
+
+        return (yield from self._paginate_actions(query, offset, limit, cursor))
+
+    @staticmethod
+    def _paginate_actions(query, offset: int, limit: int, cursor: Optional[str]):
+        """Order by (created_at, id) and fetch one page by offset or keyset cursor"""
+        query = query \
             .order("created_at", desc=True) \
-            .range(offset, offset + limit - 1) \
-            .execute()
+            .order("id", desc=True)
+
+        if cursor:
+            query = apply_keyset(query, cursor).limit(limit)
+        else:
+            query = query.range(offset, offset + limit - 1)
+
+        response = yield query
 
         return {
             "data": response.data,
-            "count": response.count
+            "count": response.count,
+            "next_cursor": next_cursor(response.data, limit)
         }
 
+    @supabase_query
     def get_tasks_by_urls(self, urls: list) -> list:
         """
         Get tasks matching specific URLs (for user's tasks from localStorage)
@@ -100,8 +344,7 @@ class SupabaseService:
         Returns:
             List of matching task records
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         if not urls:
             return []
@@ -109,45 +352,43 @@ class SupabaseService:
         try:
             # Use PostgreSQL's JSONB operators to filter by URL
             # The URL is stored in data->url field
-            response = self.client.table("public_actions") \
+            response = yield client.table("public_actions") \
                 .select("*") \
                 .eq("action", "add") \
                 .in_("data->>url", urls) \
-                .order("created_at", desc=True) \
-                .execute()
+                .order("created_at", desc=True)
 
             return response.data
         except Exception as e:
             logger.error(f"Failed to get tasks by URLs: {e}")
             raise
 
+    @supabase_query
     def get_task_by_id(self, task_id: int):
         """Get a specific task by ID"""
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
-        response = self.client.table("public_actions") \
+        response = yield client.table("public_actions") \
             .select("*") \
             .eq("id", task_id) \
             .eq("action", "add") \
-            .single() \
-            .execute()
+            .single()
 
         return response.data
 
+    @supabase_query
     def get_action_by_id(self, action_id: int):
         """Get a specific action (any type) by ID"""
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
-        response = self.client.table("public_actions") \
+        response = yield client.table("public_actions") \
             .select("*") \
             .eq("id", action_id) \
-            .single() \
-            .execute()
+            .single()
 
         return response.data
 
+    @supabase_query
     def get_existing_share_by_file_id(self, file_id: str):
         """
         Check if a share already exists for the given file_id (global check)
@@ -158,19 +399,17 @@ class SupabaseService:
         Returns:
             Existing share data if found, None otherwise
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
             # Use PostgreSQL JSONB operator to filter by file_id in data field
             # This is more efficient than fetching all shares and filtering in Python
-            response = self.client.table("public_actions") \
+            response = yield client.table("public_actions") \
                 .select("data") \
                 .eq("action", "share") \
                 .contains("data", {"file_id": file_id}) \
                 .order("created_at", desc=True) \
-                .limit(1) \
-                .execute()
+                .limit(1)
 
             if response.data and len(response.data) > 0:
                 data = response.data[0].get("data", {})
@@ -183,6 +422,39 @@ class SupabaseService:
             logger.error(f"Failed to check for existing share: {e}")
             return None
 
+    @supabase_query
+    def get_account_for_file(self, file_id: str) -> Optional[int]:
+        """Pool account holding a downloaded file, from the "add" action that created it
+
+        Args:
+            file_id: The PikPak file ID
+
+        Returns:
+            The account ID, or None if the file isn't in any logged task
+        """
+        if not is_valid_file_id(file_id):
+            # Interpolated into the or_() filter below; never let one through unchecked
+            logger.warning(f"Refused account lookup for malformed file ID {file_id!r}")
+            return None
+
+        client = yield CLIENT
+
+        try:
+            response = yield client.table("public_actions") \
+                .select("data") \
+                .eq("action", "add") \
+                .or_(f"data->task->file->>id.eq.{file_id},data->task->task->>file_id.eq.{file_id}") \
+                .limit(1)
+
+            if response.data:
+                return int(response.data[0].get("data", {}).get("account_id")
+                           or AppConfig.PRIMARY_ACCOUNT_ID)
+            return None
+        except Exception as e:
+            logger.error(f"Failed to look up account for file {file_id}: {e}")
+            return None
+
+    @supabase_query
     def check_existing_task_by_hash(self, magnet_hash: str):
         """
         Check if a task with the same magnet hash already exists
@@ -193,19 +465,17 @@ class SupabaseService:
         Returns:
             Existing task data if found, None otherwise
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
             # Search for tasks where the URL contains the hash
             # We use ilike on the extracted URL string from the JSONB data
-            response = self.client.table("public_actions") \
+            response = yield client.table("public_actions") \
                 .select("data") \
                 .eq("action", "add") \
                 .filter("data->>url", "ilike", f"%{magnet_hash}%") \
                 .order("created_at", desc=True) \
-                .limit(1) \
-                .execute()
+                .limit(1)
 
             if response.data and len(response.data) > 0:
                 data = response.data[0].get("data", {})
@@ -217,6 +487,7 @@ class SupabaseService:
             logger.error(f"Failed to check for existing task: {e}")
             return None
 
+    @supabase_query
     def store_share(self, file_id: str, share_data: dict, user_email: str = None):
         """
         Store a share in public_actions table
@@ -226,11 +497,6 @@ class SupabaseService:
             share_data: Share data from PikPak API
             user_email: Optional email of user who created the share
         """
-        if not self.client:
-            logger.warning(
-                "Supabase client not available, skipping share storage")
-            return
-
         try:
             # Add file_id to share_data for easy lookup
             data_with_file_id = {
@@ -238,97 +504,76 @@ class SupabaseService:
                 "file_id": file_id
             }
 
-            self.client.table("public_actions").insert({
+            # Prefer the write-behind queue; fall back to a direct insert
+            if self.action_queue and self.action_queue.enqueue("share", data_with_file_id, user_email):
+                logger.info(
+                    f"Queued share for file_id: {file_id} (user: {user_email})")
+                return
+
+            client = yield CLIENT
+
+            yield client.table("public_actions").insert({
                 "action": "share",
                 "data": data_with_file_id,
                 "user_email": user_email
-            }).execute()
+            })
             logger.info(
                 f"Stored share for file_id: {file_id} (user: {user_email})")
-            logger.info(f"Stored share for file_id: {file_id}")
         except Exception as e:
             logger.error(f"Failed to store share: {e}")
             # Don't fail the request just because storage failed
 
+    @supabase_query
     def health_check(self):
         """Perform a health check on Supabase connection"""
-        if not self.client:
-            return False, SUPABASE_CLIENT_NOT_INITIALIZED
+        try:
+            client = yield CLIENT
+        except RuntimeError as e:
+            return False, str(e)
 
         try:
-            self.client.from_("public_actions").select("id").limit(1).execute()
+            yield client.from_("public_actions").select("id").limit(1)
             return True, None
         except Exception as e:
             return False, f"Supabase connectivity check failed: {e}"
 
-    def update_task_statuses(self, pikpak_tasks: list):
+    @supabase_query
+    def update_task_statuses(self, pikpak_tasks: list, task_ids: Optional[List[str]] = None):
         """
         Update task statuses in Supabase based on PikPak task data using bulk upsert
 
         Args:
             pikpak_tasks: List of task dictionaries from PikPak offline_list
+            task_ids: Only consider rows for these PikPak task IDs
+
+        Returns:
+            The rows that changed (see build_task_status_updates)
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            # Get all tasks from Supabase
-            response = self.client.table("public_actions") \
-                .select("id, data") \
-                .eq("action", "add") \
-                .execute()
-
-            supabase_tasks = response.data
-
-            # Create a mapping of task_id to PikPak task data
-            pikpak_task_map = {task['id']: task for task in pikpak_tasks}
-
-            # Prepare bulk update data
-            bulk_updates = []
-
-            for supabase_task in supabase_tasks:
-                task_data = supabase_task.get('data', {})
-
-                # Handle nested structure: data.task.task
-                task_wrapper = task_data.get('task', {})
-                task_info = task_wrapper.get('task', {})
-                task_id = task_info.get('id')
-
-                if task_id and task_id in pikpak_task_map:
-                    pikpak_task = pikpak_task_map[task_id]
+            # Get tasks that are not finished yet from Supabase
+            query = client.table("public_actions") \
+                .select("id, user_email, data") \
+                .eq("action", "add")
+            response = yield apply_task_status_filters(query, task_ids)
 
-                    # Update the task data with latest info from PikPak
-                    task_info.update({
-                        'phase': pikpak_task.get('phase'),
-                        'progress': pikpak_task.get('progress'),
-                        'message': pikpak_task.get('message'),
-                        'file_size': pikpak_task.get('file_size'),
-                        'updated_time': pikpak_task.get('updated_time'),
-                    })
-
-                    # Add to bulk update list
-                    bulk_updates.append({
-                        'id': supabase_task['id'],
-                        'action': 'add',
-                        'data': task_data
-                    })
+            bulk_updates = build_task_status_updates(
+                response.data, pikpak_tasks)
 
             # Perform bulk upsert if there are updates
-            updated_count = 0
             if bulk_updates:
                 # Use upsert with 'id' as the conflict resolution column
                 # This will update existing rows and insert new ones (though we only expect updates here)
-                self.client.table("public_actions") \
-                    .upsert(bulk_updates, on_conflict='id') \
-                    .execute()
+                yield client.table("public_actions") \
+                    .upsert(bulk_updates, on_conflict='id')
 
-                updated_count = len(bulk_updates)
                 logger.info(
-                    f"Bulk updated {updated_count} task statuses in Supabase")
+                    f"Bulk updated {len(bulk_updates)} task statuses in Supabase")
             else:
                 logger.info("No tasks to update")
 
-            return updated_count
+            return bulk_updates
 
         except Exception as e:
             import httpx
@@ -339,6 +584,7 @@ class SupabaseService:
                 logger.error(f"Failed to update task statuses: {e}")
             raise
 
+    @supabase_query
     def count_tasks_added_since(self, since_time: str) -> int:
         """
         Count tasks added since a specific time
@@ -346,21 +592,19 @@ class SupabaseService:
         Args:
             since_time: ISO format timestamp string
         """
-        if not self.client:
-            return 0
-
         try:
-            response = self.client.table("public_actions") \
+            client = yield CLIENT
+            response = yield client.table("public_actions") \
                 .select("id", count="exact") \
                 .eq("action", "add") \
-                .gte("created_at", since_time) \
-                .execute()
+                .gte("created_at", since_time)
 
             return response.count or 0
         except Exception as e:
             logger.error(f"Failed to count tasks: {e}")
             return 0
 
+    @supabase_query
     def count_tasks_added_between(self, start_time: str, end_time: str) -> int:
         """
         Count tasks added between two timestamps
@@ -369,22 +613,20 @@ class SupabaseService:
             start_time: ISO format timestamp string (inclusive)
             end_time: ISO format timestamp string (exclusive)
         """
-        if not self.client:
-            return 0
-
         try:
-            response = self.client.table("public_actions") \
+            client = yield CLIENT
+            response = yield client.table("public_actions") \
                 .select("id", count="exact") \
                 .eq("action", "add") \
                 .gte("created_at", start_time) \
-                .lt("created_at", end_time) \
-                .execute()
+                .lt("created_at", end_time)
 
             return response.count or 0
         except Exception as e:
             logger.error(f"Failed to count tasks between dates: {e}")
             return 0
 
+    @supabase_query
     def log_daily_stats(self, stats_data: dict):
         """
         Log daily statistics
@@ -392,20 +634,19 @@ class SupabaseService:
         Args:
             stats_data: Dictionary containing statistics
         """
-        if not self.client:
-            return
-
         try:
+            client = yield CLIENT
             # Upsert based on date
-            self.client.table("daily_statistics").upsert(
+            yield client.table("daily_statistics").upsert(
                 stats_data,
                 on_conflict="date"
-            ).execute()
+            )
             logger.info(
                 f"Logged daily statistics for {stats_data.get('date')}")
         except Exception as e:
             logger.error(f"Failed to log daily statistics: {e}")
 
+    @supabase_query
     def get_daily_stats(self, limit: int = 30):
         """
         Get daily statistics history with 7-day prediction
@@ -413,65 +654,18 @@ class SupabaseService:
         Args:
             limit: Number of days to retrieve
         """
-        if not self.client:
-            return []
-
         try:
-            response = self.client.table("daily_statistics") \
+            client = yield CLIENT
+            response = yield client.table("daily_statistics") \
                 .select("*") \
                 .order("date", desc=True) \
-                .limit(limit) \
-                .execute()
+                .limit(limit)
 
             data = response.data
             if not data:
                 return []
 
-            # Sort by date ascending for prediction calculation
-            data.sort(key=lambda x: x['date'])
-
-            # Extract series for each metric
-            tasks_added_series = [float(d.get('tasks_added', 0)) for d in data]
-            storage_used_series = [
-                float(d.get('storage_used', 0)) for d in data]
-            transfer_used_series = [
-                float(d.get('transfer_used', 0)) for d in data]
-            downstream_traffic_series = [
-                float(d.get('downstream_traffic', 0)) for d in data]
-
-            # Predict next 7 days
-            from app.utils.prediction import predict_next_values
-            from datetime import datetime, timedelta
-
-            predicted_tasks = predict_next_values(tasks_added_series, 7)
-            predicted_storage = predict_next_values(storage_used_series, 7)
-            predicted_transfer = predict_next_values(transfer_used_series, 7)
-            predicted_downstream = predict_next_values(
-                downstream_traffic_series, 7)
-
-            # Generate future dates
-            last_date_str = data[-1]['date']
-            last_date = datetime.strptime(last_date_str, '%Y-%m-%d')
-
-            predicted_data = []
-            for i in range(7):
-                next_date = last_date + timedelta(days=i+1)
-                predicted_data.append({
-                    'date': next_date.strftime('%Y-%m-%d'),
-                    'tasks_added': int(predicted_tasks[i]),
-                    'storage_used': int(predicted_storage[i]),
-                    'transfer_used': int(predicted_transfer[i]),
-                    'downstream_traffic': int(predicted_downstream[i]),
-                    'is_predicted': True
-                })
-
-            # append predicted data to the actual data
-            # Note: The frontend expects a list.
-            # We add is_predicted=False to original data for clarity
-            for item in data:
-                item['is_predicted'] = False
-
-            return data + predicted_data
+            return append_predictions(data)
 
         except Exception as e:
             logger.error(f"Failed to get daily statistics: {e}")
@@ -482,6 +676,7 @@ class SupabaseService:
     # User Management Methods
     # ========================================
 
+    @supabase_query
     def create_user(self, email: str, password_hash: str, is_admin: bool = False) -> Dict[str, Any]:
         """Insert new user into database
 
@@ -493,16 +688,15 @@ class SupabaseService:
         Returns:
             Created user record
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            response = self.client.table("users").insert({
+            response = yield client.table("users").insert({
                 "email": email,
                 "password_hash": password_hash,
                 "is_admin": is_admin,
                 "blocked": False
-            }).execute()
+            })
 
             if response.data and len(response.data) > 0:
                 logger.info(f"Created user: {email}")
@@ -513,6 +707,7 @@ class SupabaseService:
             logger.error(f"Error creating user {email}: {e}")
             raise
 
+    @supabase_query
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Query user by email address
 
@@ -522,15 +717,13 @@ class SupabaseService:
         Returns:
             User record if found, None otherwise
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            response = self.client.table("users") \
+            response = yield client.table("users") \
                 .select("*") \
                 .eq("email", email) \
-                .limit(1) \
-                .execute()
+                .limit(1)
 
             if response.data and len(response.data) > 0:
                 return response.data[0]
@@ -540,6 +733,7 @@ class SupabaseService:
             logger.error(f"Error fetching user {email}: {e}")
             return None
 
+    @supabase_query
     def update_user_password(self, email: str, password_hash: str) -> bool:
         """Update user's password
 
@@ -550,14 +744,12 @@ class SupabaseService:
         Returns:
             True if updated successfully
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            self.client.table("users") \
+            yield client.table("users") \
                 .update({"password_hash": password_hash}) \
-                .eq("email", email) \
-                .execute()
+                .eq("email", email)
 
             logger.info(f"Updated password for user: {email}")
             return True
@@ -565,6 +757,7 @@ class SupabaseService:
             logger.error(f"Error updating password for {email}: {e}")
             raise
 
+    @supabase_query
     def store_password_reset_token(self, email: str, token: str, expires_at) -> bool:
         """Store password reset token for user
 
@@ -576,17 +769,15 @@ class SupabaseService:
         Returns:
             True if stored successfully
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            self.client.table("users") \
+            yield client.table("users") \
                 .update({
                     "reset_token": token,
                     "reset_token_expires_at": expires_at.isoformat()
                 }) \
-                .eq("email", email) \
-                .execute()
+                .eq("email", email)
 
             logger.info(f"Stored reset token for user: {email}")
             return True
@@ -594,6 +785,7 @@ class SupabaseService:
             logger.error(f"Error storing reset token for {email}: {e}")
             raise
 
+    @supabase_query
     def get_user_by_reset_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Retrieve user by valid reset token
 
@@ -603,15 +795,13 @@ class SupabaseService:
         Returns:
             User record if token is valid, None otherwise
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            response = self.client.table("users") \
+            response = yield client.table("users") \
                 .select("*") \
                 .eq("reset_token", token) \
-                .limit(1) \
-                .execute()
+                .limit(1)
 
             if response.data and len(response.data) > 0:
                 return response.data[0]
@@ -621,6 +811,7 @@ class SupabaseService:
             logger.error(f"Error fetching user by reset token: {e}")
             return None
 
+    @supabase_query
     def clear_password_reset_token(self, email: str) -> bool:
         """Clear reset token after use
 
@@ -630,17 +821,15 @@ class SupabaseService:
         Returns:
             True if cleared successfully
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            self.client.table("users") \
+            yield client.table("users") \
                 .update({
                     "reset_token": None,
                     "reset_token_expires_at": None
                 }) \
-                .eq("email", email) \
-                .execute()
+                .eq("email", email)
 
             logger.info(f"Cleared reset token for user: {email}")
             return True
@@ -648,6 +837,7 @@ class SupabaseService:
             logger.error(f"Error clearing reset token for {email}: {e}")
             raise
 
+    @supabase_query
     def update_user_admin_status(self, email: str, is_admin: bool) -> bool:
         """Update user's admin status
 
@@ -658,14 +848,12 @@ class SupabaseService:
         Returns:
             True if updated successfully
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            self.client.table("users") \
+            yield client.table("users") \
                 .update({"is_admin": is_admin}) \
-                .eq("email", email) \
-                .execute()
+                .eq("email", email)
 
             logger.info(f"Updated admin status for {email}: {is_admin}")
             return True
@@ -673,6 +861,7 @@ class SupabaseService:
             logger.error(f"Error updating admin status for {email}: {e}")
             raise
 
+    @supabase_query
     def delete_user(self, email: str) -> bool:
         """Delete user by email
 
@@ -682,14 +871,12 @@ class SupabaseService:
         Returns:
             True if deleted successfully
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            self.client.table("users") \
+            yield client.table("users") \
                 .delete() \
-                .eq("email", email) \
-                .execute()
+                .eq("email", email)
 
             logger.info(f"Deleted user: {email}")
             return True
@@ -697,26 +884,26 @@ class SupabaseService:
             logger.error(f"Error deleting user {email}: {e}")
             raise
 
+    @supabase_query
     def get_admins_count(self) -> int:
         """Count number of admin users
 
         Returns:
             Count of users with is_admin=True
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            response = self.client.table("users") \
+            response = yield client.table("users") \
                 .select("id", count="exact") \
-                .eq("is_admin", True) \
-                .execute()
+                .eq("is_admin", True)
 
             return response.count or 0
         except Exception as e:
             logger.error(f"Error counting admins: {e}")
             raise
 
+    @supabase_query
     def update_user_blocked_status(self, email: str, blocked: bool) -> bool:
         """Update user's blocked status
 
@@ -727,14 +914,12 @@ class SupabaseService:
         Returns:
             True if updated successfully
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            self.client.table("users") \
+            yield client.table("users") \
                 .update({"blocked": blocked}) \
-                .eq("email", email) \
-                .execute()
+                .eq("email", email)
 
             logger.info(f"Updated blocked status for {email}: {blocked}")
             return True
@@ -742,72 +927,181 @@ class SupabaseService:
             logger.error(f"Error updating blocked status for {email}: {e}")
             raise
 
-    def get_users_list(self, offset: int, limit: int, blocked_filter: Optional[bool] = None) -> Dict[str, Any]:
+    @supabase_query
+    def get_users_by_emails(self, emails: List[str]) -> List[Dict[str, Any]]:
+        """Fetch users matching any of the given emails
+
+        Args:
+            emails: Email addresses to look up
+
+        Returns:
+            List of user rows (without password hash)
+        """
+        client = yield CLIENT
+
+        users = []
+        try:
+            for chunk in _chunks(emails, BULK_CHUNK_SIZE):
+                response = yield client.table("users") \
+                    .select("email, is_admin, blocked, created_at") \
+                    .in_("email", chunk)
+                users.extend(response.data)
+            return users
+        except Exception as e:
+            logger.error(f"Error fetching users by email: {e}")
+            raise
+
+    @supabase_query
+    def update_users_blocked_status(self, emails: List[str], blocked: bool) -> int:
+        """Update blocked status for many users at once
+
+        Args:
+            emails: Email addresses to update
+            blocked: New blocked status
+
+        Returns:
+            Number of rows updated
+        """
+        client = yield CLIENT
+
+        updated = 0
+        try:
+            for chunk in _chunks(emails, BULK_CHUNK_SIZE):
+                response = yield client.table("users") \
+                    .update({"blocked": blocked}) \
+                    .in_("email", chunk)
+                updated += len(response.data or [])
+
+            logger.info(f"Updated blocked status for {updated} users: {blocked}")
+            return updated
+        except Exception as e:
+            logger.error(f"Error bulk updating blocked status: {e}")
+            raise
+
+    @supabase_query
+    def delete_users(self, emails: List[str]) -> int:
+        """Delete many users by email
+
+        Args:
+            emails: Email addresses to delete
+
+        Returns:
+            Number of rows deleted
+        """
+        client = yield CLIENT
+
+        deleted = 0
+        try:
+            for chunk in _chunks(emails, BULK_CHUNK_SIZE):
+                response = yield client.table("users") \
+                    .delete() \
+                    .in_("email", chunk)
+                deleted += len(response.data or [])
+
+            logger.info(f"Deleted {deleted} users")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error bulk deleting users: {e}")
+            raise
+
+    @supabase_query
+    def get_users_list(self, offset: int, limit: int, blocked_filter: Optional[bool] = None,
+                       search: Optional[str] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Get filtered and paginated user list
 
         Args:
-            offset: Pagination offset
+            offset: Pagination offset (ignored when cursor is given)
             limit: Number of users to return
             blocked_filter: Filter by blocked status (None = all)
+            search: Case-insensitive email substring to match
+            cursor: Keyset cursor from a previous page's next_cursor
 
         Returns:
-            Dictionary with users data and total count
+            Dictionary with users data, total count (None on cursor pages)
+            and next_cursor
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            query = self.client.table("users") \
-                .select("email, is_admin, blocked, created_at", count="exact")
-
-            # Apply filter if specified
-            if blocked_filter is not None:
-                query = query.eq("blocked", blocked_filter)
+            # The total only needs counting once, on the first (non-cursor) page
+            query = client.table("users") \
+                .select("id, email, is_admin, blocked, created_at",
+                        count=None if cursor else "exact")
 
-            response = query \
+            query = apply_user_filters(query, blocked_filter, search) \
                 .order("created_at", desc=True) \
-                .range(offset, offset + limit - 1) \
-                .execute()
+                .order("id", desc=True)
+
+            if cursor:
+                query = apply_keyset(query, cursor).limit(limit)
+            else:
+                query = query.range(offset, offset + limit - 1)
+
+            response = yield query
 
             return {
                 "data": response.data,
-                "count": response.count
+                "count": response.count,
+                "next_cursor": next_cursor(response.data, limit)
             }
         except Exception as e:
             logger.error(f"Error fetching users list: {e}")
             raise
 
-    def get_user_tasks(self, email: str, offset: int, limit: int) -> Dict[str, Any]:
+    @supabase_query
+    def get_blocked_user_emails(self) -> List[str]:
+        """Get the emails of all blocked users
+
+        Returns:
+            List of email addresses
+        """
+        client = yield CLIENT
+
+        try:
+            response = yield client.table("users") \
+                .select("email") \
+                .eq("blocked", True)
+
+            return [row["email"] for row in response.data]
+        except Exception as e:
+            logger.error(f"Error fetching blocked users: {e}")
+            raise
+
+    @supabase_query
+    def get_user_tasks(self, email: str, offset: int, limit: int, cursor: Optional[str] = None,
+                       count: str = DEFAULT_COUNT_MODE) -> Dict[str, Any]:
         """Get user's tasks from public_actions (filtered by user_email)
 
         Args:
             email: User's email address
-            offset: Pagination offset
+            offset: Pagination offset (ignored when cursor is given)
             limit: Number of tasks to return
+            cursor: Keyset cursor from a previous page's next_cursor
+            count: PostgREST count mode ('estimated', 'planned' or 'exact')
 
         Returns:
-            Dictionary with tasks data and total count
+            Dictionary with tasks data, total count and next_cursor
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            response = self.client.table("public_actions") \
-                .select("*", count="exact") \
+            query = client.table("public_actions") \
+                .select("*", count=count) \
                 .eq("action", "add") \
-                .eq("user_email", email) \
-                .order("created_at", desc=True) \
-                .range(offset, offset + limit - 1) \
-                .execute()
+                .eq("user_email", email)
 
-            return {
-                "data": response.data,
-                "count": response.count
-            }
+            return (yield from self._paginate_actions(query, offset, limit, cursor))
         except Exception as e:
             logger.error(f"Error fetching tasks for user {email}: {e}")
             raise
 
+    @supabase_query
     def delete_action_by_id(self, action_id: int) -> bool:
         """Delete specific action/task by ID
 
@@ -817,14 +1111,12 @@ class SupabaseService:
         Returns:
             True if deleted successfully
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            self.client.table("public_actions") \
+            yield client.table("public_actions") \
                 .delete() \
-                .eq("id", action_id) \
-                .execute()
+                .eq("id", action_id)
 
             logger.info(f"Deleted action with ID: {action_id}")
             return True
@@ -832,49 +1124,140 @@ class SupabaseService:
             logger.error(f"Error deleting action {action_id}: {e}")
             raise
 
+    @supabase_query
+    def get_actions_by_ids(self, action_ids: List[int]) -> List[Dict[str, Any]]:
+        """Fetch actions (any type) matching any of the given IDs
+
+        Args:
+            action_ids: public_actions row IDs
+
+        Returns:
+            List of action rows
+        """
+        client = yield CLIENT
+
+        actions = []
+        try:
+            for chunk in _chunks(action_ids, BULK_CHUNK_SIZE):
+                response = yield client.table("public_actions") \
+                    .select("*") \
+                    .in_("id", chunk)
+                actions.extend(response.data)
+            return actions
+        except Exception as e:
+            logger.error(f"Error fetching actions by ID: {e}")
+            raise
+
+    @supabase_query
+    def delete_actions_by_ids(self, action_ids: List[int]) -> int:
+        """Delete many actions by ID
+
+        Args:
+            action_ids: public_actions row IDs
+
+        Returns:
+            Number of rows deleted
+        """
+        client = yield CLIENT
+
+        deleted = 0
+        try:
+            for chunk in _chunks(action_ids, BULK_CHUNK_SIZE):
+                response = yield client.table("public_actions") \
+                    .delete() \
+                    .in_("id", chunk)
+                deleted += len(response.data or [])
+
+            logger.info(f"Deleted {deleted} actions")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error bulk deleting actions: {e}")
+            raise
+
+    @supabase_query
     def get_admin_statistics(self) -> Dict[str, Any]:
         """Aggregate counts for admin dashboard
 
+        Reads the trigger-maintained counters through the get_admin_statistics
+        RPC (migrations/migration_admin_statistics.sql) and falls back to
+        counting the tables when the migration has not been applied.
+
         Returns:
             Dictionary containing various statistics
         """
-        if not self.client:
-            raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+        client = yield CLIENT
 
         try:
-            # Get total users count
-            users_response = self.client.table("users") \
-                .select("id", count="exact") \
-                .execute()
-            total_users = users_response.count or 0
-
-            # Get blocked users count
-            blocked_response = self.client.table("users") \
-                .select("id", count="exact") \
-                .eq("blocked", True) \
-                .execute()
-            blocked_users = blocked_response.count or 0
+            response = yield client.rpc("get_admin_statistics")
+            if response.data:
+                return response.data
+        except Exception as e:
+            logger.warning(f"get_admin_statistics RPC unavailable, counting tables: {e}")
 
-            # Get total tasks count
-            tasks_response = self.client.table("public_actions") \
-                .select("id", count="exact") \
-                .eq("action", "add") \
-                .execute()
-            total_tasks = tasks_response.count or 0
+        return (yield from self._count_admin_statistics(client))
 
-            # Get total logs count
-            logs_response = self.client.table("public_actions") \
-                .select("id", count="exact") \
-                .execute()
-            total_logs = logs_response.count or 0
+    @staticmethod
+    def _count_admin_statistics(client):
+        """Compute admin dashboard counts with one COUNT query per figure"""
+        try:
+            # The four counts are independent, so they may run concurrently
+            users_response, blocked_response, tasks_response, logs_response = yield (
+                client.table("users").select("id", count="exact"),
+                client.table("users").select(
+                    "id", count="exact").eq("blocked", True),
+                client.table("public_actions").select(
+                    "id", count="exact").eq("action", "add"),
+                client.table("public_actions").select(
+                    "id", count="exact"),
+            )
+            total_users = users_response.count or 0
+            blocked_users = blocked_response.count or 0
 
             return {
                 "total_users": total_users,
                 "active_users": total_users - blocked_users,
                 "blocked_users": blocked_users,
-                "total_tasks": total_tasks,
-                "total_logs": total_logs
+                "total_tasks": tasks_response.count or 0,
+                "total_logs": logs_response.count or 0
             }
         except Exception as e:
             logger.error(f"Error fetching admin statistics: {e}")
             raise
+
+
+class SupabaseService(SupabaseQueries):
+    """Service for Supabase operations"""
+
+    def __init__(self, client: Client, action_queue=None):
+        """
+        Args:
+            client: Supabase client
+            action_queue: Optional ActionLogQueue; when set, action/share
+                inserts are written behind through Redis instead of inline
+        """
+        self.client = client
+        self.action_queue = action_queue
+
+    def _run(self, plan):
+        """Drive a query plan, executing each request inline"""
+        response, error = None, None
+        while True:
+            try:
+                request = plan.throw(error) if error is not None else plan.send(response)
+            except StopIteration as done:
+                return done.value
+
+            response, error = None, None
+            try:
+                response = self._execute(request)
+            except Exception as e:
+                error = e
+
+    def _execute(self, request):
+        if request is CLIENT:
+            if not self.client:
+                raise RuntimeError(SUPABASE_CLIENT_NOT_INITIALIZED)
+            return self.client
+        if isinstance(request, tuple):
+            return tuple(r.execute() for r in request)
+        return request.execute()
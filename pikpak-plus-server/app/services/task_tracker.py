@@ -0,0 +1,129 @@
+"""Adaptive status polling for active offline tasks
+
+Running and pending PikPak task IDs live in a Redis sorted set scored by
+their next check time. The poll job only calls PikPak when some task is
+due; tasks that make progress are re-checked quickly, stalled ones back off
+exponentially, and completed/errored ones are dropped from the set.
+"""
+import json
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_PHASES = ("PHASE_TYPE_RUNNING", "PHASE_TYPE_PENDING")
+TERMINAL_PHASES = ("PHASE_TYPE_COMPLETE", "PHASE_TYPE_ERROR")
+
+
+class ActiveTaskTracker:
+    """Next-check schedule for active PikPak task IDs"""
+
+    SCHEDULE_KEY = "task_status:active"  # ZSET task_id -> next check (epoch seconds)
+    STATE_KEY = "task_status:active_state"  # HASH task_id -> {"interval", "progress"}
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    def enroll(self, task_ids: Iterable[str], delay: Optional[int] = None) -> None:
+        """Start fast polling for tasks that are not tracked yet
+
+        Tasks already tracked keep their schedule and back-off state.
+        """
+        task_ids = [t for t in task_ids if t]
+        if not self.redis_client or not task_ids:
+            return
+
+        delay = AppConfig.TASK_POLL_MIN_SECONDS if delay is None else delay
+        initial = json.dumps({"interval": AppConfig.TASK_POLL_MIN_SECONDS, "progress": None})
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.zadd(self.SCHEDULE_KEY, {t: time.time() + delay for t in task_ids}, nx=True)
+            for task_id in task_ids:
+                pipe.hsetnx(self.STATE_KEY, task_id, initial)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to enroll tasks for status polling: {e}")
+
+    def defer(self, task_ids: Iterable[str], delay: int) -> None:
+        """Push the next check of tracked tasks back by delay seconds"""
+        task_ids = list(task_ids)
+        if not self.redis_client or not task_ids:
+            return
+        try:
+            self.redis_client.zadd(
+                self.SCHEDULE_KEY, {t: time.time() + delay for t in task_ids}, xx=True)
+        except Exception as e:
+            logger.warning(f"Failed to defer task status checks: {e}")
+
+    def due(self, limit: int = 500) -> List[str]:
+        """Task IDs whose next check time has passed"""
+        if not self.redis_client:
+            return []
+        try:
+            return self.redis_client.zrangebyscore(
+                self.SCHEDULE_KEY, "-inf", time.time(), start=0, num=limit)
+        except Exception as e:
+            logger.warning(f"Failed to read due tasks: {e}")
+            return []
+
+    def tracked(self) -> List[str]:
+        if not self.redis_client:
+            return []
+        return self.redis_client.zrange(self.SCHEDULE_KEY, 0, -1)
+
+    def reschedule(self, tasks: Dict[str, dict]) -> None:
+        """Schedule the next check for tasks that are still active
+
+        The interval resets to TASK_POLL_MIN_SECONDS when progress moved
+        and doubles (up to TASK_POLL_MAX_SECONDS) when it did not.
+
+        Args:
+            tasks: {task_id: PikPak task dict}
+        """
+        if not self.redis_client or not tasks:
+            return
+
+        ids = list(tasks)
+        states = self.redis_client.hmget(self.STATE_KEY, ids)
+        now = time.time()
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for task_id, raw in zip(ids, states):
+            state = json.loads(raw) if raw else {
+                "interval": AppConfig.TASK_POLL_MIN_SECONDS, "progress": None}
+            progress = tasks[task_id].get('progress')
+
+            if progress != state["progress"]:
+                interval = AppConfig.TASK_POLL_MIN_SECONDS
+            else:
+                interval = min(state["interval"] * 2, AppConfig.TASK_POLL_MAX_SECONDS)
+
+            pipe.zadd(self.SCHEDULE_KEY, {task_id: now + interval})
+            pipe.hset(self.STATE_KEY, task_id, json.dumps(
+                {"interval": interval, "progress": progress}))
+        pipe.execute()
+
+    def drop(self, task_ids: Iterable[str]) -> None:
+        """Stop polling tasks (finished, errored or gone)"""
+        task_ids = list(task_ids)
+        if not self.redis_client or not task_ids:
+            return
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zrem(self.SCHEDULE_KEY, *task_ids)
+        pipe.hdel(self.STATE_KEY, *task_ids)
+        pipe.execute()
+
+    def sync_with(self, pikpak_tasks: List[dict]) -> None:
+        """Reconcile the set with a full PikPak task listing
+
+        Enrolls active tasks the tracker missed (e.g. added outside /add)
+        and drops tasks that are no longer active.
+        """
+        active = {t['id'] for t in pikpak_tasks if t.get('phase') in ACTIVE_PHASES}
+        stale = [t for t in self.tracked() if t not in active]
+
+        self.enroll(active)
+        self.drop(stale)
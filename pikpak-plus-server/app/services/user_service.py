@@ -13,16 +13,63 @@ from app.core.config import AppConfig
 logger = logging.getLogger(__name__)
 
 
+PROFILE_CACHE_PREFIX = "user_profile:"
+
+
+def _public_profile(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip a users row down to the fields safe to return and cache"""
+    return {
+        'email': user['email'],
+        'is_admin': user.get('is_admin', False),
+        'blocked': user.get('blocked', False),
+        'created_at': user.get('created_at')
+    }
+
+
 class UserService:
     """Service for user management operations"""
 
-    def __init__(self, supabase_service):
+    def __init__(self, supabase_service, cache_manager=None, async_supabase_service=None,
+                 revocation_list=None):
         """Initialize UserService with SupabaseService dependency
 
         Args:
             supabase_service: Instance of SupabaseService for database operations
+            cache_manager: Optional CacheManager used to cache user profiles by email
+            async_supabase_service: Optional AsyncSupabaseService for async lookups
+            revocation_list: Optional TokenRevocationList kept in sync with account changes
         """
         self.supabase_service = supabase_service
+        self.cache_manager = cache_manager
+        self.async_supabase_service = async_supabase_service
+        self.revocation_list = revocation_list
+
+    def _get_cached_profile(self, email: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_manager:
+            return None
+        return self.cache_manager.get(f"{PROFILE_CACHE_PREFIX}{email}")
+
+    def _cache_profile(self, profile: Dict[str, Any]) -> None:
+        if self.cache_manager:
+            self.cache_manager.set(
+                f"{PROFILE_CACHE_PREFIX}{profile['email']}", profile,
+                ttl=AppConfig.USER_PROFILE_CACHE_TTL)
+
+    def _invalidate_admin_stats(self) -> None:
+        if self.cache_manager:
+            self.cache_manager.invalidate_admin_stats()
+            self.cache_manager.bump_versions("users")
+
+    def invalidate_user_cache(self, *emails: str) -> None:
+        """Drop the cached profiles for users after any change to their rows
+
+        Args:
+            emails: Users' email addresses
+        """
+        if self.cache_manager:
+            self.cache_manager.delete(
+                *(f"{PROFILE_CACHE_PREFIX}{email}" for email in emails))
+            self.cache_manager.bump_versions("users")
 
     def register_user(self, email: str, password: str) -> Dict[str, Any]:
         """Create a new user account
@@ -49,15 +96,11 @@ class UserService:
         user = self.supabase_service.create_user(
             email, password_hash, is_admin=False)
 
+        self._invalidate_admin_stats()
         logger.info(f"New user registered: {email}")
 
         # Return user without password hash
-        return {
-            'email': user['email'],
-            'is_admin': user.get('is_admin', False),
-            'blocked': user.get('blocked', False),
-            'created_at': user.get('created_at')
-        }
+        return _public_profile(user)
 
     def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
         """Verify login credentials
@@ -82,13 +125,10 @@ class UserService:
 
         logger.info(f"Successful login: {email}")
 
-        # Return user without password hash
-        return {
-            'email': user['email'],
-            'is_admin': user.get('is_admin', False),
-            'blocked': user.get('blocked', False),
-            'created_at': user.get('created_at')
-        }
+        # Return user without password hash; the row is fresh, so refresh the cache too
+        profile = _public_profile(user)
+        self._cache_profile(profile)
+        return profile
 
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Retrieve user information
@@ -99,18 +139,41 @@ class UserService:
         Returns:
             User information without password hash, or None if not found
         """
+        cached = self._get_cached_profile(email)
+        if cached is not None:
+            return cached
+
         user = self.supabase_service.get_user_by_email(email)
 
         if not user:
             return None
 
         # Return user without password hash
-        return {
-            'email': user['email'],
-            'is_admin': user.get('is_admin', False),
-            'blocked': user.get('blocked', False),
-            'created_at': user.get('created_at')
-        }
+        profile = _public_profile(user)
+        self._cache_profile(profile)
+        return profile
+
+    async def get_user_by_email_async(self, email: str) -> Optional[Dict[str, Any]]:
+        """Retrieve user information from async route coroutines
+
+        Args:
+            email: User's email address
+
+        Returns:
+            User information without password hash, or None if not found
+        """
+        cached = self._get_cached_profile(email)
+        if cached is not None:
+            return cached
+
+        user = await self.async_supabase_service.get_user_by_email(email)
+
+        if not user:
+            return None
+
+        profile = _public_profile(user)
+        self._cache_profile(profile)
+        return profile
 
     def request_password_reset(self, email: str) -> bool:
         """Generate and store password reset token
@@ -181,6 +244,9 @@ class UserService:
 
         # Clear reset token
         self.supabase_service.clear_password_reset_token(user['email'])
+        self.invalidate_user_cache(user['email'])
+        if self.revocation_list:
+            self.revocation_list.revoke_user_tokens(user['email'])
 
         logger.info(f"Password reset successful for: {user['email']}")
 
@@ -196,6 +262,10 @@ class UserService:
             True if user was blocked successfully
         """
         self.supabase_service.update_user_blocked_status(email, True)
+        self.invalidate_user_cache(email)
+        if self.revocation_list:
+            self.revocation_list.set_blocked(email, True)
+        self._invalidate_admin_stats()
         logger.info(f"User blocked: {email}")
         return True
 
@@ -209,6 +279,10 @@ class UserService:
             True if user was unblocked successfully
         """
         self.supabase_service.update_user_blocked_status(email, False)
+        self.invalidate_user_cache(email)
+        if self.revocation_list:
+            self.revocation_list.set_blocked(email, False)
+        self._invalidate_admin_stats()
         logger.info(f"User unblocked: {email}")
         return True
 
@@ -221,25 +295,44 @@ class UserService:
         Returns:
             True if user is blocked, False otherwise
         """
-        user = self.supabase_service.get_user_by_email(email)
+        user = self.get_user_by_email(email)
 
         if not user:
             return False
 
         return user.get('blocked', False)
 
-    def get_all_users(self, offset: int = 0, limit: int = 25, blocked_filter: Optional[bool] = None) -> Dict[str, Any]:
+    async def is_user_blocked_async(self, email: str) -> bool:
+        """Check if user is blocked, reading the users table directly
+
+        Bypasses the profile cache: used when the Redis blocked set can't
+        answer for a state-changing request.
+
+        Args:
+            email: User's email address
+
+        Returns:
+            True if user is blocked, False otherwise
+        """
+        user = await self.async_supabase_service.get_user_by_email(email)
+        return bool(user and user.get('blocked', False))
+
+    def get_all_users(self, offset: int = 0, limit: int = 25, blocked_filter: Optional[bool] = None,
+                      search: Optional[str] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Get paginated user list
 
         Args:
-            offset: Pagination offset
+            offset: Pagination offset (ignored when cursor is given)
             limit: Number of users to return
             blocked_filter: Filter by blocked status (None = all, True = blocked only, False = active only)
+            search: Case-insensitive email substring to match
+            cursor: Keyset cursor returned as next_cursor by the previous page
 
         Returns:
-            Dictionary containing users and total count
+            Dictionary containing users, total count and next_cursor
         """
-        return self.supabase_service.get_users_list(offset, limit, blocked_filter)
+        return self.supabase_service.get_users_list(
+            offset, limit, blocked_filter, search=search or None, cursor=cursor)
 
     def get_user_stats(self, email: str) -> Dict[str, Any]:
         """Get user activity statistics
@@ -251,7 +344,8 @@ class UserService:
             Dictionary containing user statistics
         """
         # Get user's task count
-        user_tasks = self.supabase_service.get_user_tasks(email, 0, 1)
+        user_tasks = self.supabase_service.get_user_tasks(
+            email, 0, 1, count="exact")
         task_count = user_tasks.get('count', 0)
 
         return {
@@ -280,14 +374,10 @@ class UserService:
         password_hash = hash_password(password)
         user = self.supabase_service.create_user(email, password_hash, is_admin=is_admin)
 
+        self._invalidate_admin_stats()
         logger.info(f"Admin created new user: {email}")
 
-        return {
-            'email': user['email'],
-            'is_admin': user.get('is_admin', False),
-            'blocked': user.get('blocked', False),
-            'created_at': user.get('created_at')
-        }
+        return _public_profile(user)
 
     def delete_user(self, email: str) -> Dict[str, Any]:
         """Delete a user account (admin operation)
@@ -311,6 +401,11 @@ class UserService:
                 raise ValueError("Cannot delete the last admin user")
 
         self.supabase_service.delete_user(email)
+        self.invalidate_user_cache(email)
+        if self.revocation_list:
+            self.revocation_list.set_blocked(email, False)
+            self.revocation_list.revoke_user_tokens(email)
+        self._invalidate_admin_stats()
         logger.info(f"Admin deleted user: {email}")
 
         return {"message": "User deleted successfully", "email": email}
@@ -338,6 +433,10 @@ class UserService:
                 raise ValueError("Cannot remove admin status from the last admin user")
 
         self.supabase_service.update_user_admin_status(email, is_admin)
+        self.invalidate_user_cache(email)
+        # Tokens carry is_admin, so make the user sign in again
+        if self.revocation_list:
+            self.revocation_list.revoke_user_tokens(email)
         logger.info(f"Admin updated role for {email}: is_admin={is_admin}")
 
         return {
@@ -365,10 +464,97 @@ class UserService:
 
         password_hash = hash_password(new_password)
         self.supabase_service.update_user_password(email, password_hash)
+        self.invalidate_user_cache(email)
+        if self.revocation_list:
+            self.revocation_list.revoke_user_tokens(email)
         logger.info(f"Admin reset password for user: {email}")
 
         return {"message": "Password reset successfully", "email": email}
 
+    def bulk_user_action(self, emails: List[Any], action: str, current_email: Optional[str] = None) -> Dict[str, Any]:
+        """Block, unblock or delete many users with set-based queries
+
+        All targets are fetched with one in_() query, skip reasons are worked
+        out in memory and the change is applied in chunked bulk statements.
+
+        Args:
+            emails: Raw email values from the request
+            action: 'block', 'unblock' or 'delete'
+            current_email: Email of the admin performing the action
+
+        Returns:
+            Dictionary with affected count, skipped count and skip details
+        """
+        skipped_reasons = []
+        targets = []
+        seen = set()
+
+        for email in emails:
+            if not isinstance(email, str) or not email.strip():
+                skipped_reasons.append(
+                    {"email": str(email), "reason": "Invalid email"})
+                continue
+            email = email.strip().lower()
+            if email not in seen:
+                seen.add(email)
+                targets.append(email)
+
+        users = {
+            user['email'].lower(): user
+            for user in self.supabase_service.get_users_by_emails(targets)
+        } if targets else {}
+
+        eligible = []
+        for email in targets:
+            user = users.get(email)
+            if not user:
+                skipped_reasons.append(
+                    {"email": email, "reason": "User not found"})
+            elif action in ('block', 'delete') and user.get('is_admin', False):
+                skipped_reasons.append(
+                    {"email": email, "reason": "Protected admin user"})
+            elif action == 'delete' and current_email and email == current_email:
+                skipped_reasons.append(
+                    {"email": email, "reason": "Cannot delete your own account"})
+            else:
+                eligible.append(user['email'])
+
+        affected = 0
+        if eligible:
+            try:
+                if action == 'delete':
+                    affected = self.supabase_service.delete_users(eligible)
+                else:
+                    affected = self.supabase_service.update_users_blocked_status(
+                        eligible, action == 'block')
+            except Exception as e:
+                logger.error(f"Bulk {action} error: {e}")
+                reason = "Failed to delete user" if action == 'delete' else f"Failed to {action} user"
+                skipped_reasons.extend(
+                    {"email": email, "reason": reason} for email in eligible)
+                eligible = []
+
+        if eligible:
+            self.invalidate_user_cache(*eligible)
+            self._invalidate_admin_stats()
+            if self.revocation_list:
+                self.revocation_list.set_blocked_many(eligible, action == 'block')
+                if action == 'delete':
+                    self.revocation_list.revoke_users_tokens(eligible)
+
+        return {
+            "affected": affected,
+            "skipped": len(skipped_reasons),
+            "skipped_details": skipped_reasons
+        }
+
+    def sync_blocked_users(self) -> None:
+        """Seed the Redis blocked set from the users table"""
+        if not self.revocation_list:
+            return
+        emails = self.supabase_service.get_blocked_user_emails()
+        self.revocation_list.load_blocked_emails(emails)
+
     def get_admins_count(self) -> int:
         """Get count of admin users
 
@@ -398,6 +584,7 @@ class UserService:
                     f"Updating existing user to admin: {AppConfig.ADMIN_EMAIL}")
                 self.supabase_service.update_user_admin_status(
                     AppConfig.ADMIN_EMAIL, True)
+                self.invalidate_user_cache(AppConfig.ADMIN_EMAIL)
             else:
                 logger.info(
                     f"Admin user already exists: {AppConfig.ADMIN_EMAIL}")
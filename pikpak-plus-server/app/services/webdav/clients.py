@@ -4,6 +4,8 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional, Any
 
 from app.core.config import AppConfig
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import CircuitOpenError, fallback_key, get_circuit_breaker
 from .constants import PLANET_NAMES, PLANET_EMOJIS
 
 logger = logging.getLogger(__name__)
@@ -43,6 +45,15 @@ class ClientManager:
             dict: Result with created clients or error message
         """
         try:
+            # Keep the existing clients rather than deleting them with PikPak WebDAV down
+            if get_circuit_breaker(circuit_breaker.WEBDAV, self.pikpak_service.account_id).is_open():
+                logger.warning("WebDAV circuit open, skipping WebDAV client creation")
+                return {
+                    "success": False,
+                    "message": "PikPak WebDAV is temporarily unavailable",
+                    "clients": []
+                }
+
             # Check if downstream traffic is available
             if not await self.traffic_checker.is_downstream_traffic_available():
                 logger.warning(
@@ -99,6 +110,8 @@ class ClientManager:
                     created_clients.append(client_info)
                     logger.info(f"Created WebDAV client: {planet_name}")
 
+                except CircuitOpenError:
+                    raise
                 except Exception as e:
                     logger.error(
                         f"Failed to create WebDAV client for {planet_name}: {e}")
@@ -120,6 +133,10 @@ class ClientManager:
                 webdav_cache_ttl_seconds = AppConfig.WEBDAV_GENERATION_INTERVAL_HOURS * 3600
                 self.cache_manager.set(
                     cache_key, webdav_result, ttl=webdav_cache_ttl_seconds)
+                if created_clients:
+                    self.cache_manager.set(
+                        fallback_key(cache_key), webdav_result, ttl=AppConfig.CIRCUIT_FALLBACK_TTL)
+                self.cache_manager.bump_versions("webdav")
                 logger.info(
                     f"Caching WebDAV clients for {AppConfig.WEBDAV_GENERATION_INTERVAL_HOURS} hours ({webdav_cache_ttl_seconds} seconds) matching WEBDAV_GENERATION_INTERVAL_HOURS")
 
@@ -180,6 +197,9 @@ class ClientManager:
                 # Use TTL of 0 to effectively delete the key
                 self.cache_manager.set(cache_key, {
                                        "available": True, "message": "No WebDAV clients currently active. They will be created on the next scheduled run.", "clients": []}, ttl=1)  # Expire immediately
+                if deleted_count:
+                    self.cache_manager.delete(fallback_key(cache_key))
+                self.cache_manager.bump_versions("webdav")
                 logger.info("Cleared WebDAV clients cache after cleanup")
 
             return deleted_count
@@ -280,6 +300,19 @@ class ClientManager:
                         "message": creation_result.get("message"),
                         "clients": creation_result.get("clients")
                     }
+
+                # PikPak WebDAV failing fast: serve the last clients we created
+                last_known = self.cache_manager.get(
+                    fallback_key(cache_key)) if self.cache_manager else None
+                if last_known and last_known.get("clients") and \
+                        get_circuit_breaker(circuit_breaker.WEBDAV,
+                                            self.pikpak_service.account_id).is_open():
+                    logger.warning("WebDAV circuit open, returning last known WebDAV clients")
+                    return {
+                        "available": True,
+                        "message": "PikPak WebDAV is temporarily unavailable; showing the last known clients",
+                        "clients": last_known["clients"]
+                    }
                 else:
                     return {
                         "available": False,
@@ -1,7 +1,9 @@
 import logging
+import time
 from datetime import datetime, timezone
 from typing import Optional, Any
 from app.core.config import AppConfig
+from app.services.quota_admission import QuotaAdmission
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +35,7 @@ class TrafficChecker:
         try:
             # Always fetch fresh transfer quota for traffic check to avoid 3-hour cache lag
             # This ensures that when a user buys extra premium, the WebDAV clients update promptly.
+            fetched_at = time.time()
             transfer_quota = await self.pikpak_service.get_transfer_quota()
 
             # Update the global quota_info cache with the newly fetched transfer quota
@@ -48,6 +51,8 @@ class TrafficChecker:
                         timezone.utc).isoformat()
                     self.cache_manager.set(
                         "quota_info", quota_info_cached, ttl=AppConfig.QUOTA_CACHE_TTL)
+                    self.cache_manager.bump_versions("quota")
+                    QuotaAdmission(self.cache_manager.redis_client).on_quota_refreshed(fetched_at)
 
             # API Structure (Dec 2024):
             # - base: Common monthly quota everyone gets (usage in size/assets, limit in total_assets)
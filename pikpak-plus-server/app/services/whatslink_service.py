@@ -1,41 +1,89 @@
 """WhatsLink Service Module"""
+import asyncio
+import hashlib
+import json
 import logging
-import requests
+import weakref
 from typing import Dict, Any, Optional
 
+import httpx
+
+from app.core.config import AppConfig
+from app.utils.common import extract_magnet_hash, extract_e2dk_hash, extract_link_metadata
+
 logger = logging.getLogger(__name__)
 
+
 class WhatsLinkService:
-    """Service for WhatsLink.info API operations"""
+    """Service for WhatsLink.info API operations
 
-    BASE_URL = "https://whatslink.info/api/v1/link"
+    Lookups go through one pooled httpx.AsyncClient per event loop, with at
+    most WHATSLINK_MAX_CONCURRENCY requests in flight per loop. Results are
+    cached in Redis by info hash: successful lookups for
+    WHATSLINK_CACHE_TTL, errors and timeouts for WHATSLINK_NEGATIVE_CACHE_TTL.
+    """
 
-    @staticmethod
-    def check_file_info(url: str, timeout: int = 10) -> Dict[str, Any]:
-        """
-        Check file information using WhatsLink.info API
+    BASE_URL = "https://whatslink.info/api/v1/link"
+    CACHE_PREFIX = "whatslink:"
+
+    def __init__(self, redis_client=None, timeout: float = 10):
+        self.redis_client = redis_client
+        self.timeout = timeout
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get (or create) the HTTP client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=AppConfig.WHATSLINK_MAX_CONCURRENCY)
+            )
+            self._clients[loop] = client
+            self._semaphores[loop] = asyncio.Semaphore(AppConfig.WHATSLINK_MAX_CONCURRENCY)
+        return client
+
+    @classmethod
+    def cache_key(cls, url: str) -> str:
+        """Cache key for a link: its info hash, or a digest of the URL"""
+        link_hash = extract_magnet_hash(url) or extract_e2dk_hash(url)
+        if not link_hash:
+            link_hash = hashlib.sha1(url.strip().encode()).hexdigest()
+        return f"{cls.CACHE_PREFIX}{link_hash}"
+
+    def _get_cached(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.redis_client:
+            return None
+        try:
+            cached = self.redis_client.get(key)
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"WhatsLink cache read failed: {e}")
+            return None
+
+    def _set_cached(self, key: str, file_info: Dict[str, Any]) -> None:
+        if not self.redis_client:
+            return
+        ttl = AppConfig.WHATSLINK_NEGATIVE_CACHE_TTL if file_info.get("error") \
+            else AppConfig.WHATSLINK_CACHE_TTL
+        try:
+            self.redis_client.setex(key, ttl, json.dumps(file_info))
+        except Exception as e:
+            logger.warning(f"WhatsLink cache write failed: {e}")
 
-        Args:
-            url: The URL to check
-            timeout: Request timeout in seconds
+    async def _fetch_file_info(self, url: str) -> Dict[str, Any]:
+        """Call the WhatsLink API (uncached)"""
+        client = self._get_client()
+        semaphore = self._semaphores[asyncio.get_running_loop()]
 
-        Returns:
-            Dictionary containing file metadata:
-            - type: Content type
-            - file_type: Type of content (unknown, folder, video, text, image, audio, archive, font, document)
-            - name: Content name
-            - size: Total size in bytes
-            - count: Number of included files
-            - screenshots: List of screenshots
-            - error: Error message if request failed
-        """
         try:
             logger.info(f"Checking file info for URL: {url}")
-            response = requests.get(
-                WhatsLinkService.BASE_URL,
-                params={"url": url},
-                timeout=timeout
-            )
+            async with semaphore:
+                response = await client.get(self.BASE_URL, params={"url": url})
 
             if response.status_code == 200:
                 data = response.json()
@@ -45,21 +93,55 @@ class WhatsLinkService:
                 logger.warning(f"WhatsLink returned status {response.status_code} for {url}")
                 return {"error": f"WhatsLink API returned status {response.status_code}"}
 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"WhatsLink API timeout for {url}")
             return {"error": "WhatsLink API request timed out"}
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"WhatsLink API error for {url}: {e}")
             return {"error": f"WhatsLink API error: {str(e)}"}
         except Exception as e:
             logger.error(f"Unexpected error checking file info for {url}: {e}")
             return {"error": f"Unexpected error: {str(e)}"}
 
-    @staticmethod
-    def check_file_size_limit(url: str, max_size_gb: float) -> tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
+    async def check_file_info(self, url: str) -> Dict[str, Any]:
+        """
+        Check file information using WhatsLink.info API
+
+        Args:
+            url: The URL to check
+
+        Returns:
+            Dictionary containing file metadata:
+            - type: Content type
+            - file_type: Type of content (unknown, folder, video, text, image, audio, archive, font, document)
+            - name: Content name
+            - size: Total size in bytes
+            - count: Number of included files
+            - screenshots: List of screenshots
+            - error: Error message if request failed
+        """
+        key = self.cache_key(url)
+        cached = self._get_cached(key)
+        if cached is not None:
+            logger.debug(f"WhatsLink cache hit for {key}")
+            return cached
+
+        file_info = await self._fetch_file_info(url)
+        self._set_cached(key, file_info)
+        return file_info
+
+    async def check_file_size_limit(self, url: str, max_size_gb: float) -> tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
         """
         Check if file size is within the allowed limit
 
+        ed2k links carry their exact size and are checked locally without
+        calling WhatsLink; file_info then holds the metadata parsed from the
+        link (name, size, count). A magnet's xl= is supplied by the client, so
+        it only rejects links that claim to be too large; links that claim to
+        fit are still looked up. If WhatsLink can't confirm their size, the
+        claimed size is returned with size_verified set to False (see
+        reservable_size).
+
         Args:
             url: The URL to check
             max_size_gb: Maximum allowed size in GB
@@ -68,9 +150,19 @@ class WhatsLinkService:
             Tuple of (is_valid, error_message, file_info)
             - is_valid: True if file is within limit or size couldn't be determined
             - error_message: Error message if file exceeds limit
-            - file_info: File metadata from WhatsLink API
+            - file_info: File metadata from the link or the WhatsLink API
         """
-        file_info = WhatsLinkService.check_file_info(url)
+        local_info = {k: v for k, v in extract_link_metadata(url).items() if k != "hash"}
+        claimed_size = local_info.get("size")
+        if claimed_size is not None and (url.startswith("ed2k://")
+                                         or claimed_size / (1024 ** 3) > max_size_gb):
+            logger.info(f"Using size embedded in link for {url}")
+            file_info = local_info
+        else:
+            file_info = await self.check_file_info(url)
+            if claimed_size is not None and (file_info.get("error") or file_info.get("size") is None):
+                logger.warning(f"Could not confirm the size claimed by {url}")
+                file_info = {**local_info, "size_verified": False}
 
         # If there's an error getting file info, log it but allow the download
         # (fail open - don't block downloads if the API is unavailable)
@@ -0,0 +1,47 @@
+"""Action Log Writer - Drain the public_actions write-behind queue into Supabase.
+
+Run as a long-lived process next to the Celery worker:
+
+    python -m app.tasks.action_log_writer
+"""
+import logging
+import signal
+
+import redis
+from supabase import create_client
+
+from app.core.config import AppConfig
+from app.services.action_log_queue import ActionLogWriter
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Start the writer loop and stop cleanly on SIGINT/SIGTERM"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    redis_client = redis.from_url(AppConfig.REDIS_URL, decode_responses=True)
+    supabase_client = create_client(
+        AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY)
+
+    writer = ActionLogWriter(redis_client, supabase_client)
+
+    def _shutdown(sig, frame):
+        logger.info("Shutdown requested, finishing current batch...")
+        writer.stop()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    try:
+        writer.run()
+    finally:
+        redis_client.close()
+
+
+if __name__ == '__main__':
+    main()
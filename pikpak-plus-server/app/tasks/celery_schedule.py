@@ -9,6 +9,11 @@ beat_schedule = {
         'schedule': crontab(minute=f'*/{AppConfig.TASK_STATUS_UPDATE_INTERVAL_MINUTES}'),
         'kwargs': {'source': 'scheduled'}
     },
+    'active-task-poll': {
+        'task': 'app.tasks.jobs.task_status_job.poll_active_task_statuses',
+        # Cheap when nothing is due: a single ZRANGEBYSCORE
+        'schedule': timedelta(seconds=AppConfig.TASK_POLL_MIN_SECONDS),
+    },
     'cleanup-job': {
         'task': 'app.tasks.jobs.cleanup_job.scheduled_cleanup',
         # Using timedelta to support any hour interval (24h, 48h, 72h, etc.)
@@ -23,6 +28,21 @@ beat_schedule = {
         # Run every hour to ensure daily stats are collected
         'schedule': crontab(minute=0),
     },
+    'token-refresh': {
+        'task': 'app.tasks.jobs.token_refresh_job.refresh_pikpak_tokens',
+        # Refreshes only when due; otherwise just keeps a captcha token published
+        'schedule': timedelta(seconds=AppConfig.TOKEN_REFRESH_CHECK_SECONDS),
+    },
+    'submission-requeue': {
+        'task': 'app.tasks.jobs.submission_job.requeue_stale_submissions',
+        # Cheap when no claim is stale: a single ZRANGEBYSCORE
+        'schedule': crontab(minute='*/5'),
+    },
+    'blocked-users-sync': {
+        'task': 'app.tasks.jobs.blocked_users_job.sync_blocked_users',
+        # Heals a blocked set lost to a Redis flush or eviction
+        'schedule': timedelta(minutes=AppConfig.BLOCKED_USERS_SYNC_MINUTES),
+    },
     'scheduler-heartbeat': {
         'task': 'app.tasks.jobs.heartbeat_job.scheduler_heartbeat',
         'schedule': crontab(minute='*'),  # Run every minute
@@ -1,8 +1,11 @@
 import asyncio
 import logging
-from typing import List, Tuple, Set
+from typing import List, Optional, Tuple, Set
 from supabase import Client
 
+from app.services.account_pool import account_id_of
+from app.utils import circuit_breaker
+
 logger = logging.getLogger(__name__)
 
 # Maximum number of tasks that can be deleted in one PikPak API call
@@ -11,10 +14,14 @@ PIKPAK_MAX_BATCH_SIZE = 100
 SUPABASE_PAGE_SIZE = 1000
 
 
-def get_task_and_file_ids_from_supabase(supabase: Client) -> Tuple[List[str], List[str]]:
+def get_task_and_file_ids_from_supabase(supabase: Client, account_id: Optional[int] = None) -> Tuple[List[str], List[str]]:
     """
     Retrieve all task IDs and file IDs from the public_actions table.
 
+    Args:
+        supabase: Supabase client
+        account_id: Only include actions whose task lives on this pool account
+
     Returns:
         Tuple of (task_ids, file_ids) extracted from "add" actions
     """
@@ -46,6 +53,9 @@ def get_task_and_file_ids_from_supabase(supabase: Client) -> Tuple[List[str], Li
             missing_file_ids = 0
 
             for record in records:
+                if account_id is not None and account_id_of(record) != account_id:
+                    continue
+
                 data = record.get("data", {})
                 task_wrapper = data.get("task", {})
 
@@ -136,7 +146,7 @@ async def delete_pikpak_tasks_in_batches(service, task_ids: List[str]) -> Tuple[
                 async def _delete_batch(ids=batch):
                     await service.client.delete_tasks(ids, delete_files=False)
 
-                await service._execute_with_retry(_delete_batch)
+                await service._execute_with_retry(_delete_batch, family=circuit_breaker.TASKS)
                 successfully_deleted.update(batch)
 
                 if num_batches > 1:
@@ -193,7 +203,7 @@ async def delete_pikpak_files_permanently(service, file_ids: List[str]) -> Tuple
                 async def _delete_files(ids=batch):
                     await service.client.delete_forever(ids)
 
-                await service._execute_with_retry(_delete_files)
+                await service._execute_with_retry(_delete_files, family=circuit_breaker.DRIVE)
                 successfully_deleted.update(batch)
 
                 if num_batches > 1:
@@ -236,11 +246,11 @@ async def delete_single_id_with_retry(service, record_id: str, item_type: str) -
             if item_type == "task":
                 async def _delete_task():
                     await service.client.delete_tasks([record_id], delete_files=False)
-                await service._execute_with_retry(_delete_task)
+                await service._execute_with_retry(_delete_task, family=circuit_breaker.TASKS)
             else:
                 async def _delete_file():
                     await service.client.delete_forever([record_id])
-                await service._execute_with_retry(_delete_file)
+                await service._execute_with_retry(_delete_file, family=circuit_breaker.DRIVE)
 
             logger.info(f"  Retry: {item_type} '{record_id}' deleted on attempt {attempt}")
             return True
@@ -341,7 +351,7 @@ async def run_cleanup(pikpak_service, supabase_client: Client):
        Failed IDs remain for next run.
 
     Args:
-        pikpak_service: PikPakService instance
+        pikpak_service: PikPakService instance; only actions of its pool account are cleaned
         supabase_client: Supabase client
     """
     logger.info("=" * 60)
@@ -374,7 +384,7 @@ async def run_cleanup(pikpak_service, supabase_client: Client):
     logger.info("Step 1: Retrieving task and file IDs from Supabase...")
     try:
         task_ids, file_ids = get_task_and_file_ids_from_supabase(
-            supabase_client)
+            supabase_client, account_id=pikpak_service.account_id)
         cleanup_results["task_ids_found"] = len(task_ids)
         cleanup_results["file_ids_found"] = len(file_ids)
     except Exception as e:
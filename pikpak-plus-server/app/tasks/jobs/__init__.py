@@ -8,10 +8,17 @@ from app.tasks.jobs.cleanup_job import scheduled_cleanup
 from app.tasks.jobs.task_status_job import scheduled_task_status_update
 from app.tasks.jobs.webdav_job import scheduled_webdav_generation
 from app.tasks.jobs.statistics_job import collect_daily_statistics
+from app.tasks.jobs.submission_job import process_submission, requeue_stale_submissions
+from app.tasks.jobs.token_refresh_job import refresh_pikpak_tokens
+from app.tasks.jobs.blocked_users_job import sync_blocked_users
 
 __all__ = [
     'scheduled_cleanup',
     'scheduled_task_status_update',
     'scheduled_webdav_generation',
     'collect_daily_statistics',
+    'process_submission',
+    'requeue_stale_submissions',
+    'refresh_pikpak_tokens',
+    'sync_blocked_users',
 ]
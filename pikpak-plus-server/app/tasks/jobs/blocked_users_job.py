@@ -0,0 +1,29 @@
+"""Blocked Users Job - Reload the Redis blocked set from the users table."""
+import logging
+
+from celery import shared_task
+
+from app.core.token_revocation import TokenRevocationList
+from app.tasks.utils import get_worker_services
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, name='app.tasks.jobs.blocked_users_job.sync_blocked_users')
+def sync_blocked_users(self):
+    """
+    Replace the Redis blocked set with the blocked users in Supabase.
+
+    Runs every BLOCKED_USERS_SYNC_MINUTES, and on demand when a request
+    finds the set unloaded (after a Redis flush or eviction), so the set
+    never stays empty until the next deploy.
+    Not retried: a failed run leaves the set unloaded, so the next request
+    asks for another one.
+    """
+    try:
+        loop, services = get_worker_services()
+        emails = loop.run_until_complete(services["supabase"].get_blocked_user_emails())
+        TokenRevocationList(services["redis"]).load_blocked_emails(emails)
+
+    except Exception as e:
+        logger.error(f"Blocked user sync failed: {e}", exc_info=True)
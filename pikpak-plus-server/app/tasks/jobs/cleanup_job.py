@@ -8,7 +8,8 @@ import asyncio
 
 from app.core.config import AppConfig
 from app.tasks.cleanup import run_cleanup
-from app.services import PikPakService, SupabaseService
+from app.services.account_pool import PikPakAccountPool
+from app.utils.common import CacheManager
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,8 @@ def scheduled_cleanup(self):
     """
     Execute the cleanup job to remove old tasks and files.
 
+    Runs once per PikPak pool account, each on the actions of its own tasks.
+
     Flow:
     1. Get all task IDs and file IDs from Supabase public_actions table
     2. Delete tasks from PikPak (in batches of 100)
@@ -37,26 +40,32 @@ def scheduled_cleanup(self):
         supabase_client = create_client(
             AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY)
 
-        # Initialize PikPak
-        pikpak_service = PikPakService(
-            AppConfig.PIKPAK_USER, AppConfig.PIKPAK_PASS)
+        # Initialize PikPak (every pool account)
+        account_pool = PikPakAccountPool.from_config(redis_client)
 
         # Run async logic in sync context
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
         try:
-            loop.run_until_complete(pikpak_service.ensure_logged_in())
+            loop.run_until_complete(account_pool.primary.ensure_logged_in())
 
             # Run the cleanup (no age_hours - cleans everything)
-            loop.run_until_complete(run_cleanup(
-                pikpak_service,
-                supabase_client
-            ))
+            for pikpak_service in account_pool.services.values():
+                loop.run_until_complete(run_cleanup(
+                    pikpak_service,
+                    supabase_client
+                ))
 
             logger.info(
                 f"Cleanup job completed successfully at {datetime.now(timezone.utc).isoformat()}Z")
 
+            # public_actions rows were deleted: drop cached task lists and
+            # mark tasks and the action log as changed
+            cache_manager = CacheManager(AppConfig.TASK_CACHE_TTL, AppConfig.REDIS_URL)
+            cache_manager.invalidate_tasks()
+            cache_manager.invalidate_admin_stats()
+
             # Update Redis status
             from app.tasks.utils import update_redis_status
 
@@ -6,7 +6,10 @@ from datetime import datetime, timedelta, timezone
 
 from app.core.config import AppConfig
 from celery import shared_task
-from app.services import PikPakService, SupabaseService
+from app.services import AsyncSupabaseService
+from app.services.account_pool import PikPakAccountPool, cached_quota_infos, pool_limits_quota_info
+from app.utils.common import CacheManager
+from app.services.statistics_cache import StatisticsPayloadCache
 from app.core.config import AppConfig
 import redis
 import asyncio
@@ -14,10 +17,48 @@ import asyncio
 logger = logging.getLogger(__name__)
 
 
+def _usage_from_quota(quota_info: dict, transfer_info: dict) -> tuple[int, int, int]:
+    """(storage_used, transfer_used, downstream_traffic) of one account"""
+    # 1. Get Storage Usage
+    storage_quota = quota_info.get("quota", {})
+    storage_used = int(storage_quota.get("usage", 0))
+
+    # 2. Get Cloud Download Traffic (Offline Downloads)
+    # Base quota (common for all users)
+    transfer_base = transfer_info.get("base", {})
+    base_offline = transfer_base.get("offline", {})
+    base_offline_used = int(base_offline.get(
+        "size", base_offline.get("assets", 0)))
+
+    # Extra quota from purchased premium plans (may not exist)
+    transfer_extra = transfer_info.get("transfer", {})
+    extra_offline = transfer_extra.get("offline", {})
+    extra_offline_used = int(extra_offline.get("assets", 0))
+
+    # Total = base + extra
+    transfer_used = base_offline_used + extra_offline_used
+
+    # 3. Get Downstream Traffic (Streaming & Direct Downloads)
+    base_download = transfer_base.get("download", {})
+    base_download_used = int(base_download.get(
+        "size", base_download.get("assets", 0)))
+
+    extra_download = transfer_extra.get("download", {})
+    extra_download_used = int(extra_download.get("assets", 0))
+
+    # Total = base + extra
+    downstream_traffic = base_download_used + extra_download_used
+
+    return storage_used, transfer_used, downstream_traffic
+
+
 @shared_task(bind=True, name='app.tasks.jobs.statistics_job.collect_daily_statistics')
 def collect_daily_statistics(self):
     """
     Collect daily statistics and store in Supabase.
+
+    Usage figures are summed over every PikPak pool account; each run also
+    refreshes the cached quota of the extra pool accounts for the dispatcher.
     """
     run_time = datetime.now(timezone.utc)
     logger.info(
@@ -28,15 +69,16 @@ def collect_daily_statistics(self):
         redis_client = redis.from_url(
             AppConfig.REDIS_URL, decode_responses=True)
 
-        # Initialize Supabase
-        from supabase import create_client
-        supabase_client = create_client(
+        # Initialize Supabase (async client is bound to this job's event loop)
+        supabase_service = AsyncSupabaseService(
             AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY)
-        supabase_service = SupabaseService(supabase_client)
 
-        # Initialize PikPak
-        pikpak_service = PikPakService(
-            AppConfig.PIKPAK_USER, AppConfig.PIKPAK_PASS)
+        cache_manager = CacheManager(
+            AppConfig.TASK_CACHE_TTL, AppConfig.REDIS_URL)
+
+        # Initialize PikPak (the primary account also reports premium expiration)
+        account_pool = PikPakAccountPool.from_config(redis_client)
+        pikpak_service = account_pool.primary
 
         # Run async logic in sync context
         loop = asyncio.new_event_loop()
@@ -51,7 +93,7 @@ def collect_daily_statistics(self):
 
             # Check if stats already exist for this date
             existing_stats = loop.run_until_complete(
-                asyncio.to_thread(supabase_service.get_daily_stats, limit=1)
+                supabase_service.get_daily_stats(limit=1)
             )
 
             # Simple check: if the latest stat is for our target date, skip
@@ -65,6 +107,13 @@ def collect_daily_statistics(self):
                                  ).replace(hour=0, minute=0, second=0, microsecond=0)
                 update_redis_status(redis_client, run_time,
                                     next_run_time, "statistics_collection")
+
+                # Keep the dispatcher's view of the extra accounts' quota fresh
+                loop.run_until_complete(account_pool.refresh_quota_caches(cache_manager))
+
+                # Refresh the precomputed /statistics payloads (schedule changed)
+                loop.run_until_complete(
+                    StatisticsPayloadCache(redis_client).rebuild(supabase_service))
                 return
 
             logger.info(f"Collecting statistics for {target_date_str}...")
@@ -77,45 +126,30 @@ def collect_daily_statistics(self):
                 pikpak_service.client.vip_info()
             ))
 
-            # 1. Get Storage Usage
-            storage_quota = quota_info.get("quota", {})
-            storage_used = int(storage_quota.get("usage", 0))
-
-            # 2. Get Cloud Download Traffic (Offline Downloads)
-            # Base quota (common for all users)
-            transfer_base = transfer_info.get("base", {})
-            base_offline = transfer_base.get("offline", {})
-            base_offline_used = int(base_offline.get(
-                "size", base_offline.get("assets", 0)))
-
-            # Extra quota from purchased premium plans (may not exist)
-            transfer_extra = transfer_info.get("transfer", {})
-            extra_offline = transfer_extra.get("offline", {})
-            extra_offline_used = int(extra_offline.get("assets", 0))
+            storage_used, transfer_used, downstream_traffic = _usage_from_quota(
+                quota_info, transfer_info)
 
-            # Total = base + extra
-            transfer_used = base_offline_used + extra_offline_used
-
-            # 3. Get Downstream Traffic (Streaming & Direct Downloads)
-            base_download = transfer_base.get("download", {})
-            base_download_used = int(base_download.get(
-                "size", base_download.get("assets", 0)))
-
-            extra_download = transfer_extra.get("download", {})
-            extra_download_used = int(extra_download.get("assets", 0))
-
-            # Total = base + extra
-            downstream_traffic = base_download_used + extra_download_used
+            # Extra pool accounts: refresh their cached quota and add their usage
+            if len(account_pool) > 1:
+                loop.run_until_complete(account_pool.refresh_quota_caches(cache_manager))
+                for account_id, info in cached_quota_infos(cache_manager).items():
+                    if account_id == AppConfig.PRIMARY_ACCOUNT_ID or not info:
+                        continue
+                    usage = _usage_from_quota(info.get("storage") or {}, info.get("transfer") or {})
+                    storage_used += usage[0]
+                    transfer_used += usage[1]
+                    downstream_traffic += usage[2]
 
             # 4. Count Tasks Added (Target Day 00:00 to 23:59:59)
             start_of_day = datetime.combine(
                 target_date, datetime.min.time()).replace(tzinfo=timezone.utc)
             end_of_day = start_of_day + timedelta(days=1)
 
-            tasks_added = supabase_service.count_tasks_added_between(
-                start_of_day.isoformat(),
-                end_of_day.isoformat()
-            )
+            tasks_added = loop.run_until_complete(
+                supabase_service.count_tasks_added_between(
+                    start_of_day.isoformat(),
+                    end_of_day.isoformat()
+                ))
 
             # 5. Premium Expiration
             premium_expiration = vip_info.get("data", {}).get("expire")
@@ -132,7 +166,8 @@ def collect_daily_statistics(self):
             }
 
             # Log to Supabase
-            supabase_service.log_daily_stats(stats_data)
+            loop.run_until_complete(
+                supabase_service.log_daily_stats(stats_data))
 
             logger.info(
                 f"Daily statistics collected successfully for {stats_data['date']}")
@@ -146,6 +181,16 @@ def collect_daily_statistics(self):
             update_redis_status(redis_client, run_time,
                                 next_run_time, "statistics_collection")
 
+            # Precompute /statistics payloads with the new row and fresh quota;
+            # usage above is pool-wide, so forecasts use the pool's summed limits
+            quota_infos = cached_quota_infos(cache_manager)
+            quota_infos[AppConfig.PRIMARY_ACCOUNT_ID] = {
+                "storage": quota_info, "transfer": transfer_info}
+            loop.run_until_complete(
+                StatisticsPayloadCache(redis_client).rebuild(
+                    supabase_service,
+                    quota_info=pool_limits_quota_info(quota_infos)))
+
         finally:
             loop.close()
             redis_client.close()
@@ -0,0 +1,229 @@
+"""Submission Job - Submit queued /add links to PikPak."""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import redis
+from celery import shared_task
+from celery.exceptions import Retry
+
+from app.core.config import AppConfig
+from app.services import AsyncSupabaseService
+from app.services.account_pool import PikPakAccountPool, cached_quota_infos, pool_quota_info
+from app.services.pikpak_service import RateLimitError
+from app.services.submission_queue import (
+    SubmissionStore, FairQueue, STATUS_PROCESSING, STATUS_QUEUED, FINAL_STATUSES
+)
+from app.services.quota_admission import QuotaAdmission, REJECTED, reservable_size
+from app.services.task_tracker import ActiveTaskTracker, TERMINAL_PHASES
+from app.utils.common import CacheManager, extract_magnet_hash, extract_e2dk_hash
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_QUEUE = "submissions"
+
+# Reused by every submission this worker process handles, so a burst costs
+# one PikPak login and one set of connections instead of one per link
+_loop = None
+_services = None
+
+
+def _get_services():
+    """Lazily create this worker process's event loop, clients and services"""
+    global _loop, _services
+    if _services is None:
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+        redis_client = redis.from_url(AppConfig.REDIS_URL, decode_responses=True)
+        _services = {
+            "redis": redis_client,
+            "store": SubmissionStore(redis_client),
+            "fair_queue": FairQueue(redis_client),
+            "cache": CacheManager(AppConfig.TASK_CACHE_TTL, AppConfig.REDIS_URL),
+            "pool": PikPakAccountPool.from_config(redis_client),
+            "supabase": AsyncSupabaseService(AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY),
+        }
+    return _loop, _services
+
+
+async def _submit(services: dict, record: dict) -> tuple[dict, bool]:
+    """Dedup once more, add the link to the dispatched PikPak account and log it
+
+    Returns:
+        Tuple of (the response body /add used to return synchronously,
+        whether PikPak got a new task)
+    """
+    url = record["url"]
+
+    # Another submission of the same link may have finished while this one was queued
+    link_hash = extract_magnet_hash(url) or extract_e2dk_hash(url)
+    if link_hash:
+        existing_task = await services["supabase"].check_existing_task_by_hash(link_hash)
+        if existing_task:
+            return {"message": "Task already exists", "task": existing_task, "file_info": {}}, False
+
+    # The account the transfer quota was reserved on
+    pool = services["pool"]
+    pikpak_service = pool.get(record.get("account_id"))
+    try:
+        await pikpak_service.ensure_logged_in()
+        task_result = await pikpak_service.add_download(url)
+    except Exception:
+        pool.record_result(pikpak_service.account_id, ok=False)
+        raise
+    pool.record_result(pikpak_service.account_id, ok=True)
+
+    # Log to Supabase with WhatsLink metadata, user email and the account holding the task
+    await services["supabase"].log_action(
+        url, task_result, record.get("file_info"), user_email=record["user_email"],
+        account_id=pikpak_service.account_id)
+
+    return {
+        "message": "Task added successfully",
+        "task": task_result,
+        "file_info": record.get("file_info") or {}
+    }, True
+
+
+@shared_task(bind=True, name='app.tasks.jobs.submission_job.process_submission',
+             acks_late=True, max_retries=5, rate_limit=AppConfig.SUBMISSION_RATE_LIMIT)
+def process_submission(self, submission_id: Optional[str] = None):
+    """
+    Submit one queued /add link to PikPak and record the outcome.
+
+    Without a submission_id the task takes the next submission from the fair
+    queue; retries and deferred submissions carry their ID explicitly.
+
+    Rate-limited submissions are retried after the PikPak cooldown, and
+    submissions deferred by quota admission retry their reservation every
+    QUOTA_ADMISSION_DEFER_SECONDS; the submission stays "queued" meanwhile.
+    Redelivered messages for finished submissions are ignored.
+
+    A popped submission stays claimed in the fair queue until it is handled
+    or handed to a retry carrying its ID. Redis or Supabase errors retry it
+    after SUBMISSION_ERROR_RETRY_SECONDS; if the worker dies, the claim is
+    put back by requeue_stale_submissions.
+    """
+    loop, services = _get_services()
+    claimed = submission_id is None
+    if claimed:
+        submission_id = services["fair_queue"].pop()
+        if submission_id is None:
+            return
+
+    handed_off = False
+    try:
+        _process(self, loop, services, submission_id)
+        handed_off = True
+    except Retry:
+        handed_off = True  # The retry message carries the ID from here on
+        raise
+    except Exception as e:
+        logger.error(f"Submission {submission_id} interrupted: {e}", exc_info=True)
+        if self.request.retries >= self.max_retries:
+            services["store"].fail(submission_id, f"Submission failed: {str(e)}")
+            handed_off = True
+            return
+        retry = self.retry(args=[submission_id], exc=e,
+                           countdown=AppConfig.SUBMISSION_ERROR_RETRY_SECONDS, throw=False)
+        handed_off = True
+        raise retry
+    finally:
+        if claimed and handed_off:
+            services["fair_queue"].ack(submission_id)
+
+
+def _process(task, loop, services: dict, submission_id: str) -> None:
+    """Admission, PikPak submission and bookkeeping for one submission (see process_submission)"""
+    store = services["store"]
+
+    record = store.get(submission_id)
+    if record is None:
+        logger.warning(f"Submission {submission_id} expired before processing")
+        return
+    if record["status"] in FINAL_STATUSES:
+        return
+
+    # Deferred by /add: pick the account and reserve its transfer quota
+    # before spending PikPak rate budget
+    admission = QuotaAdmission(services["redis"])
+    size = reservable_size(record.get("file_info"))
+    account_id = record.get("account_id") or AppConfig.PRIMARY_ACCOUNT_ID
+    if not record.get("quota_reserved"):
+        decision, error_msg = admission.check(
+            (record.get("file_info") or {}).get("size"), pool_quota_info(services["cache"]))
+        if decision == REJECTED:
+            store.fail(submission_id, error_msg, status_code=400)
+            return
+        url = record["url"]
+        quota_infos = cached_quota_infos(services["cache"])
+        account_id = services["pool"].pick(
+            extract_magnet_hash(url) or extract_e2dk_hash(url) or url,
+            size=size, quota_infos=quota_infos).account_id
+        if not admission.reserve(submission_id, size, quota_infos.get(account_id),
+                                 account_id=account_id):
+            if task.request.retries >= task.max_retries:
+                store.fail(submission_id, "Not enough offline transfer quota left", status_code=503)
+                return
+            raise task.retry(args=[submission_id], countdown=AppConfig.QUOTA_ADMISSION_DEFER_SECONDS)
+
+    record = store.update(submission_id, status=STATUS_PROCESSING, quota_reserved=True,
+                          account_id=account_id, attempts=record.get("attempts", 0) + 1) or record
+
+    try:
+        response, submitted = loop.run_until_complete(_submit(services, record))
+    except RateLimitError as e:
+        if task.request.retries >= task.max_retries:
+            admission.release(submission_id, size, account_id=account_id)
+            store.fail(submission_id, f"PikPak Error: {str(e)}", status_code=429)
+            return
+        # Rate limited - wait 5 minutes before retry (aligns with global cooldown)
+        logger.warning(f"Rate limited submitting {submission_id}, retrying in 5 minutes: {e}")
+        store.update(submission_id, status=STATUS_QUEUED)
+        raise task.retry(args=[submission_id], exc=e, countdown=300)
+    except Exception as e:
+        logger.error(f"Submission {submission_id} failed: {e}")
+        admission.release(submission_id, size, account_id=account_id)
+        store.fail(submission_id, f"PikPak Error: {str(e)}")
+        return
+
+    # Keep the bytes reserved until quota_info reflects the new task
+    if submitted:
+        admission.settle(submission_id, size, account_id=account_id)
+    else:
+        admission.release(submission_id, size, account_id=account_id)
+
+    # Poll the new task at high frequency until it finishes
+    new_task = (response.get("task") or {}).get("task") or {}
+    if new_task.get("id") and new_task.get("phase") not in TERMINAL_PHASES:
+        ActiveTaskTracker(services["redis"]).enroll([new_task["id"]])
+
+    cache_manager = services["cache"]
+    cache_manager.invalidate_tasks()
+    cache_manager.invalidate_admin_stats()
+
+    store.complete(submission_id, response)
+    logger.info(f"Submission {submission_id} completed")
+
+
+@shared_task(bind=True, name='app.tasks.jobs.submission_job.requeue_stale_submissions')
+def requeue_stale_submissions(self):
+    """
+    Put submissions a dead worker popped but never handled back in the fair queue.
+
+    A claim older than SUBMISSION_CLAIM_TIMEOUT goes back to the front of
+    the queue with a new Celery message to pop it.
+    """
+    redis_client = redis.from_url(AppConfig.REDIS_URL, decode_responses=True)
+    try:
+        requeued = FairQueue(redis_client).requeue_stale(
+            time.time() - AppConfig.SUBMISSION_CLAIM_TIMEOUT)
+        for _ in requeued:
+            process_submission.apply_async(queue=SUBMISSION_QUEUE)
+        if requeued:
+            logger.warning(f"Requeued {len(requeued)} abandoned submission(s): {requeued}")
+    except Exception as e:
+        logger.error(f"Failed to requeue abandoned submissions: {e}", exc_info=True)
+    finally:
+        redis_client.close()
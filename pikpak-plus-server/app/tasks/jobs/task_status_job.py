@@ -4,10 +4,13 @@ import json
 from datetime import datetime, timedelta, timezone
 
 from app.core.config import AppConfig
-from app.services.pikpak_service import PikPakService
 from celery import shared_task
-from app.services import PikPakService, SupabaseService
+from app.services import AsyncSupabaseService
+from app.services.account_pool import PikPakAccountPool
 from app.utils.common import CacheManager
+from app.services.task_tracker import ActiveTaskTracker, ACTIVE_PHASES, TERMINAL_PHASES
+from app.services.supabase_service import BULK_CHUNK_SIZE
+from app.tasks.utils import get_worker_services
 from app.core.config import AppConfig
 import redis
 
@@ -17,7 +20,7 @@ logger = logging.getLogger(__name__)
 @shared_task(bind=True, name='app.tasks.jobs.task_status_job.scheduled_task_status_update')
 def scheduled_task_status_update(self, source="scheduled"):
     """
-    Update task statuses from PikPak and sync to Supabase.
+    Update task statuses from every PikPak pool account and sync to Supabase.
     """
     run_time = datetime.now(timezone.utc)
     logger.info(
@@ -30,15 +33,12 @@ def scheduled_task_status_update(self, source="scheduled"):
         cache_manager = CacheManager(
             AppConfig.TASK_CACHE_TTL, AppConfig.REDIS_URL)
 
-        # Initialize Supabase
-        from supabase import create_client
-        supabase_client = create_client(
+        # Initialize Supabase (async client is bound to this job's event loop)
+        supabase_service = AsyncSupabaseService(
             AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY)
-        supabase_service = SupabaseService(supabase_client)
 
-        # Initialize PikPak
-        pikpak_service = PikPakService(
-            AppConfig.PIKPAK_USER, AppConfig.PIKPAK_PASS)
+        # Initialize PikPak (every pool account)
+        account_pool = PikPakAccountPool.from_config(redis_client)
 
         # Ensure logged in
         import asyncio
@@ -47,21 +47,31 @@ def scheduled_task_status_update(self, source="scheduled"):
         asyncio.set_event_loop(loop)
 
         try:
-            loop.run_until_complete(pikpak_service.ensure_logged_in())
+            loop.run_until_complete(account_pool.ensure_logged_in())
 
             logger.info("Fetching offline tasks from PikPak...")
-            pikpak_tasks_result = loop.run_until_complete(
-                pikpak_service.get_offline_tasks())
-            pikpak_tasks = pikpak_tasks_result.get('tasks', [])
-            logger.info(f"Fetched {len(pikpak_tasks)} tasks from PikPak")
-
-            # Update Supabase (sync)
-            updated_count = supabase_service.update_task_statuses(pikpak_tasks)
+            pikpak_tasks, complete = loop.run_until_complete(
+                account_pool.get_offline_tasks())
+            logger.info(
+                f"Fetched {len(pikpak_tasks)} tasks from {len(account_pool)} PikPak account(s)")
+
+            # Hand running/pending tasks to the adaptive poller; with an account
+            # missing from the listing, only enroll (don't drop its tasks)
+            tracker = ActiveTaskTracker(redis_client)
+            if complete:
+                tracker.sync_with(pikpak_tasks)
+            else:
+                tracker.enroll(t['id'] for t in pikpak_tasks if t.get('phase') in ACTIVE_PHASES)
+
+            # Update Supabase (only rows whose status changed)
+            changed_rows = loop.run_until_complete(
+                supabase_service.update_task_statuses(pikpak_tasks))
+            updated_count = len(changed_rows)
             logger.info(f"Updated {updated_count} task statuses in Supabase")
 
-            # Invalidate cache
-            cache_manager.invalidate_tasks()
-            logger.info("Invalidated task cache")
+            if changed_rows:
+                cache_manager.invalidate_tasks()
+                logger.info("Invalidated task cache")
 
             # Update Redis status
             from app.tasks.utils import update_redis_status
@@ -97,3 +107,71 @@ def scheduled_task_status_update(self, source="scheduled"):
                 f"Scheduled task status update failed: {e}", exc_info=True)
             # Retry the task if it failed (optional, can be configured in decorator)
             raise self.retry(exc=e, countdown=60, max_retries=3)
+
+
+@shared_task(bind=True, name='app.tasks.jobs.task_status_job.poll_active_task_statuses')
+def poll_active_task_statuses(self):
+    """
+    Refresh only the running/pending tasks that are due for a check.
+
+    Does nothing (no PikPak or Supabase calls) when no tracked task is due.
+    Tasks that left the active list get one lookup among recently finished
+    tasks for their final state and are then dropped from tracking; the full
+    scheduled_task_status_update remains the reconciler.
+    """
+    loop, services = get_worker_services()
+    redis_client = services["redis"]
+    tracker = ActiveTaskTracker(redis_client)
+    due_ids = []
+
+    try:
+        due_ids = tracker.due(limit=BULK_CHUNK_SIZE)
+        if not due_ids:
+            return
+
+        account_pool = services["pool"]
+        supabase_service = services["supabase"]
+
+        loop.run_until_complete(account_pool.ensure_logged_in())
+
+        active_tasks, complete = loop.run_until_complete(
+            account_pool.get_offline_tasks(phases=list(ACTIVE_PHASES)))
+        active = {t['id']: t for t in active_tasks}
+
+        still_active = {i: active[i] for i in due_ids if i in active}
+        # Tasks of an account that didn't answer are not known to have left
+        left = [i for i in due_ids if i not in active] if complete else []
+
+        finished = {}
+        if left:
+            finished_tasks, _ = loop.run_until_complete(
+                account_pool.get_offline_tasks(
+                    phases=list(TERMINAL_PHASES), size=AppConfig.TASK_POLL_FINISHED_LOOKUP))
+            finished = {t['id']: t for t in finished_tasks if t['id'] in left}
+
+        updates = list(still_active.values()) + list(finished.values())
+        changed_rows = loop.run_until_complete(
+            supabase_service.update_task_statuses(updates, task_ids=due_ids)) if updates else []
+
+        tracker.reschedule(still_active)
+        tracker.drop(left)
+        # Back off tasks whose account didn't answer
+        tracker.defer([i for i in due_ids if i not in active and i not in left],
+                      AppConfig.TASK_POLL_MAX_SECONDS)
+
+        if changed_rows:
+            CacheManager(AppConfig.TASK_CACHE_TTL, AppConfig.REDIS_URL).invalidate_tasks()
+
+        logger.info(
+            f"Polled {len(due_ids)} active task(s): {len(still_active)} still active, "
+            f"{len(left)} finished or gone, {len(changed_rows)} changed")
+
+    except Exception as e:
+        from app.services.pikpak_service import RateLimitError
+
+        if isinstance(e, RateLimitError):
+            # Push due tasks back instead of retrying; the next beat picks them up
+            logger.warning(f"Rate limited while polling active tasks: {e}")
+            tracker.defer(due_ids, 300)
+        else:
+            logger.error(f"Active task poll failed: {e}", exc_info=True)
@@ -0,0 +1,34 @@
+"""Token Refresh Job - Refresh PikPak access tokens and captcha tokens ahead of expiry."""
+import logging
+
+from celery import shared_task
+
+from app.tasks.utils import get_worker_services
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, name='app.tasks.jobs.token_refresh_job.refresh_pikpak_tokens')
+def refresh_pikpak_tokens(self):
+    """
+    Refresh the tokens of every PikPak pool account in the background.
+
+    Each account's access token is refreshed once TOKEN_REFRESH_FRACTION of
+    its lifetime has passed and published through Redis, together with a
+    pre-generated captcha token, so request paths never wait on a refresh.
+    The account pool and event loop are kept for the life of the worker
+    process, so a run with nothing due makes no PikPak calls.
+    Not retried: the next beat run is never more than
+    TOKEN_REFRESH_CHECK_SECONDS away.
+    """
+    try:
+        loop, services = get_worker_services()
+        results = loop.run_until_complete(services["pool"].gather(
+            lambda service: service.refresh_in_background()))
+
+        refreshed = [account_id for account_id, result in results.items() if result is True]
+        if refreshed:
+            logger.info(f"Refreshed tokens of PikPak account(s) {refreshed} in the background")
+
+    except Exception as e:
+        logger.error(f"Background token refresh failed: {e}", exc_info=True)
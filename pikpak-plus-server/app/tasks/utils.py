@@ -1,9 +1,43 @@
 """Shared utilities for task scheduling and Redis operations."""
+import asyncio
 import logging
 import json
 
+import redis
+
+from app.core.config import AppConfig
+from app.utils.common import bump_content_versions
+
 logger = logging.getLogger(__name__)
 
+# Reused by every frequent PikPak job run in this worker process (token
+# refresh, active task polling), so each run doesn't build new PikPak
+# clients, log in again or open new connections
+_loop = None
+_services = None
+
+
+def get_worker_services():
+    """Lazily create this worker process's event loop, Redis client, account pool and Supabase client
+
+    Returns:
+        Tuple of (event loop, {"redis", "pool", "supabase"})
+    """
+    global _loop, _services
+    if _services is None:
+        from app.services import AsyncSupabaseService
+        from app.services.account_pool import PikPakAccountPool
+
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+        redis_client = redis.from_url(AppConfig.REDIS_URL, decode_responses=True)
+        _services = {
+            "redis": redis_client,
+            "pool": PikPakAccountPool.from_config(redis_client),
+            "supabase": AsyncSupabaseService(AppConfig.SUPABASE_URL, AppConfig.SUPABASE_KEY),
+        }
+    return _loop, _services
+
 
 def update_redis_status(redis_client, run_time, next_run_time, job_name):
     """
@@ -42,6 +76,8 @@ def update_redis_status(redis_client, run_time, next_run_time, job_name):
 
         redis_client.set("pikpak_scheduler_status",
                          json.dumps(scheduler_info), ex=3600)
+        if job_name:
+            bump_content_versions(redis_client, "schedule")
 
         logger.info(
             f"Updated next {job_name} time in Redis: {next_run_time.isoformat()}Z "
@@ -0,0 +1,229 @@
+"""
+Circuit Breakers for PikPak Endpoint Families
+Stops calling a failing upstream endpoint family, with state shared by all workers
+
+Each pool account has its own breaker per family, so one account's failing
+credentials or rate limit don't fail fast the healthy accounts.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis
+
+from app.core.config import AppConfig
+from app.utils.retry_policy import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# Upstream endpoint families, each with its own breaker
+AUTH = "auth"        # user host: signin, token refresh, captcha
+DRIVE = "drive"      # drive/v1 files, shares, about
+TASKS = "tasks"      # offline downloads and the task list
+WEBDAV = "webdav"    # webdav/v1 applications
+VIP = "vip"          # vip/v1 transfer quota
+FAMILIES = (AUTH, DRIVE, TASKS, WEBDAV, VIP)
+
+# Allow the call unless open; once reset_timeout has passed, let exactly one
+# caller through as the half-open probe.
+# Returns {allowed, is_probe, seconds until a retry may succeed}.
+_BEFORE_CALL_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'state') ~= 'open' then
+    return {1, 0, 0}
+end
+local opened_at = tonumber(redis.call('HGET', KEYS[1], 'opened_at') or '0')
+local retry_after = opened_at + tonumber(ARGV[2]) - tonumber(ARGV[1])
+if retry_after > 0 then
+    return {0, 0, math.ceil(retry_after)}
+end
+if redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[3]) then
+    return {1, 1, 0}
+end
+return {0, 0, 1}
+"""
+
+# A probe success closes the circuit; a late success of a call started before
+# the circuit opened must not.
+_ON_SUCCESS_SCRIPT = """
+if ARGV[1] == '1' or redis.call('HGET', KEYS[1], 'state') ~= 'open' then
+    redis.call('HSET', KEYS[1], 'state', 'closed', 'failures', 0)
+end
+if ARGV[1] == '1' then
+    redis.call('DEL', KEYS[2])
+end
+return 1
+"""
+
+# A probe failure reopens the circuit; otherwise count consecutive failures
+# and open at fail_max. Returns 1 if the circuit was opened by this call.
+_ON_FAILURE_SCRIPT = """
+if ARGV[1] == '1' then
+    redis.call('HSET', KEYS[1], 'state', 'open', 'opened_at', ARGV[2])
+    redis.call('DEL', KEYS[2])
+    return 1
+end
+if redis.call('HGET', KEYS[1], 'state') == 'open' then
+    return 0
+end
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+if failures >= tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], 'state', 'open', 'opened_at', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint family whose circuit is open."""
+
+    def __init__(self, family: str, retry_after: int):
+        self.family = family
+        self.retry_after = retry_after
+        super().__init__(
+            f"PikPak {family} endpoints are unavailable (circuit open), retry in {retry_after}s")
+
+
+class CircuitBreaker:
+    """
+    Async circuit breaker for one PikPak endpoint family of one pool account.
+
+    State lives in a Redis hash, so every server and Celery worker sees the
+    same circuit. After CIRCUIT_BREAKER_FAIL_MAX consecutive failures the
+    circuit opens and calls fail fast with CircuitOpenError. After
+    CIRCUIT_BREAKER_RESET_TIMEOUT seconds a single caller is let through as
+    a probe: its success closes the circuit, its failure reopens it.
+
+    Fails open (calls go through unrecorded) when Redis is unavailable.
+    """
+
+    KEY_PREFIX = "circuit:"
+
+    def __init__(self, family: str, redis_client: Optional[redis.Redis],
+                 fail_max: int = AppConfig.CIRCUIT_BREAKER_FAIL_MAX,
+                 reset_timeout: int = AppConfig.CIRCUIT_BREAKER_RESET_TIMEOUT,
+                 account_id: int = AppConfig.PRIMARY_ACCOUNT_ID):
+        self.family = family
+        self.account_id = account_id
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        # The primary account keeps the unsuffixed keys
+        if account_id == AppConfig.PRIMARY_ACCOUNT_ID:
+            self.name = family
+            self.state_key = f"{self.KEY_PREFIX}{family}"
+        else:
+            self.name = f"{family} (account {account_id})"
+            self.state_key = f"{self.KEY_PREFIX}{account_id}:{family}"
+        self.probe_key = f"{self.state_key}:probe"
+        self.redis_client = redis_client
+        self._before_call = self._on_success = self._on_failure = None
+        if redis_client is not None:
+            self._before_call = redis_client.register_script(_BEFORE_CALL_SCRIPT)
+            self._on_success = redis_client.register_script(_ON_SUCCESS_SCRIPT)
+            self._on_failure = redis_client.register_script(_ON_FAILURE_SCRIPT)
+
+    def _admit(self) -> Optional[bool]:
+        """
+        Decide whether a call may go through.
+
+        Returns:
+            Whether the call is the half-open probe, or None if Redis is unavailable
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self._before_call is None:
+            return None
+        try:
+            allowed, is_probe, retry_after = self._before_call(
+                keys=[self.state_key, self.probe_key],
+                args=[time.time(), self.reset_timeout, AppConfig.REQUEST_TIMEOUT + 5])
+        except Exception as e:
+            logger.warning(f"Circuit breaker state unavailable for {self.name}: {e}")
+            return None
+
+        if not allowed:
+            raise CircuitOpenError(self.name, int(retry_after))
+        if is_probe:
+            logger.info(f"Circuit for PikPak {self.name} endpoints half-open, probing")
+        return bool(is_probe)
+
+    def _record(self, is_probe: Optional[bool], ok: bool) -> None:
+        """Record a call's outcome"""
+        if is_probe is None:
+            return
+        try:
+            if ok:
+                self._on_success(keys=[self.state_key, self.probe_key],
+                                 args=['1' if is_probe else '0'])
+                if is_probe:
+                    logger.info(f"Circuit for PikPak {self.name} endpoints closed")
+            elif self._on_failure(keys=[self.state_key, self.probe_key],
+                                  args=['1' if is_probe else '0', time.time(), self.fail_max]):
+                logger.warning(
+                    f"Circuit for PikPak {self.name} endpoints opened for {self.reset_timeout}s")
+        except Exception as e:
+            logger.warning(f"Failed to record circuit breaker result for {self.name}: {e}")
+
+    async def call(self, operation: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await operation(*args, **kwargs) through the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (operation is not called)
+        """
+        is_probe = self._admit()
+        try:
+            result = await operation(*args, **kwargs)
+        except (asyncio.CancelledError, DeadlineExceeded):
+            # Not the endpoint's fault; free the probe slot for another caller
+            if is_probe:
+                self._release_probe()
+            raise
+        except Exception:
+            self._record(is_probe, ok=False)
+            raise
+        self._record(is_probe, ok=True)
+        return result
+
+    def _release_probe(self) -> None:
+        try:
+            self.redis_client.delete(self.probe_key)
+        except Exception as e:
+            logger.warning(f"Failed to release circuit probe for {self.name}: {e}")
+
+    def is_open(self) -> bool:
+        """Whether calls would currently fail fast (without claiming the probe)"""
+        if self.redis_client is None:
+            return False
+        try:
+            state, opened_at = self.redis_client.hmget(self.state_key, 'state', 'opened_at')
+        except Exception as e:
+            logger.warning(f"Circuit breaker state unavailable for {self.name}: {e}")
+            return False
+        return state == 'open' and time.time() < float(opened_at or 0) + self.reset_timeout
+
+
+_redis_client: Optional[redis.Redis] = None
+_breakers: Dict[Tuple[int, str], CircuitBreaker] = {}
+
+
+def get_circuit_breaker(family: str,
+                        account_id: int = AppConfig.PRIMARY_ACCOUNT_ID) -> CircuitBreaker:
+    """Get or create the CircuitBreaker for an account's endpoint family."""
+    global _redis_client
+    key = (account_id, family)
+    if key not in _breakers:
+        if _redis_client is None and AppConfig.REDIS_URL:
+            try:
+                _redis_client = redis.from_url(AppConfig.REDIS_URL, decode_responses=True)
+            except Exception as e:
+                logger.error(f"Failed to connect to Redis for circuit breakers: {e}")
+        _breakers[key] = CircuitBreaker(family, _redis_client, account_id=account_id)
+    return _breakers[key]
+
+
+def fallback_key(cache_key: str) -> str:
+    """Cache key of the last known value served while a circuit is open."""
+    return f"{cache_key}:last_known"
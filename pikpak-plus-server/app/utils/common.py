@@ -1,16 +1,36 @@
 """Utility functions and helpers"""
 import logging
-import requests
 import json
+import re
 import redis
 from typing import Optional, Any
+from urllib.parse import parse_qs, unquote
 
 logger = logging.getLogger(__name__)
 
+# Redis hash of per-resource version counters backing conditional GET ETags
+CONTENT_VERSIONS_KEY = "content_versions"
+
+
+def bump_content_versions(redis_client, *names: str):
+    """Increment content version counters so cached ETags stop matching"""
+    if not redis_client or not names:
+        return
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for name in names:
+            pipe.hincrby(CONTENT_VERSIONS_KEY, name, 1)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Content version bump failed for {names}: {e}")
+
 
 class CacheManager:
     """Manages caching for API responses using Redis"""
 
+    ADMIN_STATS_KEY = "admin_stats_overview"
+
     def __init__(self, ttl: int, redis_url: str):
         self.ttl = ttl
         self.redis_client = None
@@ -73,6 +93,17 @@ class CacheManager:
         except Exception as e:
             logger.warning(f"Redis set error: {e}")
 
+    def delete(self, *keys: str):
+        """Remove one or more keys from Redis cache"""
+        if not self.redis_client or not keys:
+            return
+
+        try:
+            self.redis_client.delete(*keys)
+            logger.debug(f"Deleted {len(keys)} Redis cache key(s)")
+        except Exception as e:
+            logger.warning(f"Redis delete error: {e}")
+
     def clear(self):
         """Clear all cache entries"""
         if not self.redis_client:
@@ -85,11 +116,16 @@ class CacheManager:
             logger.error(f"Redis clear error: {e}")
 
     def invalidate_tasks(self):
-        """Invalidate all task-related cache entries from Redis"""
+        """Invalidate all task-related cache entries from Redis
+
+        Tasks are public_actions rows, so the admin action log ("logs")
+        is marked as changed together with them.
+        """
         if not self.redis_client:
             return
 
         try:
+            bump_content_versions(self.redis_client, "tasks", "logs")
             task_keys = self.redis_client.keys("tasks_*")
             if task_keys:
                 self.redis_client.delete(*task_keys)
@@ -100,26 +136,23 @@ class CacheManager:
         except Exception as e:
             logger.error(f"Redis invalidate tasks error: {e}")
 
+    def invalidate_admin_stats(self):
+        """Drop the cached admin overview counts after user or action writes"""
+        self.delete(self.ADMIN_STATS_KEY)
 
-def analyze_link(url: str) -> dict:
-    """Analyze a link using WhatsLink API"""
-    meta = {}
-    try:
-        wl_res = requests.get(
-            f"https://whatslink.info/api/v1/link?url={url}",
-            timeout=10
-        )
-        if wl_res.status_code == 200:
-            meta = wl_res.json()
-        else:
-            logger.warning(
-                f"WhatsLink returned status {wl_res.status_code} for {url}")
-            meta = {"error": f"Status {wl_res.status_code}"}
-    except Exception as e:
-        logger.error(f"WhatsLink Error for {url}: {e}")
-        meta = {"error": str(e)}
+    def bump_versions(self, *names: str):
+        """Mark resources as changed for conditional GET (see app.api.utils.etag)"""
+        bump_content_versions(self.redis_client, *names)
 
-    return meta
+
+# PikPak file IDs are URL-safe tokens (e.g. "VNaBcD3e-F_gh"); checked before
+# an ID is interpolated into a PostgREST filter string
+_FILE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def is_valid_file_id(file_id) -> bool:
+    """Whether a value looks like a PikPak file ID"""
+    return isinstance(file_id, str) and bool(_FILE_ID_RE.match(file_id))
 
 
 def validate_magnet_link(url: str) -> tuple[bool, str]:
@@ -212,7 +245,6 @@ def extract_magnet_hash(url: str) -> Optional[str]:
     try:
         # Extract query parameters
         query = url.split("?", 1)[1] if "?" in url else ""
-        from urllib.parse import parse_qs
         params = parse_qs(query)
 
         # Look for 'xt' parameter (Exact Topic)
@@ -237,24 +269,68 @@ def extract_e2dk_hash(url: str) -> Optional[str]:
     Returns:
         The MD5 hash if found, None otherwise
     """
-    if not url or not url.startswith("ed2k://"):
-        return None
+    return extract_link_metadata(url).get("hash") if url and url.startswith("ed2k://") else None
+
+
+def _parse_e2dk(url: str) -> dict:
+    """Name, size and hash from ed2k://|file|name|size|hash|/"""
+    # url[7:] = '|file|name|size|hash|/' -> ['', 'file', name, size, hash, '/']
+    parts = url.strip()[7:].split("|")
+    if len(parts) < 5 or parts[1] != "file":
+        return {}
+
+    metadata = {"count": 1}
+    if parts[2]:
+        metadata["name"] = unquote(parts[2])
+    if parts[3].isdigit():
+        metadata["size"] = int(parts[3])
+    if parts[4]:
+        metadata["hash"] = parts[4].lower()
+    return metadata
+
+
+def _parse_magnet(url: str) -> dict:
+    """Name (dn), exact length (xl) and info hash (btih) from a magnet link"""
+    query = url.split("?", 1)[1] if "?" in url else ""
+    params = parse_qs(query)
+
+    metadata = {}
+    hash_value = extract_magnet_hash(url)
+    if hash_value:
+        metadata["hash"] = hash_value
+    if params.get("dn"):
+        metadata["name"] = params["dn"][0]
+
+    # xl is whatever the client wrote; it is not confirmed against the torrent
+    xl = (params.get("xl") or [""])[0]
+    if xl.isdigit():
+        metadata["size"] = int(xl)
+    return metadata
+
+
+def extract_link_metadata(url: str) -> dict:
+    """
+    Derive file metadata from the link itself, without any network call
+
+    ed2k links always carry name, size and hash; magnet links carry the
+    info hash and, when present, dn (name) and xl (exact length in bytes).
+
+    Args:
+        url: A magnet or E2DK link
+
+    Returns:
+        Dictionary with whichever of name, size, hash and count the link
+        contains (empty if none or the link is malformed)
+    """
+    if not url:
+        return {}
 
     try:
-        # E2DK format: ed2k://|file|filename|size|hash|/
-        # Extract the parts between pipes
-        content = url[7:]  # Remove 'ed2k://'
-        parts = content.split("|")
-        
-        # parts[0] = 'file'
-        # parts[1] = filename
-        # parts[2] = size
-        # parts[3] = hash (MD5)
-        # parts[4] = '' (empty before final /)
-        
-        if len(parts) >= 4 and parts[0] == "file":
-            return parts[3].lower()
+        if url.startswith("ed2k://"):
+            return _parse_e2dk(url)
+        if url.startswith("magnet:"):
+            return _parse_magnet(url)
     except Exception as e:
-        logger.error(f"Failed to extract hash from E2DK link: {e}")
+        logger.error(f"Failed to extract metadata from link: {e}")
 
-    return None
+    return {}
@@ -0,0 +1,226 @@
+"""Vectorized forecasting for daily statistics
+
+All metric series are stacked into one (metrics x days) matrix and fitted
+together with NumPy, so adding a metric or a model costs one more row or one
+more matrix operation instead of another pure-Python loop.
+
+Models:
+    linear      - closed-form least squares trend (what the charts plot)
+    exponential - Holt's double exponential smoothing (level + trend)
+    seasonal    - linear trend plus a day-of-week offset
+
+Results are memoized by the latest daily_statistics date, so a forecast is
+computed once per day (per process) no matter how often /statistics is hit.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("tasks_added", "storage_used", "transfer_used", "downstream_traffic")
+
+# Cumulative metrics that can run into a quota limit
+QUOTA_METRICS = ("storage_used", "transfer_used")
+
+DATE_FORMAT = '%Y-%m-%d'
+SMOOTHING_ALPHA = 0.5  # Level smoothing factor
+SMOOTHING_BETA = 0.3  # Trend smoothing factor
+MIN_SEASONAL_DAYS = 14  # Need two full weeks before trusting weekday offsets
+
+_MEMO_SIZE = 32
+_memo: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _series_matrix(rows: List[Dict[str, Any]]) -> np.ndarray:
+    """Stack metric series from date-sorted rows into a (metrics, days) matrix"""
+    return np.array(
+        [[float(row.get(metric) or 0) for row in rows] for metric in METRICS],
+        dtype=float
+    )
+
+
+def fit_linear(y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Least squares line for every series at once
+
+    Args:
+        y: (series, days) matrix
+
+    Returns:
+        (slopes, intercepts), each of shape (series,)
+    """
+    n = y.shape[1]
+    if n < 2:
+        return np.zeros(y.shape[0]), y[:, -1] if n else np.zeros(y.shape[0])
+
+    x = np.column_stack([np.arange(n, dtype=float), np.ones(n)])
+    coef, *_ = np.linalg.lstsq(x, y.T, rcond=None)
+    return coef[0], coef[1]
+
+
+def linear_forecast(y: np.ndarray, horizon: int) -> np.ndarray:
+    """Extend each series' least squares trend by horizon days"""
+    slopes, intercepts = fit_linear(y)
+    future_x = np.arange(y.shape[1], y.shape[1] + horizon, dtype=float)
+    return np.outer(slopes, future_x) + intercepts[:, None]
+
+
+def exponential_forecast(y: np.ndarray, horizon: int,
+                         alpha: float = SMOOTHING_ALPHA, beta: float = SMOOTHING_BETA) -> np.ndarray:
+    """Holt's linear exponential smoothing, vectorized across series"""
+    n = y.shape[1]
+    if n < 2:
+        return np.repeat(y[:, -1:] if n else np.zeros((y.shape[0], 1)), horizon, axis=1)
+
+    level = y[:, 0].copy()
+    trend = y[:, 1] - y[:, 0]
+    for t in range(1, n):
+        previous_level = level
+        level = alpha * y[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+
+    steps = np.arange(1, horizon + 1, dtype=float)
+    return level[:, None] + np.outer(trend, steps)
+
+
+def seasonal_forecast(y: np.ndarray, weekdays: np.ndarray, horizon: int) -> np.ndarray:
+    """Linear trend plus the mean residual for each day of the week
+
+    Args:
+        y: (series, days) matrix
+        weekdays: Weekday (0-6) of each observed day
+        horizon: Days to forecast
+    """
+    n = y.shape[1]
+    trend = linear_forecast(y, horizon)
+    if n < MIN_SEASONAL_DAYS:
+        return trend
+
+    slopes, intercepts = fit_linear(y)
+    fitted = np.outer(slopes, np.arange(n, dtype=float)) + intercepts[:, None]
+    residuals = y - fitted
+
+    # One-hot weekday matrix turns per-weekday means into a single matmul
+    one_hot = np.eye(7)[weekdays]
+    counts = one_hot.sum(axis=0)
+    offsets = np.divide(residuals @ one_hot, counts,
+                        out=np.zeros((y.shape[0], 7)), where=counts > 0)
+
+    future_weekdays = (weekdays[-1] + np.arange(1, horizon + 1)) % 7
+    return trend + offsets[:, future_weekdays]
+
+
+def days_until_exhausted(current: np.ndarray, slopes: np.ndarray, limits: np.ndarray) -> List[Optional[float]]:
+    """Days until each series reaches its limit at the fitted daily growth
+
+    None when there is no positive limit or the series is not growing.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days = (limits - current) / slopes
+    valid = (limits > 0) & (slopes > 0)
+    return [round(float(max(d, 0.0)), 1) if ok else None for d, ok in zip(days, valid)]
+
+
+def extract_quota_limits(quota_info: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Pull storage and offline transfer limits out of the cached quota_info payload"""
+    if not quota_info:
+        return {}
+
+    limits = {}
+    try:
+        storage_limit = int(quota_info.get("storage", {}).get("quota", {}).get("limit", 0) or 0)
+        if storage_limit > 0:
+            limits["storage_used"] = storage_limit
+
+        transfer = quota_info.get("transfer", {})
+        transfer_limit = sum(
+            int(transfer.get(bucket, {}).get("offline", {}).get("total_assets", 0) or 0)
+            for bucket in ("base", "transfer")
+        )
+        if transfer_limit > 0:
+            limits["transfer_used"] = transfer_limit
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.debug(f"Could not read quota limits: {e}")
+
+    return limits
+
+
+def build_forecast(rows: List[Dict[str, Any]], horizon: int = 7,
+                   limits: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Forecast every metric with every model (memoized)
+
+    Args:
+        rows: daily_statistics rows sorted by date ascending
+        horizon: Number of future days to forecast
+        limits: Optional quota limits keyed by metric (see extract_quota_limits)
+
+    Returns:
+        {'dates': [...], 'models': {model: {metric: [...]}},
+         'daily_growth': {metric: float}, 'days_until_exhausted': {metric: float | None}}
+    """
+    if not rows:
+        return {}
+
+    limits = limits or {}
+    key = (rows[-1]['date'], len(rows), horizon, tuple(sorted(limits.items())))
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+
+    y = _series_matrix(rows)
+    dates = [datetime.strptime(row['date'], DATE_FORMAT) for row in rows]
+    weekdays = np.array([d.weekday() for d in dates])
+
+    slopes, _ = fit_linear(y)
+    forecasts = {
+        "linear": linear_forecast(y, horizon),
+        "exponential": exponential_forecast(y, horizon),
+        "seasonal": seasonal_forecast(y, weekdays, horizon),
+    }
+
+    quota_idx = [METRICS.index(m) for m in QUOTA_METRICS]
+    exhaustion = days_until_exhausted(
+        y[quota_idx, -1],
+        slopes[quota_idx],
+        np.array([float(limits.get(m, 0)) for m in QUOTA_METRICS])
+    )
+
+    result = {
+        "dates": [(dates[-1] + timedelta(days=i + 1)).strftime(DATE_FORMAT) for i in range(horizon)],
+        "models": {
+            name: {
+                # Truncated like the predictions appended to daily rows always were
+                metric: np.clip(values[i], 0, None).astype(int).tolist()
+                for i, metric in enumerate(METRICS)
+            }
+            for name, values in forecasts.items()
+        },
+        "daily_growth": {metric: float(slopes[i]) for i, metric in enumerate(METRICS)},
+        "days_until_exhausted": dict(zip(QUOTA_METRICS, exhaustion)),
+    }
+
+    with _memo_lock:
+        _memo[key] = result
+        while len(_memo) > _MEMO_SIZE:
+            _memo.popitem(last=False)
+
+    return result
+
+
+def forecast_for_stats(stats: List[Dict[str, Any]], quota_info: Optional[Dict[str, Any]] = None,
+                       horizon: int = 7) -> Dict[str, Any]:
+    """Forecast for a get_daily_stats() result, ignoring its predicted rows
+
+    Args:
+        stats: Rows returned by get_daily_stats (actual + predicted)
+        quota_info: Cached quota_info payload used for exhaustion projections
+        horizon: Number of future days to forecast
+    """
+    actual = [row for row in stats if not row.get('is_predicted')]
+    return build_forecast(actual, horizon, extract_quota_limits(quota_info))
@@ -0,0 +1,68 @@
+"""Keyset (cursor) pagination helpers
+
+Lists ordered by (created_at DESC, id DESC) can be paged with an opaque
+cursor holding the last row's sort key instead of an offset, so every page
+is an index range scan no matter how deep it is.
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+INVALID_CURSOR = "Invalid cursor"
+
+# PostgREST count strategies: 'exact' runs COUNT(*) over the filtered set,
+# 'planned' reads the planner estimate and 'estimated' is exact only for
+# small results. Large lists default to 'estimated'.
+COUNT_MODES = ("exact", "planned", "estimated")
+DEFAULT_COUNT_MODE = "estimated"
+
+
+def parse_count_mode(value: Optional[str]) -> str:
+    """Validate a ?count= query value, falling back to the default mode"""
+    if value and value.lower() in COUNT_MODES:
+        return value.lower()
+    return DEFAULT_COUNT_MODE
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Build an opaque cursor pointing just past the given row"""
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), int(row_id)
+    except Exception:
+        raise ValueError(INVALID_CURSOR)
+
+
+def apply_keyset(query, cursor: Optional[str]):
+    """Restrict a (created_at DESC, id DESC) ordered query to rows after the cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return query
+
+    created_at, row_id = decode_cursor(cursor)
+    # Timestamps contain ':' and '+', so quote them inside the PostgREST filter
+    return query.or_(
+        f'created_at.lt."{created_at}",'
+        f'and(created_at.eq."{created_at}",id.lt.{row_id})'
+    )
+
+
+def next_cursor(rows: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """Cursor for the following page, or None when this page is the last"""
+    if len(rows) < limit or not rows:
+        return None
+    return encode_cursor(rows[-1])
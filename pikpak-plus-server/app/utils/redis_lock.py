@@ -3,10 +3,11 @@ Distributed Lock for PikPak Login Coordination
 Prevents multiple workers from attempting login simultaneously
 """
 import redis
+import json
 import time
 import asyncio
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 from app.core.config import AppConfig
 
 logger = logging.getLogger(__name__)
@@ -23,12 +24,25 @@ class DistributedLoginLock:
     LOCK_KEY = "pikpak:login_lock"
     COOLDOWN_KEY = "pikpak:last_login_time"
     VALID_TOKEN_KEY = "pikpak:token_valid_until"
+    PUBLISHED_TOKENS_KEY = "pikpak:published_tokens"  # HASH: access/refresh token, user_id
+    CAPTCHA_TOKENS_KEY = "pikpak:captcha_tokens"  # HASH: action -> {"token", "expires_at"}
     LOCK_TTL = 60  # Lock expires after 60 seconds
     COOLDOWN_SECONDS = 120  # 2 minutes cooldown between logins
     POLL_INTERVAL = 0.5  # Check lock status every 0.5 seconds
 
-    def __init__(self, redis_url: Optional[str] = None):
-        """Initialize with Redis connection."""
+    def __init__(self, redis_url: Optional[str] = None,
+                 account_id: int = AppConfig.PRIMARY_ACCOUNT_ID):
+        """Initialize with Redis connection.
+
+        Pool accounts other than the primary get their own keys, so one
+        account's login or cooldown never blocks another's.
+        """
+        if account_id != AppConfig.PRIMARY_ACCOUNT_ID:
+            self.LOCK_KEY = f"pikpak:{account_id}:login_lock"
+            self.COOLDOWN_KEY = f"pikpak:{account_id}:last_login_time"
+            self.VALID_TOKEN_KEY = f"pikpak:{account_id}:token_valid_until"
+            self.PUBLISHED_TOKENS_KEY = f"pikpak:{account_id}:published_tokens"
+            self.CAPTCHA_TOKENS_KEY = f"pikpak:{account_id}:captcha_tokens"
         self._redis_url = redis_url or AppConfig.REDIS_URL
         self._redis: Optional[redis.Redis] = None
         self._lock_acquired = False
@@ -184,6 +198,96 @@ class DistributedLoginLock:
             logger.error(f"Failed to check token validity: {e}")
             return False
 
+    def publish_tokens(self, access_token: str, refresh_token: Optional[str],
+                       user_id: Optional[str], expires_at: float) -> None:
+        """
+        Publish freshly issued tokens to every worker.
+
+        Workers adopt these instead of refreshing inline when their own
+        token nears expiry (a refresh rotates the refresh token, so the one
+        they hold may no longer work). Also records the token validity.
+
+        Args:
+            access_token: New access token
+            refresh_token: New refresh token
+            user_id: PikPak user ID
+            expires_at: Unix timestamp when the access token expires
+        """
+        try:
+            ttl = max(1, int(expires_at - time.time()))
+            pipe = self.redis.pipeline()
+            pipe.delete(self.PUBLISHED_TOKENS_KEY)
+            pipe.hset(self.PUBLISHED_TOKENS_KEY, mapping={
+                'access_token': access_token,
+                'refresh_token': refresh_token or '',
+                'user_id': user_id or '',
+            })
+            pipe.expire(self.PUBLISHED_TOKENS_KEY, ttl)
+            pipe.set(self.VALID_TOKEN_KEY, str(expires_at), ex=ttl)
+            pipe.execute()
+            logger.debug(f"Published tokens valid until {expires_at}")
+        except Exception as e:
+            logger.error(f"Failed to publish tokens: {e}")
+
+    def get_published_tokens(self) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Get the most recently published tokens.
+
+        Returns:
+            Dict with 'access_token', 'refresh_token' and 'user_id', or None
+        """
+        try:
+            tokens = self.redis.hgetall(self.PUBLISHED_TOKENS_KEY)
+        except Exception as e:
+            logger.error(f"Failed to read published tokens: {e}")
+            return None
+        if not tokens or not tokens.get('access_token'):
+            return None
+        return {key: tokens.get(key) or None
+                for key in ('access_token', 'refresh_token', 'user_id')}
+
+    def publish_captcha_token(self, action: str, token: str, expires_at: float) -> None:
+        """
+        Share a captcha token for an action with every worker.
+
+        Captcha tokens are bound to the device ID, which is derived from
+        the account credentials, so any worker of the account can use them.
+
+        Args:
+            action: Captcha action, e.g. "GET:/drive/v1/about"
+            token: Captcha token
+            expires_at: Unix timestamp when the captcha token expires
+        """
+        try:
+            pipe = self.redis.pipeline()
+            pipe.hset(self.CAPTCHA_TOKENS_KEY, action, json.dumps(
+                {'token': token, 'expires_at': expires_at}))
+            pipe.expire(self.CAPTCHA_TOKENS_KEY, max(1, int(expires_at - time.time())))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to publish captcha token: {e}")
+
+    def get_captcha_token(self, action: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the shared captcha token for an action.
+
+        Returns:
+            Dict with 'token' and 'expires_at', or None if none is shared
+        """
+        try:
+            raw = self.redis.hget(self.CAPTCHA_TOKENS_KEY, action)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.error(f"Failed to read captcha token: {e}")
+            return None
+
+    def clear_published(self) -> None:
+        """Drop published tokens and captcha tokens (forced re-login)."""
+        try:
+            self.redis.delete(self.PUBLISHED_TOKENS_KEY, self.CAPTCHA_TOKENS_KEY)
+        except Exception as e:
+            logger.error(f"Failed to clear published tokens: {e}")
+
     async def wait_for_lock_release(self, timeout_seconds: int = 60) -> bool:
         """
         Wait for another worker to complete login.
@@ -230,13 +334,12 @@ class DistributedLoginLock:
         self.close()
 
 
-# Global singleton instance
-_login_lock: Optional[DistributedLoginLock] = None
+# One instance per pool account
+_login_locks: Dict[int, DistributedLoginLock] = {}
 
 
-def get_login_lock() -> DistributedLoginLock:
-    """Get or create the global DistributedLoginLock instance."""
-    global _login_lock
-    if _login_lock is None:
-        _login_lock = DistributedLoginLock()
-    return _login_lock
+def get_login_lock(account_id: int = AppConfig.PRIMARY_ACCOUNT_ID) -> DistributedLoginLock:
+    """Get or create the DistributedLoginLock instance for an account."""
+    if account_id not in _login_locks:
+        _login_locks[account_id] = DistributedLoginLock(account_id=account_id)
+    return _login_locks[account_id]
@@ -0,0 +1,221 @@
+"""
+Retry Policy for PikPak Calls
+One place that decides whether, when and for how long a PikPak call is retried
+
+Retries used to stack: the PikPak client retried every request, the service
+retried the client, and a 60s timeout sat on top of both, while gunicorn
+kills a request after 30s. Now the client makes a single attempt and
+PikPakService._execute_with_retry retries under this policy, which
+
+- bounds every attempt, backoff sleep and login wait by the deadline of the
+  current request (carried in a contextvar, set by run_async), and
+- spends from a retry budget shared by all workers: retries may not exceed
+  RETRY_BUDGET_RATIO of recent requests (plus a small floor), so a PikPak
+  outage doesn't multiply the load on it.
+
+Background jobs run without a deadline; only the per-attempt timeout and
+the budget apply to them.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from random import uniform
+from typing import Iterator, Optional
+
+import redis
+
+from app.core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("pikpak_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the current request's deadline leaves no time for a PikPak call."""
+    pass
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound PikPak calls made inside the block to `seconds` from now.
+
+    A nested deadline can only tighten an outer one. None leaves the
+    current deadline unchanged.
+    """
+    if seconds is None:
+        yield
+        return
+
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires_at if current is None else min(current, expires_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def bounded(seconds: float) -> float:
+    """
+    Cap a timeout or wait by the remaining deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return seconds
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded before calling PikPak")
+    return min(seconds, left)
+
+
+# Allow a retry while retries stay under ratio * requests + floor over the
+# current and previous window, and record it. Returns 1 if allowed.
+_SPEND_SCRIPT = """
+local requests, retries = 0, 0
+for _, key in ipairs(KEYS) do
+    local counts = redis.call('HMGET', key, 'requests', 'retries')
+    requests = requests + tonumber(counts[1] or 0)
+    retries = retries + tonumber(counts[2] or 0)
+end
+if retries + 1 > requests * tonumber(ARGV[1]) + tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], 'retries', 1)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RetryBudget:
+    """
+    Retries as a fraction of requests, shared by all workers through Redis.
+
+    Counts live in a Redis hash per RETRY_BUDGET_WINDOW; the current and
+    previous windows are considered. Fails open when Redis is unavailable.
+    """
+
+    KEY_PREFIX = "retry_budget:"
+
+    def __init__(self, redis_client: Optional[redis.Redis],
+                 ratio: float = AppConfig.RETRY_BUDGET_RATIO,
+                 min_retries: int = AppConfig.RETRY_BUDGET_MIN_RETRIES,
+                 window: int = AppConfig.RETRY_BUDGET_WINDOW):
+        self.redis_client = redis_client
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._spend = redis_client.register_script(_SPEND_SCRIPT) if redis_client is not None else None
+
+    def _keys(self):
+        window = int(time.time() // self.window)
+        return [f"{self.KEY_PREFIX}{w}" for w in (window, window - 1)]
+
+    def record_request(self) -> None:
+        """Count a first attempt; each one lets RETRY_BUDGET_RATIO more retries through"""
+        if self.redis_client is None:
+            return
+        key = self._keys()[0]
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hincrby(key, "requests", 1)
+            pipe.expire(key, self.window * 2)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record request in retry budget: {e}")
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False if it is exhausted"""
+        if self._spend is None:
+            return True
+        try:
+            return bool(self._spend(keys=self._keys(),
+                                    args=[self.ratio, self.min_retries, self.window * 2]))
+        except Exception as e:
+            logger.warning(f"Retry budget unavailable: {e}")
+            return True
+
+
+class RetryPolicy:
+    """Attempt count, backoff, deadline and budget checks for PikPak calls"""
+
+    def __init__(self, budget: Optional[RetryBudget] = None,
+                 max_attempts: int = AppConfig.RETRY_MAX_ATTEMPTS,
+                 base_delay: float = 1.0, max_delay: float = 10.0,
+                 rate_limit_delay: float = 30.0):
+        self.budget = budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_delay = rate_limit_delay
+
+    def attempt_timeout(self) -> float:
+        """Timeout of the next attempt: REQUEST_TIMEOUT, capped by the deadline"""
+        return bounded(AppConfig.REQUEST_TIMEOUT)
+
+    def record_request(self) -> None:
+        if self.budget:
+            self.budget.record_request()
+
+    def next_delay(self, attempt: int, rate_limited: bool = False) -> Optional[float]:
+        """
+        Backoff before retrying after a failed attempt.
+
+        Args:
+            attempt: Zero-based index of the attempt that failed
+            rate_limited: Whether PikPak answered "too frequent"
+
+        Returns:
+            Seconds to sleep, or None if the call must not be retried
+            (attempts used up, no time left before the deadline, or the
+            retry budget is exhausted)
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+
+        if rate_limited:
+            delay = self.rate_limit_delay
+        else:
+            delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        delay += uniform(0, delay * 0.1)
+
+        left = remaining()
+        # The retry needs time to run after the sleep, not just the sleep itself
+        if left is not None and delay + AppConfig.RETRY_MIN_ATTEMPT_SECONDS > left:
+            logger.warning(f"Not retrying: {left:.1f}s left before the request deadline")
+            return None
+
+        if self.budget and not self.budget.try_spend():
+            logger.warning("Not retrying: PikPak retry budget exhausted")
+            return None
+
+        return delay
+
+
+_retry_policy: Optional[RetryPolicy] = None
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Get or create the process-wide RetryPolicy."""
+    global _retry_policy
+    if _retry_policy is None:
+        redis_client = None
+        if AppConfig.REDIS_URL:
+            try:
+                redis_client = redis.from_url(AppConfig.REDIS_URL, decode_responses=True)
+            except Exception as e:
+                logger.error(f"Failed to connect to Redis for the retry budget: {e}")
+        _retry_policy = RetryPolicy(RetryBudget(redis_client))
+    return _retry_policy
@@ -2,6 +2,7 @@
 Gunicorn configuration file for PikPak Plus Server
 """
 import multiprocessing
+import os
 
 # Server socket
 bind = "0.0.0.0:5000"
@@ -15,6 +16,12 @@ worker_connections = 1000
 timeout = 30
 keepalive = 2
 
+# Load the app once in the master: config, extensions and routes are built
+# there and inherited by workers, which only open their own connections
+# (post_fork). Exported so create_app knows to defer per-worker resources.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+os.environ["GUNICORN_PRELOAD"] = str(preload_app).lower()
+
 # Logging
 accesslog = "-"  # Log to stdout
 errorlog = "-"   # Log to stderr
@@ -41,10 +48,14 @@ def pre_fork(server, worker):
 
 
 def post_fork(server, worker):
-    """Log worker startup only from primary worker (worker 0)"""
+    """Create the worker's own connections and services (preload mode)"""
     if worker.pid == 0:
         server.log.info("Primary worker spawned")
 
+    if preload_app:
+        from app import init_worker_resources
+        init_worker_resources(bootstrap=False)
+
 
 def pre_exec(server):
     """Reduce pre-exec logging"""
@@ -0,0 +1,138 @@
+-- Migration: Trigger-maintained admin statistics
+-- Description: Keeps user and action counts in a one-row summary table so the
+-- admin overview is a single RPC call instead of four COUNT(*) scans
+
+-- Summary table (singleton row)
+CREATE TABLE IF NOT EXISTS admin_statistics (
+    id INTEGER PRIMARY KEY DEFAULT 1,
+    total_users BIGINT NOT NULL DEFAULT 0,
+    blocked_users BIGINT NOT NULL DEFAULT 0,
+    total_tasks BIGINT NOT NULL DEFAULT 0,
+    total_logs BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT admin_statistics_single_row CHECK (id = 1)
+);
+
+ALTER TABLE admin_statistics ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for anon" ON admin_statistics
+    FOR SELECT
+    TO anon
+    USING (true);
+
+-- Backfill from the current tables
+INSERT INTO admin_statistics (id, total_users, blocked_users, total_tasks, total_logs)
+SELECT
+    1,
+    (SELECT COUNT(*) FROM users),
+    (SELECT COUNT(*) FROM users WHERE blocked),
+    (SELECT COUNT(*) FROM public_actions WHERE action = 'add'),
+    (SELECT COUNT(*) FROM public_actions)
+ON CONFLICT (id) DO UPDATE SET
+    total_users = EXCLUDED.total_users,
+    blocked_users = EXCLUDED.blocked_users,
+    total_tasks = EXCLUDED.total_tasks,
+    total_logs = EXCLUDED.total_logs,
+    updated_at = NOW();
+
+-- Statement-level triggers: a batched insert of N rows updates the counters once.
+-- They run as their owner (SECURITY DEFINER) with a pinned search_path, so a
+-- caller's own schema objects can't stand in for admin_statistics
+CREATE OR REPLACE FUNCTION admin_statistics_users_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    users_delta BIGINT := 0;
+    blocked_delta BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT users_delta + COUNT(*), blocked_delta + COUNT(*) FILTER (WHERE blocked)
+        INTO users_delta, blocked_delta
+        FROM new_rows;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT users_delta - COUNT(*), blocked_delta - COUNT(*) FILTER (WHERE blocked)
+        INTO users_delta, blocked_delta
+        FROM old_rows;
+    END IF;
+
+    IF users_delta <> 0 OR blocked_delta <> 0 THEN
+        UPDATE admin_statistics
+        SET total_users = total_users + users_delta,
+            blocked_users = blocked_users + blocked_delta,
+            updated_at = NOW()
+        WHERE id = 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+CREATE OR REPLACE FUNCTION admin_statistics_actions_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    tasks_delta BIGINT := 0;
+    logs_delta BIGINT := 0;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT COUNT(*) FILTER (WHERE action = 'add'), COUNT(*)
+        INTO tasks_delta, logs_delta
+        FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT -COUNT(*) FILTER (WHERE action = 'add'), -COUNT(*)
+        INTO tasks_delta, logs_delta
+        FROM old_rows;
+    END IF;
+
+    IF tasks_delta <> 0 OR logs_delta <> 0 THEN
+        UPDATE admin_statistics
+        SET total_tasks = total_tasks + tasks_delta,
+            total_logs = total_logs + logs_delta,
+            updated_at = NOW()
+        WHERE id = 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+DROP TRIGGER IF EXISTS admin_statistics_users_insert ON users;
+CREATE TRIGGER admin_statistics_users_insert AFTER INSERT ON users
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_users_changed();
+
+DROP TRIGGER IF EXISTS admin_statistics_users_update ON users;
+CREATE TRIGGER admin_statistics_users_update AFTER UPDATE ON users
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_users_changed();
+
+DROP TRIGGER IF EXISTS admin_statistics_users_delete ON users;
+CREATE TRIGGER admin_statistics_users_delete AFTER DELETE ON users
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_users_changed();
+
+DROP TRIGGER IF EXISTS admin_statistics_actions_insert ON public_actions;
+CREATE TRIGGER admin_statistics_actions_insert AFTER INSERT ON public_actions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_actions_changed();
+
+DROP TRIGGER IF EXISTS admin_statistics_actions_delete ON public_actions;
+CREATE TRIGGER admin_statistics_actions_delete AFTER DELETE ON public_actions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_actions_changed();
+
+-- RPC used by SupabaseService.get_admin_statistics
+CREATE OR REPLACE FUNCTION get_admin_statistics()
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'total_users', total_users,
+        'active_users', total_users - blocked_users,
+        'blocked_users', blocked_users,
+        'total_tasks', total_tasks,
+        'total_logs', total_logs
+    )
+    FROM admin_statistics
+    WHERE id = 1;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,17 @@
+-- Migration: PikPak account pool
+-- Description: One pikpak_tokens row per pool account (id 1 is the primary
+-- USER/PASSWD account, extra accounts from PIKPAK_EXTRA_ACCOUNTS take 2, 3, ...)
+
+-- Allow more than the single token row
+ALTER TABLE pikpak_tokens DROP CONSTRAINT IF EXISTS single_row;
+
+-- Look up the account holding a file when sharing it
+CREATE INDEX IF NOT EXISTS idx_public_actions_add_file_id
+    ON public_actions ((data->'task'->'file'->>'id'))
+    WHERE action = 'add';
+
+-- Same lookup for files recorded only by task (data.task.task.file_id), the
+-- other branch of get_account_for_file's OR filter
+CREATE INDEX IF NOT EXISTS idx_public_actions_add_task_file_id
+    ON public_actions ((data->'task'->'task'->>'file_id'))
+    WHERE action = 'add';
@@ -0,0 +1,12 @@
+-- Migration: Keyset pagination for public_actions
+-- Description: Indexes matching ORDER BY created_at DESC, id DESC for the
+-- task list, per-user task list and admin log endpoints
+
+CREATE INDEX IF NOT EXISTS idx_public_actions_action_created_id
+    ON public_actions(action, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_public_actions_user_action_created_id
+    ON public_actions(user_email, action, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_public_actions_created_id
+    ON public_actions(created_at DESC, id DESC);
@@ -0,0 +1,12 @@
+-- Migration: Admin user search and keyset pagination
+-- Description: Trigram index for server-side email search (ILIKE '%term%')
+-- and a (created_at, id) index for cursor-based paging of the user list
+
+-- Enable trigram matching
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Index for substring email search
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);
+
+-- Index matching ORDER BY created_at DESC, id DESC for keyset pagination
+CREATE INDEX IF NOT EXISTS idx_users_created_at_id ON users(created_at DESC, id DESC);
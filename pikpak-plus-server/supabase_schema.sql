@@ -78,6 +78,14 @@ CREATE INDEX IF NOT EXISTS idx_public_actions_magnet_hash ON public_actions((dat
 CREATE INDEX IF NOT EXISTS idx_public_actions_url ON public_actions((data->>'url')) WHERE action = 'add';
 CREATE INDEX IF NOT EXISTS idx_public_actions_file_id ON public_actions((data->>'file_id')) WHERE action = 'share';
 CREATE INDEX IF NOT EXISTS idx_public_actions_user_email ON public_actions(user_email);
+-- Keyset pagination (ORDER BY created_at DESC, id DESC) of the task lists and admin log
+-- (see migrations/migration_public_actions_keyset.sql)
+CREATE INDEX IF NOT EXISTS idx_public_actions_action_created_id ON public_actions(action, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_public_actions_user_action_created_id ON public_actions(user_email, action, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_public_actions_created_id ON public_actions(created_at DESC, id DESC);
+-- Account holding a file (get_account_for_file), by either place the file ID is recorded
+CREATE INDEX IF NOT EXISTS idx_public_actions_add_file_id ON public_actions((data->'task'->'file'->>'id')) WHERE action = 'add';
+CREATE INDEX IF NOT EXISTS idx_public_actions_add_task_file_id ON public_actions((data->'task'->'task'->>'file_id')) WHERE action = 'add';
 
 
 -- Table for storing PikPak tokens (Singleton row)
@@ -94,8 +102,7 @@ CREATE TABLE IF NOT EXISTS pikpak_tokens (
     user_id TEXT,
     captcha_token TEXT,              -- DEPRECATED: kept for backward compatibility
     captcha_expires_at TIMESTAMP WITH TIME ZONE,  -- DEPRECATED: kept for backward compatibility
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    CONSTRAINT single_row CHECK (id = 1)
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- Enable RLS (Row Level Security) - Optional but good practice
@@ -104,3 +111,200 @@ ALTER TABLE pikpak_tokens ENABLE ROW LEVEL SECURITY;
 -- Allow all access for now (since we use service key)
 CREATE POLICY "Allow all access" ON pikpak_tokens FOR ALL USING (true) WITH CHECK (true);
 
+
+-- Table: users
+-- Accounts for authentication and per-user task tracking (see migrations/migration_add_users.sql)
+CREATE TABLE IF NOT EXISTS users (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    is_admin BOOLEAN DEFAULT FALSE,
+    blocked BOOLEAN DEFAULT FALSE,
+    reset_token TEXT,
+    reset_token_expires_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+CREATE INDEX IF NOT EXISTS idx_users_blocked ON users(blocked);
+CREATE INDEX IF NOT EXISTS idx_users_is_admin ON users(is_admin);
+CREATE INDEX IF NOT EXISTS idx_users_reset_token ON users(reset_token) WHERE reset_token IS NOT NULL;
+
+-- Admin user search (ILIKE '%term%') and keyset paging of the user list
+-- (see migrations/migration_user_search_keyset.sql)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_created_at_id ON users(created_at DESC, id DESC);
+
+ALTER TABLE users ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for anon" ON users
+    FOR SELECT
+    TO anon
+    USING (true);
+
+CREATE POLICY "Enable insert access for anon" ON users
+    FOR INSERT
+    TO anon
+    WITH CHECK (true);
+
+CREATE POLICY "Enable update access for anon" ON users
+    FOR UPDATE
+    TO anon
+    USING (true);
+
+CREATE POLICY "Enable delete access for anon" ON users
+    FOR DELETE
+    TO anon
+    USING (true);
+
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = TIMEZONE('utc'::text, NOW());
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+
+-- Table: admin_statistics
+-- Trigger-maintained user and action counts for the admin overview
+-- (see migrations/migration_admin_statistics.sql)
+-- Summary table (singleton row)
+CREATE TABLE IF NOT EXISTS admin_statistics (
+    id INTEGER PRIMARY KEY DEFAULT 1,
+    total_users BIGINT NOT NULL DEFAULT 0,
+    blocked_users BIGINT NOT NULL DEFAULT 0,
+    total_tasks BIGINT NOT NULL DEFAULT 0,
+    total_logs BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT admin_statistics_single_row CHECK (id = 1)
+);
+
+ALTER TABLE admin_statistics ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for anon" ON admin_statistics
+    FOR SELECT
+    TO anon
+    USING (true);
+
+-- Seed the singleton row (counts any rows already present)
+INSERT INTO admin_statistics (id, total_users, blocked_users, total_tasks, total_logs)
+SELECT
+    1,
+    (SELECT COUNT(*) FROM users),
+    (SELECT COUNT(*) FROM users WHERE blocked),
+    (SELECT COUNT(*) FROM public_actions WHERE action = 'add'),
+    (SELECT COUNT(*) FROM public_actions)
+ON CONFLICT (id) DO UPDATE SET
+    total_users = EXCLUDED.total_users,
+    blocked_users = EXCLUDED.blocked_users,
+    total_tasks = EXCLUDED.total_tasks,
+    total_logs = EXCLUDED.total_logs,
+    updated_at = NOW();
+
+-- Statement-level triggers: a batched insert of N rows updates the counters once.
+-- They run as their owner (SECURITY DEFINER) with a pinned search_path, so a
+-- caller's own schema objects can't stand in for admin_statistics
+CREATE OR REPLACE FUNCTION admin_statistics_users_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    users_delta BIGINT := 0;
+    blocked_delta BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT users_delta + COUNT(*), blocked_delta + COUNT(*) FILTER (WHERE blocked)
+        INTO users_delta, blocked_delta
+        FROM new_rows;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT users_delta - COUNT(*), blocked_delta - COUNT(*) FILTER (WHERE blocked)
+        INTO users_delta, blocked_delta
+        FROM old_rows;
+    END IF;
+
+    IF users_delta <> 0 OR blocked_delta <> 0 THEN
+        UPDATE admin_statistics
+        SET total_users = total_users + users_delta,
+            blocked_users = blocked_users + blocked_delta,
+            updated_at = NOW()
+        WHERE id = 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+CREATE OR REPLACE FUNCTION admin_statistics_actions_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    tasks_delta BIGINT := 0;
+    logs_delta BIGINT := 0;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT COUNT(*) FILTER (WHERE action = 'add'), COUNT(*)
+        INTO tasks_delta, logs_delta
+        FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT -COUNT(*) FILTER (WHERE action = 'add'), -COUNT(*)
+        INTO tasks_delta, logs_delta
+        FROM old_rows;
+    END IF;
+
+    IF tasks_delta <> 0 OR logs_delta <> 0 THEN
+        UPDATE admin_statistics
+        SET total_tasks = total_tasks + tasks_delta,
+            total_logs = total_logs + logs_delta,
+            updated_at = NOW()
+        WHERE id = 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+DROP TRIGGER IF EXISTS admin_statistics_users_insert ON users;
+CREATE TRIGGER admin_statistics_users_insert AFTER INSERT ON users
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_users_changed();
+
+DROP TRIGGER IF EXISTS admin_statistics_users_update ON users;
+CREATE TRIGGER admin_statistics_users_update AFTER UPDATE ON users
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_users_changed();
+
+DROP TRIGGER IF EXISTS admin_statistics_users_delete ON users;
+CREATE TRIGGER admin_statistics_users_delete AFTER DELETE ON users
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_users_changed();
+
+DROP TRIGGER IF EXISTS admin_statistics_actions_insert ON public_actions;
+CREATE TRIGGER admin_statistics_actions_insert AFTER INSERT ON public_actions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_actions_changed();
+
+DROP TRIGGER IF EXISTS admin_statistics_actions_delete ON public_actions;
+CREATE TRIGGER admin_statistics_actions_delete AFTER DELETE ON public_actions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION admin_statistics_actions_changed();
+
+-- RPC used by SupabaseService.get_admin_statistics
+CREATE OR REPLACE FUNCTION get_admin_statistics()
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'total_users', total_users,
+        'active_users', total_users - blocked_users,
+        'blocked_users', blocked_users,
+        'total_tasks', total_tasks,
+        'total_logs', total_logs
+    )
+    FROM admin_statistics
+    WHERE id = 1;
+$$ LANGUAGE sql STABLE;
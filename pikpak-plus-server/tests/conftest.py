@@ -0,0 +1,10 @@
+"""Shared fixtures: an in-memory Redis with Lua scripting"""
+import fakeredis
+import pytest
+
+
+@pytest.fixture
+def redis_client():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    yield client
+    client.flushall()
@@ -0,0 +1,94 @@
+"""Tests for the Redis-backed circuit breaker scripts"""
+import asyncio
+
+import pytest
+
+from app.utils.circuit_breaker import DRIVE, CircuitBreaker, CircuitOpenError
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise ConnectionError("upstream down")
+
+
+def call(breaker, operation):
+    return asyncio.run(breaker.call(operation))
+
+
+def trip(breaker):
+    for _ in range(breaker.fail_max):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+
+
+def expire_open_window(redis_client, breaker):
+    redis_client.hset(breaker.state_key, "opened_at", 0)
+
+
+@pytest.fixture
+def breaker(redis_client):
+    return CircuitBreaker(DRIVE, redis_client, fail_max=3, reset_timeout=60)
+
+
+def test_opens_after_consecutive_failures(breaker):
+    trip(breaker)
+
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError) as error:
+        call(breaker, ok)
+    assert 0 < error.value.retry_after <= 60
+
+
+def test_success_resets_failure_count(breaker, redis_client):
+    for _ in range(breaker.fail_max - 1):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+    assert call(breaker, ok) == "ok"
+
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert not breaker.is_open()
+    assert redis_client.hget(breaker.state_key, "failures") == "1"
+
+
+def test_probe_success_closes_circuit(breaker, redis_client):
+    trip(breaker)
+    expire_open_window(redis_client, breaker)
+
+    assert call(breaker, ok) == "ok"
+    assert redis_client.hget(breaker.state_key, "state") == "closed"
+    assert not redis_client.exists(breaker.probe_key)
+
+
+def test_probe_failure_reopens_circuit(breaker, redis_client):
+    trip(breaker)
+    expire_open_window(redis_client, breaker)
+
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert breaker.is_open()
+
+
+def test_only_one_probe_at_a_time(breaker, redis_client):
+    trip(breaker)
+    expire_open_window(redis_client, breaker)
+
+    assert breaker._admit() is True
+    with pytest.raises(CircuitOpenError):
+        breaker._admit()
+
+
+def test_accounts_have_separate_circuits(breaker, redis_client):
+    trip(breaker)
+    other = CircuitBreaker(DRIVE, redis_client, fail_max=3, reset_timeout=60, account_id=2)
+    assert call(other, ok) == "ok"
+
+
+def test_fails_open_without_redis():
+    breaker = CircuitBreaker(DRIVE, None, fail_max=1)
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert call(breaker, ok) == "ok"
@@ -0,0 +1,51 @@
+"""Tests for app.utils.common link helpers"""
+from app.utils.common import extract_e2dk_hash, extract_link_metadata, is_valid_file_id
+
+ED2K_HASH = "31D6CFE0D16AE931B73C59D7E0C089C0"
+ED2K_LINK = f"ed2k://|file|Some%20Movie.mkv|734003200|{ED2K_HASH}|/"
+
+
+def test_extract_e2dk_hash_reads_standard_link():
+    # The hash is what /add deduplicates ed2k links on
+    assert extract_e2dk_hash(ED2K_LINK) == ED2K_HASH.lower()
+
+
+def test_extract_e2dk_hash_rejects_other_links():
+    assert extract_e2dk_hash("ed2k://|server|1.2.3.4|4661|/") is None
+    assert extract_e2dk_hash("ed2k://|file|name|") is None
+    assert extract_e2dk_hash(f"magnet:?xt=urn:btih:{ED2K_HASH}") is None
+    assert extract_e2dk_hash("") is None
+    assert extract_e2dk_hash(None) is None
+
+
+def test_extract_link_metadata_ed2k():
+    assert extract_link_metadata(ED2K_LINK) == {
+        "count": 1,
+        "name": "Some Movie.mkv",
+        "size": 734003200,
+        "hash": ED2K_HASH.lower(),
+    }
+
+
+def test_extract_link_metadata_magnet():
+    url = ("magnet:?xt=urn:btih:ABCDEF0123456789ABCDEF0123456789ABCDEF01"
+           "&dn=Some+Show&xl=1048576&tr=udp%3A%2F%2Ftracker")
+    assert extract_link_metadata(url) == {
+        "hash": "abcdef0123456789abcdef0123456789abcdef01",
+        "name": "Some Show",
+        "size": 1048576,
+    }
+
+
+def test_extract_link_metadata_ignores_bad_sizes_and_other_links():
+    assert "size" not in extract_link_metadata("magnet:?xt=urn:btih:abc&xl=-5")
+    assert "size" not in extract_link_metadata("ed2k://|file|name|big|hash|/")
+    assert extract_link_metadata("https://example.com/file") == {}
+    assert extract_link_metadata("") == {}
+
+
+def test_is_valid_file_id():
+    assert is_valid_file_id("VNa1b2C3_d-4")
+    assert not is_valid_file_id("")
+    assert not is_valid_file_id("id,data->>x.eq.1")
+    assert not is_valid_file_id("a" * 65)
@@ -0,0 +1,17 @@
+"""Tests for app.core.config parsing"""
+from app.core.config import parse_extra_accounts
+
+
+def test_short_form_splits_on_first_colon():
+    assert parse_extra_accounts(" a@example.com:pa:ss ; b@example.com:x;junk") == [
+        ("a@example.com", "pa:ss"), ("b@example.com", "x")]
+
+
+def test_json_form_allows_any_password():
+    value = '[{"user": "a@example.com", "pass": "p;w:d"}]'
+    assert parse_extra_accounts(value) == [("a@example.com", "p;w:d")]
+
+
+def test_empty():
+    assert parse_extra_accounts("") == []
+    assert parse_extra_accounts(None) == []
@@ -0,0 +1,79 @@
+"""Tests for app.utils.forecasting and the prediction rows built from it"""
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.supabase_service import append_predictions
+from app.utils.forecasting import (
+    METRICS, build_forecast, days_until_exhausted, extract_quota_limits, fit_linear, forecast_for_stats
+)
+
+
+def daily_rows(days, start=date(2026, 1, 1)):
+    """Rows where every metric grows linearly: 10 + 5 * day"""
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), **{m: 10 + 5 * i for m in METRICS}}
+        for i in range(days)
+    ]
+
+
+def test_fit_linear_recovers_slope_and_intercept():
+    slopes, intercepts = fit_linear(np.array([[1.0, 3.0, 5.0, 7.0], [4.0, 4.0, 4.0, 4.0]]))
+    np.testing.assert_allclose(slopes, [2.0, 0.0], atol=1e-9)
+    np.testing.assert_allclose(intercepts, [1.0, 4.0], atol=1e-9)
+
+
+def test_fit_linear_single_day_is_flat():
+    slopes, intercepts = fit_linear(np.array([[7.0]]))
+    assert slopes.tolist() == [0.0]
+    assert intercepts.tolist() == [7.0]
+
+
+def test_build_forecast_extends_linear_trend():
+    forecast = build_forecast(daily_rows(10), horizon=3)
+
+    assert forecast["dates"] == ["2026-01-11", "2026-01-12", "2026-01-13"]
+    for metric in METRICS:
+        # Values are truncated to int, so a fit of 59.999... reads 59
+        assert forecast["models"]["linear"][metric] == pytest.approx([60, 65, 70], abs=1)
+        assert forecast["daily_growth"][metric] == pytest.approx(5.0)
+    assert set(forecast["models"]) == {"linear", "exponential", "seasonal"}
+
+
+def test_build_forecast_is_memoized():
+    rows = daily_rows(5, start=date(2025, 6, 1))
+    assert build_forecast(rows, horizon=2) is build_forecast(rows, horizon=2)
+    assert build_forecast([]) == {}
+
+
+def test_forecasts_never_go_negative():
+    rows = [{"date": f"2026-02-0{i + 1}", **{m: 100 - 40 * i for m in METRICS}} for i in range(3)]
+    for values in build_forecast(rows, horizon=4)["models"]["linear"].values():
+        assert min(values) == 0
+
+
+def test_days_until_exhausted():
+    days = days_until_exhausted(np.array([50.0, 50.0, 50.0, 200.0]),
+                                np.array([10.0, 0.0, 10.0, 10.0]),
+                                np.array([100.0, 100.0, 0.0, 100.0]))
+    assert days == [5.0, None, None, 0.0]
+
+
+def test_extract_quota_limits():
+    quota_info = {
+        "storage": {"quota": {"limit": "1000"}},
+        "transfer": {"base": {"offline": {"total_assets": 300}},
+                     "transfer": {"offline": {"total_assets": 200}}},
+    }
+    assert extract_quota_limits(quota_info) == {"storage_used": 1000, "transfer_used": 500}
+    assert extract_quota_limits(None) == {}
+    assert extract_quota_limits({"storage": "garbage"}) == {}
+
+
+def test_forecast_for_stats_ignores_predicted_rows():
+    rows = daily_rows(6, start=date(2025, 3, 1))
+    stats = append_predictions([dict(row) for row in rows])
+
+    assert [row["is_predicted"] for row in stats] == [False] * 6 + [True] * 7
+    assert forecast_for_stats(stats) is build_forecast(rows)
@@ -0,0 +1,105 @@
+"""Tests for the Idempotency-Key state machine"""
+import hashlib
+import json
+
+import pytest
+from flask import Flask, jsonify, request
+
+from app.api.utils import idempotency as idempotency_module
+from app.api.utils.idempotency import DONE, IN_FLIGHT, idempotent
+from app.core.config import AppConfig
+
+HEADERS = {"Idempotency-Key": "key-1"}
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(redis_client, monkeypatch, calls):
+    monkeypatch.setattr(idempotency_module, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(idempotency_module, "get_current_user", lambda: {"email": "a@example.com"})
+
+    app = Flask(__name__)
+
+    @app.route("/add", methods=["POST"])
+    @idempotent("add")
+    def add():
+        calls.append(1)
+        status = (request.get_json(silent=True) or {}).get("status", 200)
+        return jsonify({"call": len(calls)}), status
+
+    return app.test_client()
+
+
+def stored(redis_client):
+    keys = redis_client.keys(f"{idempotency_module.KEY_PREFIX}add:a@example.com:*")
+    assert len(keys) == 1
+    return json.loads(redis_client.get(keys[0])), redis_client.ttl(keys[0])
+
+
+def test_replays_first_response(client, calls, redis_client):
+    first = client.post("/add", json={}, headers=HEADERS)
+    second = client.post("/add", json={}, headers=HEADERS)
+
+    assert first.get_json() == second.get_json() == {"call": 1}
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert len(calls) == 1
+    entry, ttl = stored(redis_client)
+    assert entry["state"] == DONE
+    assert AppConfig.IDEMPOTENCY_ERROR_TTL < ttl <= AppConfig.IDEMPOTENCY_TTL
+
+
+def test_without_key_every_request_runs(client, calls):
+    client.post("/add", json={})
+    client.post("/add", json={})
+    assert len(calls) == 2
+
+
+def test_reused_key_with_other_body_is_rejected(client, calls):
+    client.post("/add", json={"url": "a"}, headers=HEADERS)
+    response = client.post("/add", json={"url": "b"}, headers=HEADERS)
+    assert response.status_code == 422
+    assert len(calls) == 1
+
+
+def test_duplicate_in_flight_gets_409(client, calls, redis_client):
+    body = json.dumps({}).encode()
+    key = (f"{idempotency_module.KEY_PREFIX}add:a@example.com:"
+           f"{hashlib.sha256(b'key-1').hexdigest()}")
+    redis_client.set(key, json.dumps({
+        "state": IN_FLIGHT, "fingerprint": hashlib.sha256(body).hexdigest()}))
+
+    response = client.post("/add", data=body, content_type="application/json", headers=HEADERS)
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == str(idempotency_module.IN_FLIGHT_RETRY_AFTER)
+    assert calls == []
+
+
+def test_server_errors_release_the_key(client, calls, redis_client):
+    assert client.post("/add", json={"status": 503}, headers=HEADERS).status_code == 503
+    assert redis_client.keys(f"{idempotency_module.KEY_PREFIX}*") == []
+
+    client.post("/add", json={"status": 503}, headers=HEADERS)
+    assert len(calls) == 2
+
+
+def test_client_errors_cached_briefly(client, calls, redis_client):
+    client.post("/add", json={"status": 400}, headers=HEADERS)
+    assert client.post("/add", json={"status": 400}, headers=HEADERS).status_code == 400
+    assert len(calls) == 1
+    _, ttl = stored(redis_client)
+    assert ttl <= AppConfig.IDEMPOTENCY_ERROR_TTL
+
+
+def test_fails_open_when_redis_errors(client, calls, monkeypatch, redis_client):
+    def broken_set(*args, **kwargs):
+        raise ConnectionError("redis down")
+    monkeypatch.setattr(redis_client, "set", broken_set)
+
+    assert client.post("/add", json={}, headers=HEADERS).status_code == 200
+    assert client.post("/add", json={}, headers=HEADERS).status_code == 200
+    assert len(calls) == 2
@@ -0,0 +1,57 @@
+"""Tests for app.utils.pagination"""
+import pytest
+
+from app.utils.pagination import (
+    DEFAULT_COUNT_MODE, apply_keyset, decode_cursor, encode_cursor, next_cursor, parse_count_mode
+)
+
+ROW = {"created_at": "2026-01-02T03:04:05.678+00:00", "id": 42}
+
+
+class RecordingQuery:
+    """Stands in for a PostgREST builder; records or_() filters"""
+
+    def __init__(self):
+        self.filters = []
+
+    def or_(self, value):
+        self.filters.append(value)
+        return self
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(ROW)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (ROW["created_at"], 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "bnVsbA", encode_cursor({"created_at": "x", "id": "y"})])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_apply_keyset_quotes_timestamp():
+    query = apply_keyset(RecordingQuery(), encode_cursor(ROW))
+    assert query.filters == [
+        f'created_at.lt."{ROW["created_at"]}",and(created_at.eq."{ROW["created_at"]}",id.lt.42)'
+    ]
+
+
+def test_apply_keyset_without_cursor_leaves_query():
+    query = RecordingQuery()
+    assert apply_keyset(query, None) is query
+    assert query.filters == []
+
+
+def test_next_cursor_only_on_full_pages():
+    rows = [{"created_at": "a", "id": 2}, ROW]
+    assert next_cursor(rows, 2) == encode_cursor(ROW)
+    assert next_cursor(rows, 3) is None
+    assert next_cursor([], 0) is None
+
+
+def test_parse_count_mode():
+    assert parse_count_mode("EXACT") == "exact"
+    assert parse_count_mode("bogus") == DEFAULT_COUNT_MODE
+    assert parse_count_mode(None) == DEFAULT_COUNT_MODE
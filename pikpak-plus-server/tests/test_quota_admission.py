@@ -0,0 +1,60 @@
+"""Tests for the quota reservation script"""
+import pytest
+
+from app.core.config import AppConfig
+from app.services.quota_admission import ADMITTED, REJECTED, QuotaAdmission
+
+GB = 1024 ** 3
+
+
+def quota(limit_gb, used_gb=0):
+    return {"transfer": {"base": {"offline": {"total_assets": limit_gb * GB, "size": used_gb * GB}}}}
+
+
+@pytest.fixture(autouse=True)
+def admission_enabled(monkeypatch):
+    monkeypatch.setattr(AppConfig, "QUOTA_ADMISSION_ENABLED", True)
+
+
+@pytest.fixture
+def admission(redis_client):
+    return QuotaAdmission(redis_client)
+
+
+def test_check_rejects_links_larger_than_remaining_quota(admission):
+    assert admission.check(6 * GB, quota(10, used_gb=5))[0] == REJECTED
+    assert admission.check(5 * GB, quota(10, used_gb=5)) == (ADMITTED, None)
+    assert admission.check(None, quota(10)) == (ADMITTED, None)
+    assert admission.check(20 * GB, None) == (ADMITTED, None)
+
+
+def test_reserve_defers_once_in_flight_fills_quota(admission):
+    assert admission.reserve("s1", 6 * GB, quota(10))
+    assert not admission.reserve("s2", 6 * GB, quota(10))
+    assert admission.reserve("s3", 4 * GB, quota(10))
+
+
+def test_release_frees_reservation(admission):
+    assert admission.reserve("s1", 6 * GB, quota(10))
+    admission.release("s1", 6 * GB)
+    assert admission.reserve("s2", 6 * GB, quota(10))
+
+
+def test_expired_pending_reservations_are_trimmed(admission, redis_client):
+    redis_client.zadd(QuotaAdmission.PENDING_KEY, {f"old:{6 * GB}": 1})
+    assert admission.reserve("s1", 6 * GB, quota(10))
+    assert redis_client.zscore(QuotaAdmission.PENDING_KEY, f"old:{6 * GB}") is None
+
+
+def test_settled_reservations_count_until_quota_refresh(admission):
+    assert admission.reserve("s1", 6 * GB, quota(10))
+    admission.settle("s1", 6 * GB)
+    assert not admission.reserve("s2", 6 * GB, quota(10))
+
+    admission.on_quota_refreshed(fetched_at=float("inf"))
+    assert admission.reserve("s2", 6 * GB, quota(10))
+
+
+def test_accounts_reserve_separately(admission):
+    assert admission.reserve("s1", 6 * GB, quota(10))
+    assert admission.reserve("s2", 6 * GB, quota(10), account_id=2)
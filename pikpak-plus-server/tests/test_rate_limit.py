@@ -0,0 +1,51 @@
+"""Tests for the sliding-window rate limit script"""
+import pytest
+from flask import Flask, jsonify
+
+from app.api.utils import rate_limit as rate_limit_module
+from app.api.utils.rate_limit import rate_limit
+
+USER = {"email": "a@example.com", "is_admin": False}
+
+
+@pytest.fixture
+def client(redis_client, monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "_script", None)
+    monkeypatch.setattr(rate_limit_module, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(rate_limit_module, "get_current_user", lambda: dict(USER))
+
+    app = Flask(__name__)
+
+    @app.route("/add", methods=["POST"])
+    @rate_limit("add", limit=2, window=60)
+    def add():
+        return jsonify({"ok": True})
+
+    return app.test_client()
+
+
+def test_allows_up_to_limit_then_429(client):
+    first, second, third = (client.post("/add") for _ in range(3))
+
+    assert [r.status_code for r in (first, second, third)] == [200, 200, 429]
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert second.headers["X-RateLimit-Remaining"] == "0"
+    assert 1 <= int(third.headers["Retry-After"]) <= 60
+
+
+def test_rejected_requests_are_not_recorded(client, redis_client):
+    for _ in range(4):
+        client.post("/add")
+    assert redis_client.zcard(f"{rate_limit_module.KEY_PREFIX}add:{USER['email']}") == 2
+
+
+def test_window_slides(client, redis_client):
+    key = f"{rate_limit_module.KEY_PREFIX}add:{USER['email']}"
+    redis_client.zadd(key, {"old-1": 1, "old-2": 2})
+    assert client.post("/add").status_code == 200
+    assert redis_client.zcard(key) == 1
+
+
+def test_admins_are_exempt(client, monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "get_current_user", lambda: {**USER, "is_admin": True})
+    assert all(client.post("/add").status_code == 200 for _ in range(5))
@@ -0,0 +1,44 @@
+"""Tests for the retry budget script and request deadlines"""
+import pytest
+
+from app.utils.retry_policy import DeadlineExceeded, RetryBudget, bounded, deadline, remaining
+
+
+def test_budget_allows_floor_without_requests(redis_client):
+    budget = RetryBudget(redis_client, ratio=0.5, min_retries=2, window=60)
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+def test_budget_grows_with_requests(redis_client):
+    budget = RetryBudget(redis_client, ratio=0.5, min_retries=0, window=60)
+    for _ in range(4):
+        budget.record_request()
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+def test_budget_counts_previous_window(redis_client):
+    budget = RetryBudget(redis_client, ratio=1.0, min_retries=0, window=60)
+    current, previous = budget._keys()
+    redis_client.hset(previous, mapping={"requests": 2, "retries": 1})
+    assert [budget.try_spend() for _ in range(2)] == [True, False]
+    assert redis_client.hget(current, "retries") == "1"
+    assert redis_client.ttl(current) > 0
+
+
+def test_budget_fails_open_without_redis():
+    assert RetryBudget(None).try_spend()
+
+
+def test_nested_deadline_only_tightens():
+    assert remaining() is None
+    with deadline(10):
+        with deadline(100):
+            assert remaining() <= 10
+        assert bounded(30) <= 10
+    assert bounded(30) == 30
+
+
+def test_bounded_after_deadline_raises():
+    with deadline(-1):
+        with pytest.raises(DeadlineExceeded):
+            bounded(5)
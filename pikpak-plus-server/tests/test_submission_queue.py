@@ -0,0 +1,109 @@
+"""Tests for the fair queue and submission link claim scripts"""
+import pytest
+
+from app.services.submission_queue import (
+    STATUS_PROCESSING, FairQueue, SubmissionStore
+)
+
+
+@pytest.fixture
+def queue(redis_client):
+    return FairQueue(redis_client)
+
+
+@pytest.fixture
+def store(redis_client):
+    return SubmissionStore(redis_client)
+
+
+def drain(queue):
+    popped = []
+    while (submission_id := queue.pop()) is not None:
+        popped.append(submission_id)
+    return popped
+
+
+def test_backlog_does_not_starve_other_users(queue):
+    for i in range(3):
+        queue.push("heavy@example.com", f"h{i}")
+    queue.push("light@example.com", "l0")
+
+    assert drain(queue) == ["h0", "l0", "h1", "h2"]
+
+
+def test_weight_scales_share(queue):
+    for i in range(4):
+        queue.push("admin@example.com", f"a{i}", weight=2)
+        queue.push("user@example.com", f"u{i}")
+
+    assert drain(queue)[:3] == ["a0", "a1", "u0"]
+
+
+def test_late_submitter_starts_at_virtual_time(queue):
+    queue.push("a@example.com", "a0")
+    queue.push("a@example.com", "a1")
+    queue.pop()
+
+    # Not behind a@'s whole history, and not ahead of what is already served
+    assert queue.push("b@example.com", "b0") == pytest.approx(2.0)
+    assert queue.position("b0") == 1
+
+
+def test_last_tags_dropped_once_queue_drains(queue, redis_client):
+    queue.push("a@example.com", "a0")
+    queue.push("a@example.com", "a1")
+    queue.push("b@example.com", "b0")
+
+    queue.pop()
+    assert redis_client.zscore(FairQueue.LAST_TAG_KEY, "b@example.com") is None
+    assert redis_client.zscore(FairQueue.LAST_TAG_KEY, "a@example.com") == 2.0
+
+    drain(queue)
+    assert not redis_client.exists(FairQueue.LAST_TAG_KEY)
+
+
+def test_stale_claims_requeued_at_front(queue):
+    queue.push("a@example.com", "a0")
+    queue.push("b@example.com", "b0")
+    assert queue.pop() in ("a0", "b0")
+
+    requeued = queue.requeue_stale(claimed_before=float("inf"))
+
+    assert len(requeued) == 1
+    assert queue.pop() == requeued[0]
+
+
+def test_ack_drops_claim(queue):
+    queue.push("a@example.com", "a0")
+    queue.pop()
+    queue.ack("a0")
+    assert queue.requeue_stale(claimed_before=float("inf")) == []
+
+
+def test_link_claim_joins_live_submission(store):
+    first = store.create("a@example.com", "magnet:?x", submission_id="s1", link_key="hash")
+    second = store.create("b@example.com", "magnet:?x", submission_id="s2", link_key="hash")
+
+    assert (first, second) == ("s1", "s1")
+    assert store.get("s2") is None
+    record = store.get("s1")
+    assert store.can_view(record, "b@example.com")
+    assert not store.can_view(record, "c@example.com")
+
+
+def test_link_released_when_submission_finishes(store, redis_client):
+    store.create("a@example.com", "magnet:?x", submission_id="s1", link_key="hash")
+    store.update("s1", status=STATUS_PROCESSING)
+    assert store.create("b@example.com", "magnet:?x", submission_id="s2", link_key="hash") == "s1"
+
+    store.fail("s1", "PikPak error")
+
+    assert not redis_client.exists(store._link_key("hash"))
+    assert store.create("b@example.com", "magnet:?x", submission_id="s3", link_key="hash") == "s3"
+
+
+def test_link_claim_ignores_expired_holder(store, redis_client):
+    store.create("a@example.com", "magnet:?x", submission_id="s1", link_key="hash")
+    redis_client.delete(store._key("s1"))
+
+    assert store.create("b@example.com", "magnet:?x", submission_id="s2", link_key="hash") == "s2"
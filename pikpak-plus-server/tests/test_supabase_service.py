@@ -0,0 +1,155 @@
+"""Tests for the Supabase query helpers and the shared query plans"""
+import asyncio
+
+import pytest
+
+from app.services.async_supabase_service import AsyncSupabaseService
+from app.services.supabase_service import (
+    SUPABASE_CLIENT_NOT_INITIALIZED, SupabaseService, apply_user_filters, build_action_data,
+    build_task_status_updates
+)
+
+
+class Response:
+    def __init__(self, data=None, count=None):
+        self.data = data
+        self.count = count
+
+
+class Request:
+    """Stands in for a PostgREST builder: records calls, answers execute()"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.calls = [("table", table)]
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+        return call
+
+    def execute(self):
+        self.client.executed.append(self.calls)
+        if self.client.error:
+            raise self.client.error
+        return self.client.responses.pop(0)
+
+
+class AsyncRequest(Request):
+    async def execute(self):
+        return Request.execute(self)
+
+
+class Client:
+    def __init__(self, responses=(), error=None, request_class=Request):
+        self.responses = list(responses)
+        self.error = error
+        self.request_class = request_class
+        self.executed = []
+
+    def table(self, name):
+        return self.request_class(self, name)
+
+    def rpc(self, name):
+        return self.request_class(self, f"rpc:{name}")
+
+
+def pikpak_row(row_id, phase="PHASE_TYPE_RUNNING", progress=10):
+    return {
+        "id": row_id,
+        "user_email": "a@example.com",
+        "data": {"task": {"task": {"id": f"t{row_id}", "phase": phase, "progress": progress}}},
+    }
+
+
+def test_build_task_status_updates_returns_only_changed_rows():
+    rows = [pikpak_row(1), pikpak_row(2), pikpak_row(3)]
+    pikpak_tasks = [
+        {"id": "t1", "phase": "PHASE_TYPE_COMPLETE", "progress": 100},
+        {"id": "t2", "phase": "PHASE_TYPE_RUNNING", "progress": 10},
+    ]
+
+    updates = build_task_status_updates(rows, pikpak_tasks)
+
+    assert [u["id"] for u in updates] == [1]
+    task = updates[0]["data"]["task"]["task"]
+    assert (task["phase"], task["progress"]) == ("PHASE_TYPE_COMPLETE", 100)
+    assert updates[0]["action"] == "add"
+    assert updates[0]["user_email"] == "a@example.com"
+
+
+def test_build_task_status_updates_skips_rows_without_task_id():
+    assert build_task_status_updates([{"id": 1, "data": {}}], [{"id": None}]) == []
+
+
+def test_apply_user_filters_escapes_like_wildcards():
+    request = apply_user_filters(Request(Client(), "users"), blocked_filter=False, search="a_b%c")
+    assert request.calls[1:] == [("eq", "blocked", False), ("ilike", "email", "%a\\_b\\%c%")]
+
+
+def test_build_action_data_keeps_whatslink_fields():
+    file_info = {"name": "x", "size": 5, "file_type": None,
+                 "screenshots": [{"screenshot": "u1", "time": 0}, "u2"]}
+    data = build_action_data("magnet:?", {"task": {}}, file_info, account_id=3)
+    assert data == {"url": "magnet:?", "task": {"task": {}}, "account_id": 3,
+                    "whatslink": {"name": "x", "size": 5, "screenshots": ["u1", "u2"]}}
+
+
+def test_sync_service_runs_query_plan():
+    client = Client([Response([{"email": "a"}, {"email": "b"}])])
+    assert SupabaseService(client).get_blocked_user_emails() == ["a", "b"]
+    assert client.executed == [[("table", "users"), ("select", "email"), ("eq", "blocked", True)]]
+
+
+def test_sync_service_raises_request_errors_into_plan():
+    client = Client(error=ConnectionError("down"))
+    # get_user_by_email catches its own errors; delete_user re-raises them
+    assert SupabaseService(client).get_user_by_email("a") is None
+    with pytest.raises(ConnectionError):
+        SupabaseService(client).delete_user("a")
+
+
+def test_sync_service_without_client():
+    service = SupabaseService(None)
+    with pytest.raises(RuntimeError, match=SUPABASE_CLIENT_NOT_INITIALIZED):
+        service.get_tasks(0, 10)
+    assert service.count_tasks_added_since("2026-01-01") == 0
+    assert service.health_check() == (False, SUPABASE_CLIENT_NOT_INITIALIZED)
+
+
+ADMIN_COUNTS = [Response(data=None)] + [Response(count=n) for n in (10, 3, 7, 20)]
+ADMIN_STATS = {"total_users": 10, "active_users": 7, "blocked_users": 3,
+               "total_tasks": 7, "total_logs": 20}
+
+
+def test_admin_statistics_fall_back_to_counts():
+    # The RPC answers with no data, so the four COUNT queries run
+    client = Client(ADMIN_COUNTS)
+    assert SupabaseService(client).get_admin_statistics() == ADMIN_STATS
+    assert len(client.executed) == 5
+
+
+def test_async_admin_statistics_fall_back_to_counts():
+    client = Client(ADMIN_COUNTS, request_class=AsyncRequest)
+    service = _with_client(AsyncSupabaseService("url", "key"), client)
+    assert asyncio.run(service.get_admin_statistics()) == ADMIN_STATS
+    assert len(client.executed) == 5
+
+
+def test_async_service_paginates():
+    client = Client([Response([{"created_at": "c", "id": 1}], count=1)], request_class=AsyncRequest)
+    service = AsyncSupabaseService("url", "key")
+
+    page = asyncio.run(_with_client(service, client).get_user_tasks("a@example.com", 0, 10))
+
+    assert page == {"data": [{"created_at": "c", "id": 1}], "count": 1, "next_cursor": None}
+    assert ("range", 0, 9) in client.executed[0]
+
+
+def _with_client(service, client):
+    """Hand the service a fake client instead of connecting"""
+    async def get_client():
+        return client
+    service.get_client = get_client
+    return service